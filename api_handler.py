@@ -1,51 +1,422 @@
 import requests
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+import math
+import threading
 import time
+from book import Book, loads
+from response_cache import ResponseCache
+from metrics import METRICS
+
+PAGE_SIZE = 40
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Partial response: only the fields the app stores or shows
+VOLUME_FIELDS = (
+    "totalItems,"
+    "items(id,"
+    "volumeInfo(title,authors,publisher,publishedDate,description,industryIdentifiers,pageCount,printType,"
+    "categories,averageRating,ratingsCount,maturityRating,language,imageLinks/thumbnail),"
+    "saleInfo(saleability,isEbook,listPrice,retailPrice,buyLink))"
+)
+
+
+# printType request values and the volumeInfo.printType they select
+PRINT_TYPES = {'books': 'BOOK', 'magazines': 'MAGAZINE'}
+
+
+class SearchFilters(NamedTuple):
+    """
+    Result filters for a search.
+
+    Google Books can apply the eBook, free, print type and language filters
+    itself (request_params); ratings and page counts can only be checked on
+    the results (matches checks every filter, so it also works on stored
+    results fetched without them).
+    """
+
+    min_rating: float = 0.0
+    min_pages: int = 0
+    ebook_only: bool = False
+    free_only: bool = False
+    print_type: Optional[str] = None  # 'books' or 'magazines'
+    language: Optional[str] = None  # ISO 639-1 code, e.g. 'en'
+
+    def request_params(self) -> Dict:
+        """The filters as Google Books request parameters"""
+        params = {}
+        if self.free_only:
+            params['filter'] = 'free-ebooks'
+        elif self.ebook_only:
+            params['filter'] = 'ebooks'
+        if self.print_type:
+            params['printType'] = self.print_type
+        if self.language:
+            params['langRestrict'] = self.language
+        return params
+
+    def search_key(self, query: str) -> str:
+        """Key for a search's stored results; differs per set of request filters"""
+        params = self.request_params()
+        return f"{query} [{urlencode(sorted(params.items()))}]" if params else query
+
+    @classmethod
+    def from_search_key(cls, search_key: str) -> Tuple[str, 'SearchFilters']:
+        """Split a search_key back into its query and request filters"""
+        query, separator, params = search_key.rpartition(' [')
+        if not separator or not params.endswith(']'):
+            return search_key, cls()
+        params = dict(parse_qsl(params[:-1]))
+        return query, cls(
+            ebook_only=params.get('filter') == 'ebooks',
+            free_only=params.get('filter') == 'free-ebooks',
+            print_type=params.get('printType'),
+            language=params.get('langRestrict')
+        )
+
+    @property
+    def client_side(self) -> bool:
+        """Whether some filter can only be checked on the results"""
+        return self.min_rating > 0 or self.min_pages > 0
+
+    def matches(self, book: Book) -> bool:
+        """Whether a book passes every filter"""
+        if self.min_rating > 0 and (book.average_rating or 0) < self.min_rating:
+            return False
+        if self.min_pages > 0 and (book.page_count or 0) < self.min_pages:
+            return False
+        if self.ebook_only and not book.is_ebook:
+            return False
+        if self.free_only and book.saleability != 'FREE':
+            return False
+        # Books stored before printType was kept have none; trust the request filter for those
+        if self.print_type and book.print_type not in (None, PRINT_TYPES[self.print_type]):
+            return False
+        if self.language and book.language != self.language:
+            return False
+        return True
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(rate: float, capacity: int) -> TokenBucket:
+    """Return the process-wide limiter for these settings."""
+    with _rate_limiters_lock:
+        key = (rate, capacity)
+        if key not in _rate_limiters:
+            _rate_limiters[key] = TokenBucket(rate, capacity)
+        return _rate_limiters[key]
+
 
 class GoogleBooksAPI:
     """Handler for Google Books API interactions."""
-    
-    def __init__(self, api_key: str):
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://www.googleapis.com/books/v1/volumes",
+        rate_limit: float = 5.0,
+        rate_burst: int = 5,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        cache: Optional[ResponseCache] = None,
+        project_fields: bool = True
+    ):
         self.api_key = api_key
-        self.base_url = "https://www.googleapis.com/books/v1/volumes"
-    
-    def search_books(self, query: str, max_results: int = 40) -> List[Dict]:
+        self.base_url = base_url
+        self.rate_limiter = get_rate_limiter(rate_limit, rate_burst)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.cache = cache
+        self.project_fields = project_fields
+
+        # One keep-alive session so pages after the first skip the TLS handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _fetch_page(
+        self,
+        query: str,
+        start_index: int,
+        max_results: int,
+        use_cache: bool = True,
+        refresh: bool = False,
+        params: Optional[Dict] = None
+    ) -> Dict:
         """
-        Search for books using the Google Books API.
-        
+        Fetch one page of volumes.
+
+        Pages are served from the response cache when one is configured,
+        unless use_cache is False; refresh=True skips the lookup but still
+        stores the fresh response. params are extra request parameters,
+        e.g. SearchFilters.request_params().
+        """
+        params = {
+            'q': query,
+            'maxResults': max_results,
+            'startIndex': start_index,
+            **(params or {})
+        }
+        if self.project_fields:
+            params['fields'] = VOLUME_FIELDS
+
+        cache_key = None
+        if self.cache and use_cache:
+            cache_key = ResponseCache.make_key(params)
+            if not refresh:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    if METRICS.enabled:
+                        METRICS.inc('api_cache_hits_total')
+                    return cached
+
+        data = self._request(params)
+        if cache_key:
+            self.cache.set(cache_key, data)
+        return data
+
+    def fetch_page(
+        self,
+        query: str,
+        start_index: int = 0,
+        max_results: int = PAGE_SIZE,
+        use_cache: bool = True,
+        params: Optional[Dict] = None
+    ) -> Tuple[int, List[Book]]:
+        """
+        Fetch one page as (totalItems, Books), for callers that schedule
+        pages themselves. Request errors are raised, not printed.
+        """
+        data = self._fetch_page(query, start_index, max_results, use_cache, params=params)
+        return data.get('totalItems', 0), [Book.from_volume(volume) for volume in data.get('items', [])]
+
+    def _request(self, params: Dict) -> Dict:
+        """
+        Send one rate-limited request, retrying 429 and 5xx responses with
+        exponential backoff (or the server's Retry-After when given).
+        """
+        params = {**params, 'key': self.api_key}
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            self.rate_limiter.acquire()
+            sent = time.perf_counter()
+            response = self.session.get(self.base_url, params=params, timeout=30)
+            if METRICS.enabled:
+                status = str(response.status_code)
+                METRICS.observe('api_rate_limit_wait_seconds', sent - start)
+                METRICS.observe('api_request_seconds', time.perf_counter() - sent, status=status)
+                METRICS.inc('api_response_bytes_total', len(response.content))
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                if METRICS.enabled:
+                    METRICS.inc('api_retries_total', status=str(response.status_code))
+                retry_after = response.headers.get('Retry-After', '')
+                delay = float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt
+                time.sleep(delay)
+                continue
+            response.raise_for_status()
+            start = time.perf_counter()
+            data = loads(response.content)
+            if METRICS.enabled:
+                METRICS.observe('api_decode_seconds', time.perf_counter() - start)
+            return data
+
+    def iter_books(
+        self,
+        query: str,
+        max_results: int = 40,
+        use_cache: bool = True,
+        refresh: bool = False,
+        start_index: int = 0,
+        page_info: Optional[Dict] = None,
+        params: Optional[Dict] = None
+    ) -> Iterator[List[Book]]:
+        """
+        Yield result pages, as Books, as soon as they are available.
+
+        The first page is yielded before any other request is made; it tells
+        us totalItems, and the remaining pages are then fetched concurrently
+        (subject to the shared rate limiter) and yielded in page order.
+        Google Books can return fewer than maxResults items on a page that is
+        not the last; the rest of that page is then requested (and yielded)
+        before the pages after it. Results end at an empty page or once
+        totalItems (or max_results) is reached.
+        Stopping iteration early cancels pages that have not started yet.
+
         Args:
             query: Search term
             max_results: Maximum number of results to return
-            
-        Returns:
-            List of book data dictionaries
-        """
-        all_books = []
-        start_index = 0
-        
-        while len(all_books) < max_results:
-            params = {
-                'q': query,
-                'key': self.api_key,
-                'maxResults': min(40, max_results - len(all_books)),
-                'startIndex': start_index
-            }
-            
+            use_cache: Read and write the response cache, if configured
+            refresh: Ignore cached pages and re-fetch them
+            start_index: Position of the first result to return
+            page_info: If given, receives the API's 'totalItems' for the query
+            params: Extra request parameters sent with every page
+        """
+        try:
+            first = self._fetch_page(query, start_index, min(PAGE_SIZE, max_results), use_cache, refresh, params)
+        except requests.exceptions.RequestException as e:
+            print(f"API request failed: {e}")
+            return
+
+        if page_info is not None:
+            page_info['totalItems'] = first.get('totalItems', 0)
+
+        items = first.get('items', [])[:max_results]
+        if not items:
+            return
+        yield [Book.from_volume(volume) for volume in items]
+
+        end = start_index + min(max_results, first.get('totalItems', 0) - start_index)
+        position = start_index + len(items)
+        page_ends = [min(start + PAGE_SIZE, end) for start in range(start_index, end, PAGE_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._fetch_page, query, start, min(PAGE_SIZE, end - start), use_cache, refresh, params
+                )
+                for start in range(start_index + PAGE_SIZE, end, PAGE_SIZE)
+            ]
             try:
-                response = requests.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if 'items' not in data:
+                # Keep results in page order and stop at the first gap
+                for page_end, future in zip(page_ends, [None, *futures]):
+                    while position < page_end:
+                        try:
+                            if future is None:
+                                # The rest of a short page
+                                data = self._fetch_page(
+                                    query, position, page_end - position, use_cache, refresh, params
+                                )
+                            else:
+                                data, future = future.result(), None
+                        except requests.exceptions.RequestException as e:
+                            print(f"API request failed: {e}")
+                            return
+                        items = data.get('items')
+                        if not items:
+                            return
+                        yield [Book.from_volume(volume) for volume in items]
+                        position += len(items)
+            finally:
+                for pending in futures:
+                    pending.cancel()
+
+    def iter_matching(
+        self,
+        query: str,
+        max_results: int = 40,
+        filters: Optional[SearchFilters] = None,
+        max_requests: int = 10,
+        use_cache: bool = True,
+        refresh: bool = False,
+        start_index: int = 0,
+        page_info: Optional[Dict] = None
+    ) -> Iterator[List[Book]]:
+        """
+        Yield result pages until max_results books pass filters or
+        max_requests pages have been fetched.
+
+        Filters Google Books supports are sent with the request. The rest
+        are checked here, and pages keep coming in rounds sized by the pass
+        rate seen so far, so a selective filter asks for several pages at
+        once (fetched concurrently) instead of one round trip at a time.
+        Pages are yielded whole; apply filters.matches to show only matches.
+
+        page_info, if given, receives 'totalItems', 'requests' (pages
+        fetched) and 'matched'.
+        """
+        filters = filters or SearchFilters()
+        params = filters.request_params()
+        info = page_info if page_info is not None else {}
+        info.update(requests=0, matched=0)
+        scanned = 0
+        start = start_index
+        while info['matched'] < max_results and info['requests'] < max_requests:
+            needed = max_results - info['matched']
+            # Smoothed pass rate; everything is assumed to pass until pages say otherwise
+            rate = (info['matched'] + 1) / (scanned + 1) if scanned else 1.0
+            pages = min(math.ceil(needed / rate / PAGE_SIZE), max_requests - info['requests'])
+            round_info = {}
+            fetched = 0
+            round_end = start + pages * PAGE_SIZE
+            for page in self.iter_books(
+                query, pages * PAGE_SIZE, use_cache, refresh, start, round_info, params
+            ):
+                info['requests'] += 1
+                info['totalItems'] = round_info['totalItems']
+                fetched += len(page)
+                info['matched'] += sum(1 for book in page if filters.matches(book))
+                yield page
+                # Short pages take an extra request each, which counts against the budget too
+                if info['matched'] >= max_results or info['requests'] >= max_requests:
                     break
-                    
-                all_books.extend(data['items'])
-                start_index += len(data['items'])
-                
-                time.sleep(1)  # Rate limiting
-                
-            except requests.exceptions.RequestException as e:
-                print(f"API request failed: {e}")
+            scanned += fetched
+            start += fetched
+            if info['matched'] < max_results and (start < round_end or start >= info.get('totalItems', 0)):
+                # Ran out of results (or a page failed)
                 break
-                
-        return all_books[:max_results]
\ No newline at end of file
+
+    def search_books(
+        self,
+        query: str,
+        max_results: int = 40,
+        use_cache: bool = True,
+        refresh: bool = False,
+        filters: Optional[SearchFilters] = None,
+        max_requests: int = 10
+    ) -> List[Book]:
+        """
+        Search for books using the Google Books API.
+
+        Args:
+            query: Search term
+            max_results: Maximum number of results to return
+            use_cache: Read and write the response cache, if configured
+            refresh: Ignore cached pages and re-fetch them
+            filters: Only return books passing these; pages are over-fetched
+                to find max_results of them, up to max_requests pages
+            max_requests: Page budget when filtering
+
+        Returns:
+            List of Books
+        """
+        if filters is None:
+            all_books = []
+            for page in self.iter_books(query, max_results, use_cache, refresh):
+                all_books.extend(page)
+            return all_books[:max_results]
+
+        matches = []
+        for page in self.iter_matching(query, max_results, filters, max_requests, use_cache, refresh):
+            matches.extend(book for book in page if filters.matches(book))
+        return matches[:max_results]
@@ -0,0 +1,143 @@
+# benchmarks/bench_book_model.py
+"""
+Compare the Book record against the nested-dict path it replaced.
+
+Serializes synthetic volumes as API response pages, then measures, per path:
+
+    parse      response bytes -> per-book objects the app keeps
+    rows       the same, continued to books table rows for DatabaseManager
+    memory     bytes held per book by the parsed objects (tracemalloc)
+
+The dict path is json.loads, copying volumeInfo, merging saleInfo into the
+copy and flattening that again into a row, as search results were handled
+before Book. The Book path decodes with orjson when it is installed.
+
+    python benchmarks/bench_book_model.py --books 100000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import book as book_module
+import synthetic
+from book import Book, parse_year
+
+PAGE_SIZE = 40
+
+
+def dict_row(book_data):
+    """books table row from a merged volumeInfo/saleInfo dict, as before Book"""
+    return {
+        'book_id': book_data.get('id'),
+        'book_title': book_data.get('title'),
+        'book_authors': json.dumps(book_data.get('authors', [])),
+        'publisher': book_data.get('publisher'),
+        'publishedDate': book_data.get('publishedDate'),
+        'description': book_data.get('description'),
+        'isbn': book_data.get('industryIdentifiers', [{}])[0].get('identifier'),
+        'pageCount': book_data.get('pageCount'),
+        'categories': json.dumps(book_data.get('categories', [])),
+        'averageRating': book_data.get('averageRating'),
+        'ratingsCount': book_data.get('ratingsCount'),
+        'maturityRating': book_data.get('maturityRating'),
+        'language': book_data.get('language'),
+        'isEbook': book_data.get('isEbook', False),
+        'saleability': book_data.get('saleability'),
+        'amount_listPrice': book_data.get('listPrice', {}).get('amount'),
+        'amount_retailPrice': book_data.get('retailPrice', {}).get('amount'),
+        'search_key': book_data.get('search_key'),
+        'year': parse_year(book_data.get('publishedDate')),
+        'search_text': ' '.join(book_data.get('authors', []) + book_data.get('categories', [])),
+        'thumbnail': book_data.get('imageLinks', {}).get('thumbnail')
+    }
+
+
+def merged(volume, search_key):
+    book_data = volume['volumeInfo'].copy()
+    book_data['id'] = volume['id']
+    book_data['search_key'] = search_key
+    book_data.update(volume.get('saleInfo', {}))
+    return book_data
+
+
+def parse_dicts(pages):
+    return [volume for body in pages for volume in json.loads(body)['items']]
+
+
+def parse_books(pages):
+    return [Book.from_volume(volume) for body in pages for volume in book_module.loads(body)['items']]
+
+
+def dict_rows(pages):
+    return [dict_row(merged(volume, 'bench')) for volume in parse_dicts(pages)]
+
+
+def book_rows(pages):
+    rows = []
+    for book in parse_books(pages):
+        book.search_key = 'bench'
+        rows.append(book.to_row())
+    return rows
+
+
+def best_of(repeat, func, *args):
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def retained_bytes(func, *args):
+    """Bytes still allocated by func's result once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    volumes = list(synthetic.generate_volumes(args.books, args.seed))
+    pages = [
+        json.dumps({'totalItems': args.books, 'items': volumes[i:i + PAGE_SIZE]}).encode('utf-8')
+        for i in range(0, args.books, PAGE_SIZE)
+    ]
+    del volumes
+    size_mb = sum(len(body) for body in pages) / 1e6
+    decoder = 'orjson' if book_module.loads is not json.loads else 'json'
+    print(f"{args.books} volumes, {len(pages)} pages, {size_mb:.1f} MB of JSON; Book path decodes with {decoder}")
+
+    assert dict_rows(pages[:5]) == book_rows(pages[:5]), "paths disagree on table rows"
+
+    print(f"{'':<8}{'dicts':>14}{'Book':>14}{'':>10}")
+    for name, old, new in (('parse', parse_dicts, parse_books), ('rows', dict_rows, book_rows)):
+        old_rate = args.books / best_of(args.repeat, old, pages)
+        new_rate = args.books / best_of(args.repeat, new, pages)
+        print(f"{name:<8}{old_rate:>10,.0f} /s{new_rate:>10,.0f} /s{new_rate / old_rate:>9.1f}x")
+
+    old_bytes = retained_bytes(parse_dicts, pages) / args.books
+    new_bytes = retained_bytes(parse_books, pages) / args.books
+    print(f"{'memory':<8}{old_bytes:>8,.0f} B/book{new_bytes:>8,.0f} B/book{old_bytes / new_bytes:>9.1f}x less")
+
+
+if __name__ == '__main__':
+    main()
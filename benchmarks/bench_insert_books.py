@@ -0,0 +1,90 @@
+# benchmarks/bench_insert_books.py
+"""
+Compare per-row insert_book against batched insert_books, and writing the
+same books again (unchanged ones are skipped by their content fingerprint).
+
+Writes synthetic volumes under a throwaway search_key and deletes them
+afterwards, with their author/category links, then rebuilds the summary
+tables the writes added to. Uses the DB_* settings from the environment (see configuration.py).
+
+    python benchmarks/bench_insert_books.py --rows 2000 --batch-size 200
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book import Book
+from configuration import DATABASE_CONFIG
+from database_manager import DatabaseManager
+
+
+def make_books(count, search_key):
+    """Build Books like a search would"""
+    books = []
+    for i in range(count):
+        books.append(Book(
+            f"bench-{search_key}-{i}",
+            f"Benchmark Book {i}",
+            authors=(f"Author {i % 97}", f"Author {i % 13}"),
+            publisher="Bench Press",
+            published_date=f"{1950 + i % 75}-01-01",
+            description="Synthetic volume used for insert benchmarks. " * 5,
+            isbn=f"978{i:010d}",
+            page_count=100 + i % 400,
+            categories=(["Fiction", "History", "Science", "Poetry"][i % 4],),
+            average_rating=(i % 50) / 10,
+            ratings_count=i % 5000,
+            maturity_rating="NOT_MATURE",
+            language="en",
+            is_ebook=bool(i % 2),
+            saleability="FOR_SALE" if i % 3 else "FREE",
+            list_price=9.99,
+            retail_price=7.99,
+            search_key=search_key
+        ))
+    return books
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+
+    search_key = f"bench-{uuid.uuid4().hex[:8]}"
+    with DatabaseManager(DATABASE_CONFIG) as db:
+        try:
+            books = make_books(args.rows, search_key + "-row")
+            start = time.perf_counter()
+            for book in books:
+                db.insert_book(book)
+            per_row = args.rows / (time.perf_counter() - start)
+
+            books = make_books(args.rows, search_key + "-batch")
+            start = time.perf_counter()
+            stats = db.insert_books(books, batch_size=args.batch_size)
+            batched = args.rows / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            repeat_stats = db.insert_books(books, batch_size=args.batch_size)
+            repeated = args.rows / (time.perf_counter() - start)
+        finally:
+            db.execute_statements([
+                (f"DELETE FROM {table} WHERE book_id IN (SELECT book_id FROM books WHERE search_key LIKE %s)",
+                 (search_key + '%',))
+                for table in ('book_author', 'book_category')
+            ] + [("DELETE FROM books WHERE search_key LIKE %s", (search_key + '%',))])
+            db.rebuild_summaries()
+
+    print(f"insert_book  (per row):        {per_row:10.1f} rows/sec")
+    print(f"insert_books (batch={args.batch_size}): {batched:10.1f} rows/sec  {stats}")
+    print(f"insert_books (same again):     {repeated:10.1f} rows/sec  {repeat_stats}")
+    print(f"speedup: {batched / per_row:.1f}x batched, {repeated / batched:.1f}x for unchanged rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_query_frame.py
+"""
+Compare the old per-row DataFrame path with frames.to_frame.
+
+No database needed: rows are shaped like execute_query results (JSON
+strings, Decimal prices, 0/1 booleans).
+
+    python benchmarks/bench_query_frame.py --rows 100000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from decimal import Decimal
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frames import join_names, to_frame
+
+
+def make_rows(count):
+    return [
+        {
+            'book_title': f"Book {i}",
+            'book_authors': json.dumps([f"Author {i % 97}", f"Author {i % 13}"]),
+            'categories': json.dumps([["Fiction", "History", "Science", "Poetry"][i % 4]]),
+            'averageRating': (i % 50) / 10,
+            'ratingsCount': i % 5000,
+            'pageCount': 100 + i % 400,
+            'year': 1950 + i % 75,
+            'language': ["en", "fr", "de"][i % 3],
+            'saleability': "FOR_SALE" if i % 3 else "FREE",
+            'amount_retailPrice': Decimal('7.99'),
+            'isEbook': i % 2,
+        }
+        for i in range(count)
+    ]
+
+
+def old_path(rows):
+    df = pd.DataFrame(rows)
+    df['book_authors'] = df['book_authors'].apply(lambda x: ', '.join(json.loads(x)))
+    df['categories'] = df['categories'].apply(lambda x: ', '.join(json.loads(x)))
+    return df
+
+
+def new_path(rows):
+    df = to_frame(rows)
+    df['book_authors'] = join_names(df['book_authors'])
+    df['categories'] = join_names(df['categories'])
+    return df
+
+
+def best_of(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings), df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    old_time, old_df = best_of(old_path, rows, args.repeat)
+    new_time, new_df = best_of(new_path, rows, args.repeat)
+
+    print(f"rows: {args.rows}")
+    print(f"DataFrame + apply(json.loads): {old_time * 1000:8.1f} ms  {old_df.memory_usage(deep=True).sum() / 1e6:7.1f} MB")
+    print(f"frames.to_frame:               {new_time * 1000:8.1f} ms  {new_df.memory_usage(deep=True).sum() / 1e6:7.1f} MB")
+    print(f"speedup: {old_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
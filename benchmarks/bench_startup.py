@@ -0,0 +1,152 @@
+# benchmarks/bench_startup.py
+"""
+Cold start and rerun timings of the Streamlit app, per page.
+
+    import   importing app.py in a fresh interpreter (after streamlit itself),
+             and which heavy libraries that pulls in
+    first    the first run of the script in a fresh process, showing one page:
+             imports, process-wide resources and the page's first render
+    rerun    later runs of the same page, as on every widget interaction
+
+Every page gets its own process, driven by streamlit.testing's AppTest
+against a scratch SQLite catalog, with the response and thumbnail caches in
+the same scratch directory. Nothing is fetched from Google Books.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --catalog 5000 --reruns 10 --pages "Genre Explorer"
+
+run_benchmarks.py --scenarios startup records the same numbers, so they can
+be compared against a baseline run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ["Search Books", "Analytics Dashboard", "Trending Books", "Genre Explorer", "Performance"]
+# Libraries that dominate import time; a page that does not need them should not load them
+HEAVY_MODULES = ['pandas', 'numpy', 'plotly.express', 'pyarrow', 'PIL', 'mysql.connector', 'requests']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit
+streamlit_seconds = time.perf_counter() - start
+start = time.perf_counter()
+import app
+print(json.dumps({
+    'streamlit_seconds': streamlit_seconds,
+    'app_seconds': time.perf_counter() - start,
+    'loaded': [name for name in %r if name in sys.modules]
+}))
+"""
+
+
+def scratch_environment(scratch, catalog, seed=0):
+    """Write a SQLite catalog into scratch; returns the environment that points child processes at it"""
+    import synthetic
+    from book import Book
+    from database_manager import DatabaseManager
+
+    path = os.path.join(scratch, 'catalog.sqlite')
+    with DatabaseManager({'backend': 'sqlite', 'path': path}) as db:
+        db.insert_books(Book.from_volume(volume, 'synthetic') for volume in synthetic.generate_volumes(catalog, seed))
+    return {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join([ROOT, os.path.join(ROOT, 'benchmarks')]),
+        'DB_BACKEND': 'sqlite',
+        'SQLITE_PATH': path,
+        'GOOGLE_BOOKS_API_KEY': 'benchmark',
+        'GOOGLE_BOOKS_CACHE_PATH': os.path.join(scratch, 'google_books.sqlite'),
+        'THUMBNAIL_CACHE_PATH': os.path.join(scratch, 'thumbnails.sqlite'),
+        'METRICS_PORT': '0',
+        'REFRESH_REQUESTS_PER_HOUR': '0'
+    }
+
+
+def run_child(args, env):
+    result = subprocess.run(args, env=env, cwd=env['PYTHONPATH'].split(os.pathsep)[0],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def time_page(page, reruns):
+    """In this process: first run of app.py showing page, then reruns; seconds"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    at.session_state['page'] = page
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    return {'first_seconds': first, 'rerun_seconds': timings}
+
+
+def measure(pages=PAGES, catalog=2000, reruns=5, repeat=3, seed=0):
+    """Import, first render and rerun timings for each page, each page in fresh processes"""
+    from run_benchmarks import summarize
+
+    with tempfile.TemporaryDirectory() as scratch:
+        env = scratch_environment(scratch, catalog, seed)
+        imports = [run_child([sys.executable, '-c', IMPORT_SCRIPT % (HEAVY_MODULES,)], env) for _ in range(repeat)]
+        results = {
+            'catalog': catalog,
+            'import': {
+                'streamlit': summarize([run['streamlit_seconds'] for run in imports]),
+                'app': summarize([run['app_seconds'] for run in imports]),
+                'loaded': imports[0]['loaded']
+            },
+            'pages': {}
+        }
+        for page in pages:
+            runs = [
+                run_child([sys.executable, os.path.abspath(__file__), '--child', page, '--reruns', str(reruns)], env)
+                for _ in range(repeat)
+            ]
+            results['pages'][page] = {
+                'first': summarize([run['first_seconds'] for run in runs]),
+                'rerun': summarize([seconds for run in runs for seconds in run['rerun_seconds']])
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time app.py imports, first render and reruns per page")
+    parser.add_argument('--pages', nargs='+', choices=PAGES, default=PAGES)
+    parser.add_argument('--catalog', type=int, default=2000, help="synthetic books in the scratch catalog")
+    parser.add_argument('--reruns', type=int, default=5, help="reruns timed per process")
+    parser.add_argument('--repeat', type=int, default=3, help="fresh processes per page")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(time_page(args.child, args.reruns)))
+        return 0
+
+    results = measure(args.pages, args.catalog, args.reruns, args.repeat, args.seed)
+    imports = results['import']
+    print(f"import streamlit {imports['streamlit']['p50_ms']:8.0f} ms")
+    print(f"import app       {imports['app']['p50_ms']:8.0f} ms   loads {', '.join(imports['loaded']) or 'nothing heavy'}")
+    print(f"{'page':<22}{'first p50':>12}{'rerun p50':>12}{'rerun p95':>12}")
+    for page, timings in results['pages'].items():
+        print(f"{page:<22}{timings['first']['p50_ms']:>9.0f} ms{timings['rerun']['p50_ms']:>9.0f} ms"
+              f"{timings['rerun']['p95_ms']:>9.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
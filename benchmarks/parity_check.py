@@ -0,0 +1,217 @@
+# benchmarks/parity_check.py
+"""
+Check that the storage backends give the same answers.
+
+Loads one synthetic catalog into each backend, re-upserts part of it with
+changed fields (so summary deltas for updates are exercised too), then
+compares every dashboard query, full keyset walks of the genre pages and a
+stored search round-trip. Each backend's incrementally maintained summary
+tables are also checked against a rebuild from scratch.
+
+    python benchmarks/parity_check.py --books 20000
+    python benchmarks/parity_check.py --backends sqlite
+
+The mysql backend uses the DB_* settings (see configuration.py); point them
+at a scratch database, the catalog's rows are written to it. Catalog search
+ranks with different scoring functions (MySQL FULLTEXT vs SQLite bm25), so
+its overlap is reported but not checked. Exit status is 1 on any mismatch.
+The same checks run under pytest in tests/test_storage_parity.py.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from collections import Counter
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import queries
+import synthetic
+from book import Book
+from database_manager import DatabaseManager
+from summaries import SUMMARY_COLUMNS
+
+# Columns that decide each query's order; rows tied on them may come back
+# in any order, and a LIMIT may cut a tie at a different row
+ORDER_COLUMNS = {
+    'top_rated_books': ['averageRating'],
+    'price_distribution': ['amount_retailPrice'],
+    'trending_books_all_time': ['ratingsCount'],
+    'trending_books_last_year': ['ratingsCount'],
+    'trending_books_last_5_years': ['ratingsCount'],
+    'genre_distribution': ['count'],
+    'top_authors_all_time': ['total_ratings'],
+    'top_authors_last_year': ['total_ratings'],
+    'top_authors_last_5_years': ['total_ratings'],
+    'genre_books': ['averageRating']
+}
+SEARCH_KEY = 'parity'
+
+
+def normalize(value):
+    """Comparable form of a column value, whichever driver returned it"""
+    if isinstance(value, (Decimal, float)):
+        return round(float(value), 4)
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8')
+    if isinstance(value, str) and value[:1] in '[{':
+        try:
+            return json.dumps(json.loads(value), sort_keys=True)
+        except ValueError:
+            pass
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def normalize_rows(rows, columns=None):
+    return [tuple(normalize(row[col]) for col in (columns or sorted(row))) for row in rows]
+
+
+def load(db, args):
+    """Write the catalog, then rewrite every tenth book with new ratings and categories"""
+    books = (Book.from_volume(volume, SEARCH_KEY) for volume in synthetic.generate_volumes(args.books, args.seed))
+    counts = {'load': db.insert_books(books, batch_size=args.batch_size)}
+
+    changed = []
+    for index in range(0, args.books, 10):
+        volume = synthetic.make_volume(index, args.seed, catalog_size=args.books)
+        info = volume['volumeInfo']
+        info['averageRating'] = 1.0 + index % 9 / 2
+        info['ratingsCount'] = index % 5000
+        info['categories'] = [synthetic.CATEGORIES[index % len(synthetic.CATEGORIES)]]
+        changed.append(Book.from_volume(volume, SEARCH_KEY))
+    counts['update'] = db.insert_books(changed, batch_size=args.batch_size)
+    db.insert_book(changed[0])
+    return counts
+
+
+def snapshot(db, args):
+    """Everything the comparison looks at, read from one backend"""
+    results = {'counts': load(db, args), 'queries': {}, 'pages': {}}
+    for name, (sql, params) in queries.dashboard_queries().items():
+        if name == 'genre_books_page':
+            continue
+        rows = db.execute_query(sql, params, use_cache=False)
+        results['queries'][name] = rows
+
+    for genre in [row['category'] for row in db.execute_query(queries.GENRE_LIST, use_cache=False)][:5]:
+        walked, after = [], None
+        while True:
+            rows, after = db.keyset_page(
+                queries.GENRE_BOOKS_PAGE, (genre,), queries.GENRE_BOOKS_KEY, after, page_size=args.page_size
+            )
+            walked.extend(row['book_id'] for row in rows)
+            if after is None:
+                break
+        results['pages'][genre] = walked
+
+    ids = [synthetic.volume_id(i, args.seed) for i in range(0, min(args.books, 40))]
+    db.record_search(SEARCH_KEY, 0, ids, args.books)
+    total, rows = db.stored_search(SEARCH_KEY.upper(), 40, 3600)
+    results['stored_search'] = (total, [row['book_id'] for row in rows])
+
+    results['summaries'] = {}
+    for table, (key, columns) in SUMMARY_COLUMNS.items():
+        results['summaries'][table] = summary_rows(db, table, key, columns)
+    db.rebuild_summaries()
+    results['rebuilt'] = {
+        table: summary_rows(db, table, key, columns) for table, (key, columns) in SUMMARY_COLUMNS.items()
+    }
+
+    results['search'] = {
+        text: [row['book_id'] for row in db.search_catalog(text, 20)]
+        for text in ('history', 'garden river', 'Mary Smith')
+    }
+    return results
+
+
+def summary_rows(db, table, key, columns):
+    rows = db.execute_query(f"SELECT {key}, {', '.join(columns)} FROM {table} WHERE book_count > 0", use_cache=False)
+    # Keys compare case-insensitively in both backends
+    return sorted((str(row[key]).casefold(), *(normalize(row[col]) for col in columns)) for row in rows)
+
+
+def compare(name, a, b, problems):
+    if a != b:
+        problems.append(name)
+        print(f"MISMATCH {name}")
+    else:
+        print(f"ok       {name}")
+
+
+def same_results(name, a, b):
+    """
+    'exact' if two backends' rows for dashboard query name match as
+    multisets, 'ties' if only the order columns match in order (the query
+    can cut ties differently), else None.
+    """
+    if Counter(normalize_rows(a)) == Counter(normalize_rows(b)):
+        return 'exact'
+    columns = ORDER_COLUMNS.get(name)
+    if columns and normalize_rows(a, columns) == normalize_rows(b, columns):
+        return 'ties'
+    return None
+
+
+def compare_query(name, a, b, problems):
+    match = same_results(name, a, b)
+    if match == 'exact':
+        print(f"ok       {name} ({len(a)} rows)")
+    elif match == 'ties':
+        print(f"ok       {name} ({len(a)} rows, ties ordered differently)")
+    else:
+        problems.append(name)
+        print(f"MISMATCH {name} ({len(a)} vs {len(b)} rows)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare query results between storage backends")
+    parser.add_argument('--backends', nargs='+', choices=['mysql', 'sqlite'], default=['mysql', 'sqlite'])
+    parser.add_argument('--books', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--sqlite-path', help="SQLite database file (default: a new temporary file)")
+    args = parser.parse_args()
+
+    snapshots = {}
+    problems = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for backend in args.backends:
+            if backend == 'sqlite':
+                config = {'backend': 'sqlite', 'path': args.sqlite_path or os.path.join(scratch, 'parity.sqlite')}
+            else:
+                from configuration import DATABASE_CONFIG
+                config = DATABASE_CONFIG
+            print(f"Loading {args.books} books into {backend}...")
+            with DatabaseManager(config) as db:
+                snapshots[backend] = snapshot(db, args)
+            for table, rows in snapshots[backend]['summaries'].items():
+                compare(f"{backend}: incremental {table} == rebuilt", rows, snapshots[backend]['rebuilt'][table], problems)
+
+    first, *others = args.backends
+    for other in others:
+        a, b = snapshots[first], snapshots[other]
+        print(f"\n{first} vs {other}")
+        compare('insert counts', a['counts'], b['counts'], problems)
+        for name in a['queries']:
+            compare_query(name, a['queries'][name], b['queries'][name], problems)
+        for genre in a['pages']:
+            compare(f"keyset walk {genre}", a['pages'][genre], b['pages'].get(genre), problems)
+        compare('stored search', a['stored_search'], b['stored_search'], problems)
+        for table in a['summaries']:
+            compare(table, a['summaries'][table], b['summaries'][table], problems)
+        for text in a['search']:
+            found_a, found_b = set(a['search'][text]), set(b['search'][text])
+            overlap = len(found_a & found_b) / max(len(found_a | found_b), 1)
+            print(f"info     catalog search {text!r}: {overlap:.0%} of top 20 in common")
+
+    print(f"\n{len(problems)} mismatch(es)" if problems else "\nAll checks passed")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
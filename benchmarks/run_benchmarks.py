@@ -0,0 +1,429 @@
+# benchmarks/run_benchmarks.py
+"""
+Scripted performance scenarios with machine-readable results.
+
+    ingest     per-row DatabaseManager.insert_book throughput (rows are deleted afterwards)
+    search     GoogleBooksAPI.search_books latency against the stub server
+    filtered   matches found and requests spent by filtered searches, one page
+               filtered client-side vs filters pushed down plus adaptive over-fetch
+    thumbnails ThumbnailCache cold and warm prefetch of result covers from the stub server
+    crawl      crawler.py throughput against the stub server, into a scratch SQLite database
+    dashboard  latency of every query behind the Analytics, Trending and Genre pages
+    startup    app.py import time, and first render and rerun time of each page,
+               in fresh processes against a scratch SQLite catalog (bench_startup.py)
+    load       bulk-load a synthetic catalog with insert_books, to size the database
+               for dashboard runs (rows are kept; re-running upserts the same ids)
+
+ingest, load and dashboard need MySQL (DB_* settings, see configuration.py);
+point them at a scratch database. search, filtered, thumbnails, crawl and startup need
+nothing but this directory.
+
+    python benchmarks/run_benchmarks.py --scenarios search dashboard
+    python benchmarks/run_benchmarks.py --scenarios load dashboard --catalog 1000000
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/previous.json
+
+Results go to benchmarks/results/<timestamp>.json. With --baseline, p50
+latencies and throughputs are compared against an earlier run and the exit
+status is 1 if any got worse by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import queries
+import synthetic
+from api_handler import GoogleBooksAPI, SearchFilters
+from book import Book
+from crawler import Crawler, CrawlCheckpoint
+from database_manager import DatabaseManager
+from stub_server import StubServer
+from thumbnail_cache import ThumbnailCache
+
+SCENARIOS = ['load', 'ingest', 'search', 'filtered', 'thumbnails', 'crawl', 'dashboard', 'startup']
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def summarize(timings):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    ordered = sorted(timings)
+    if not ordered:
+        return {'count': 0}
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': ordered[-1] * 1000
+    }
+
+
+def open_database():
+    from configuration import DATABASE_CONFIG
+    from database_manager import DatabaseManager
+    return DatabaseManager(DATABASE_CONFIG)
+
+
+def run_load(args):
+    """Bulk-load args.catalog synthetic books through insert_books"""
+    with open_database() as db:
+        books = (Book.from_volume(volume, 'synthetic')
+                 for volume in synthetic.generate_volumes(args.catalog, args.seed))
+        start = time.perf_counter()
+        counts = db.insert_books(books, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+    return {
+        'books': args.catalog,
+        'batch_size': args.batch_size,
+        'seconds': elapsed,
+        'rows_per_sec': args.catalog / elapsed,
+        **counts
+    }
+
+
+def run_ingest(args):
+    """Time insert_book one row at a time, then remove the rows again"""
+    search_key = f"bench-{uuid.uuid4().hex[:8]}"
+    # A seed of their own keeps these ids clear of a loaded catalog
+    volumes = [synthetic.make_volume(i, seed=args.seed + 1, catalog_size=args.books) for i in range(args.books)]
+    books = [Book.from_volume(volume, search_key) for volume in volumes]
+    timings = []
+    with open_database() as db:
+        try:
+            start = time.perf_counter()
+            for book in books:
+                began = time.perf_counter()
+                db.insert_book(book)
+                timings.append(time.perf_counter() - began)
+            elapsed = time.perf_counter() - start
+        finally:
+            db.execute_statements([
+                (f"DELETE FROM {table} WHERE book_id IN (SELECT book_id FROM books WHERE search_key = %s)",
+                 (search_key,))
+                for table in ('book_author', 'book_category')
+            ] + [("DELETE FROM books WHERE search_key = %s", (search_key,))])
+            db.rebuild_summaries()
+    return {
+        'books': args.books,
+        'seconds': elapsed,
+        'rows_per_sec': args.books / elapsed,
+        'latency': summarize(timings)
+    }
+
+
+def run_search(args):
+    """Time search_books for distinct queries against a local stub server"""
+    server = StubServer(
+        total_items=args.total_items,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        jitter=args.jitter
+    ).start()
+    try:
+        api = GoogleBooksAPI(
+            'benchmark',
+            base_url=server.base_url,
+            rate_limit=args.rate_limit,
+            rate_burst=args.rate_limit,
+            backoff=0.01
+        )
+        timings = []
+        books = 0
+        start = time.perf_counter()
+        for i in range(args.searches):
+            began = time.perf_counter()
+            books += len(api.search_books(f"query {i}", args.max_results, use_cache=False))
+            timings.append(time.perf_counter() - began)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        'searches': args.searches,
+        'max_results': args.max_results,
+        'books': books,
+        'stub_latency': args.latency,
+        'stub_error_rate': args.error_rate,
+        'http_requests': server.requests,
+        'throttled': server.throttled,
+        'searches_per_sec': args.searches / elapsed,
+        'latency': summarize(timings)
+    }
+
+
+def run_filtered(args):
+    """
+    Ask for args.max_results eBooks rated 4 or more, per query: once as the
+    old page did (one page, filtered afterwards), once with the eBook filter
+    sent to the API and pages over-fetched up to args.max_requests
+    """
+    server = StubServer(total_items=args.total_items, latency=args.latency).start()
+    filters = SearchFilters(min_rating=4.0, ebook_only=True)
+    results = {}
+    try:
+        api = GoogleBooksAPI('benchmark', base_url=server.base_url, rate_limit=args.rate_limit,
+                             rate_burst=args.rate_limit)
+        for mode in ('single_page', 'pushdown'):
+            requests_before = server.requests
+            timings = []
+            matches = 0
+            for i in range(args.searches):
+                began = time.perf_counter()
+                if mode == 'single_page':
+                    books = [book for book in api.search_books(f"query {i}", args.max_results, use_cache=False)
+                             if filters.matches(book)]
+                else:
+                    books = api.search_books(f"query {i}", args.max_results, use_cache=False,
+                                             filters=filters, max_requests=args.max_requests)
+                timings.append(time.perf_counter() - began)
+                matches += len(books)
+            requests = server.requests - requests_before
+            results[mode] = {
+                'matches_per_search': matches / args.searches,
+                'fill_rate': matches / (args.searches * args.max_results),
+                'requests_per_search': requests / args.searches,
+                'matches_per_request': matches / requests if requests else 0.0,
+                'latency': summarize(timings)
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        'searches': args.searches,
+        'max_results': args.max_results,
+        'max_requests': args.max_requests,
+        'stub_latency': args.latency,
+        **results
+    }
+
+
+def run_thumbnails(args):
+    """
+    Prefetch the covers of args.searches result sets three times: cold, warm
+    in the same process, and warm from disk in a new cache object (as after
+    a restart)
+    """
+    server = StubServer(total_items=args.total_items, image_latency=args.latency).start()
+    try:
+        api = GoogleBooksAPI('benchmark', base_url=server.base_url, rate_limit=args.rate_limit,
+                             rate_burst=args.rate_limit)
+        result_sets = [
+            [book.thumbnail
+             for book in api.search_books(f"query {i}", args.max_results, use_cache=False)
+             if book.thumbnail]
+            for i in range(args.searches)
+        ]
+        with tempfile.TemporaryDirectory() as scratch:
+            path = os.path.join(scratch, 'thumbnails.sqlite')
+            results = {}
+            thumbnails = ThumbnailCache(path)
+            for run in ('cold', 'warm', 'restart'):
+                if run == 'restart':
+                    thumbnails = ThumbnailCache(path)
+                fetched_before = server.image_requests
+                timings = []
+                for urls in result_sets:
+                    began = time.perf_counter()
+                    thumbnails.prefetch(urls)
+                    timings.append(time.perf_counter() - began)
+                results[run] = {
+                    'image_requests': server.image_requests - fetched_before,
+                    'latency': summarize(timings)
+                }
+            stats = thumbnails.stats()
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        'result_sets': args.searches,
+        'covers': sum(len(urls) for urls in result_sets),
+        'stub_latency': args.latency,
+        'disk_bytes': stats['disk_bytes'],
+        'downscaling': stats['downscaling'],
+        **results
+    }
+
+
+def run_crawl(args):
+    """Crawl args.searches seed queries, args.max_results results each, from a stub server"""
+    server = StubServer(total_items=args.total_items, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate).start()
+    try:
+        api = GoogleBooksAPI('benchmark', base_url=server.base_url, rate_limit=args.rate_limit,
+                             rate_burst=args.rate_limit, max_workers=args.concurrency, backoff=0.01)
+        with tempfile.TemporaryDirectory() as scratch:
+            with DatabaseManager({'backend': 'sqlite', 'path': os.path.join(scratch, 'crawl.sqlite')}) as db:
+                crawler = Crawler(
+                    api, db, CrawlCheckpoint(os.path.join(scratch, 'crawl.json')),
+                    concurrency=args.concurrency,
+                    max_requests=args.searches * args.max_results,
+                    max_per_query=args.max_results,
+                    batch_size=args.batch_size
+                )
+                stats = crawler.run([f"query {i}" for i in range(args.searches)])
+    finally:
+        server.shutdown()
+        server.server_close()
+    return {
+        'queries': args.searches,
+        'max_per_query': args.max_results,
+        'concurrency': args.concurrency,
+        'stub_latency': args.latency,
+        'http_requests': server.requests,
+        'throttled': server.throttled,
+        'pages_per_sec': stats['pages'] / stats['seconds'],
+        'books_per_sec': stats['books'] / stats['seconds'],
+        **stats
+    }
+
+
+def run_dashboard(args):
+    """Time every dashboard query, bypassing the query cache"""
+    results = {}
+    with open_database() as db:
+        books = db.execute_query("SELECT COUNT(*) as count FROM books", use_cache=False)[0]['count']
+        for name, (sql, params) in queries.dashboard_queries().items():
+            timings = []
+            for _ in range(args.repeat):
+                began = time.perf_counter()
+                db.query_frame(sql, params, use_cache=False)
+                timings.append(time.perf_counter() - began)
+            results[name] = summarize(timings)
+    return {'books': books, 'repeat': args.repeat, 'queries': results}
+
+
+def run_startup(args):
+    """Time app.py's imports and each page's first render and reruns; see bench_startup.py"""
+    import bench_startup
+    return bench_startup.measure(catalog=args.catalog, reruns=args.repeat, seed=args.seed)
+
+
+RUNNERS = {
+    'load': run_load,
+    'ingest': run_ingest,
+    'search': run_search,
+    'filtered': run_filtered,
+    'thumbnails': run_thumbnails,
+    'crawl': run_crawl,
+    'dashboard': run_dashboard,
+    'startup': run_startup
+}
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metrics(result, prefix=''):
+    """Flatten a result into {name: (value, higher_is_better)} for comparison"""
+    found = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            found.update(metrics(value, name + '.'))
+        elif key == 'p50_ms':
+            found[name] = (value, False)
+        elif key.endswith('_per_sec'):
+            found[name] = (value, True)
+    return found
+
+
+def compare(results, baseline, tolerance):
+    """Print changes against a baseline run; returns the names that regressed"""
+    regressions = []
+    for scenario, result in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if not previous or 'error' in result or 'error' in previous:
+            continue
+        old = metrics(previous)
+        for name, (value, higher_is_better) in metrics(result).items():
+            if name not in old or not old[name][0]:
+                continue
+            change = value / old[name][0] - 1
+            worse = -change if higher_is_better else change
+            flag = 'REGRESSION' if worse > tolerance else ''
+            print(f"{scenario + '.' + name:<60} {old[name][0]:>12.2f} -> {value:>12.2f}  {change:+7.1%} {flag}")
+            if flag:
+                regressions.append(f"{scenario}.{name}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run BookScape benchmark scenarios")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=['ingest', 'search', 'dashboard'])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--catalog', type=int, default=10000, help="books written by the load scenario")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--books', type=int, default=1000, help="books written by the ingest scenario")
+    parser.add_argument('--searches', type=int, default=50)
+    parser.add_argument('--max-results', type=int, default=40)
+    parser.add_argument('--max-requests', type=int, default=10, help="page budget per filtered search")
+    parser.add_argument('--concurrency', type=int, default=8, help="pages in flight in the crawl scenario")
+    parser.add_argument('--total-items', type=int, default=1000, help="totalItems reported by the stub server")
+    parser.add_argument('--latency', type=float, default=0.05, help="stub server response latency in seconds (API and covers)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random stub latency, up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of stub responses that are 429")
+    parser.add_argument('--rate-limit', type=float, default=100.0, help="client requests per second")
+    parser.add_argument('--repeat', type=int, default=5, help="runs of each dashboard query, or reruns of each page")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier result file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before flagging, e.g. 0.2 = 20%%")
+    args = parser.parse_args()
+
+    started = datetime.now(timezone.utc)
+    results = {
+        'started_at': started.isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'args': vars(args),
+        'scenarios': {}
+    }
+    failed = False
+    for scenario in (name for name in SCENARIOS if name in args.scenarios):
+        print(f"Running {scenario}...")
+        try:
+            results['scenarios'][scenario] = RUNNERS[scenario](args)
+        except Exception as e:
+            print(f"Scenario {scenario} failed: {e}")
+            results['scenarios'][scenario] = {'error': str(e)}
+            failed = True
+
+    output = args.output or os.path.join(RESULTS_DIR, started.strftime('%Y%m%dT%H%M%SZ') + '.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
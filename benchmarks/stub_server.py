@@ -0,0 +1,212 @@
+# benchmarks/stub_server.py
+"""
+Local stand-in for the Google Books /books/v1/volumes endpoint.
+
+Serves deterministic synthetic volumes (see synthetic.py) for any query, honours startIndex/maxResults
+paging and the filter (ebooks, free-ebooks), printType and langRestrict
+parameters, and can inject latency, 429 responses and short pages (fewer
+items than maxResults, as Google Books sometimes returns before the last
+page), so GoogleBooksAPI can be exercised without network access or quota. The fields parameter is ignored;
+full volumes are always returned. Cover thumbnails are served too,
+at /books/content, and the volumes' imageLinks point there:
+
+    python benchmarks/stub_server.py --port 8765 --latency 0.05 --error-rate 0.1
+
+then point GoogleBooksAPI(base_url="http://127.0.0.1:8765/books/v1/volumes").
+"""
+import argparse
+import json
+import random
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import synthetic
+
+
+def make_volume(query, index, total_items=1000):
+    """Build result number index for query; each query gets its own synthetic catalog"""
+    return synthetic.make_volume(index, seed=zlib.crc32(query.encode('utf-8')), catalog_size=total_items)
+
+
+GOOGLE_IMAGE_BASE = 'http://books.google.com/books/content'
+FILTER_PARAMS = ('filter', 'printType', 'langRestrict')
+
+
+def passes(volume, filters):
+    """Whether a volume passes the request's filter parameters"""
+    info, sale = volume['volumeInfo'], volume['saleInfo']
+    kind = filters.get('filter')
+    if kind == 'free-ebooks' and sale['saleability'] != 'FREE':
+        return False
+    if kind == 'ebooks' and not sale['isEbook']:
+        return False
+    print_type = filters.get('printType', 'all')
+    if print_type != 'all' and info['printType'] != print_type[:-1].upper():
+        return False
+    if 'langRestrict' in filters and info['language'] != filters['langRestrict']:
+        return False
+    return True
+
+
+def make_cover(volume_id, width=256, height=384):
+    """A solid-colour PNG cover, coloured by volume id, at roughly the size of a real large thumbnail"""
+    colour = zlib.crc32(volume_id.encode('utf-8')).to_bytes(4, 'big')[:3]
+    raw = (b'\x00' + colour * width) * height
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw))
+            + chunk(b'IEND', b''))
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler; behaviour is configured on the server instance"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/books/content':
+            self.send_cover(parse_qs(url.query).get('id', [''])[0])
+            return
+        if url.path != '/books/v1/volumes':
+            self.send_error(404)
+            return
+
+        server = self.server
+        throttle = bool(server.error_rate) and random.random() < server.error_rate
+        with server.lock:
+            server.requests += 1
+            if server.throttle_next:
+                server.throttle_next -= 1
+                throttle = True
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+        if throttle:
+            with server.lock:
+                server.throttled += 1
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+            self.end_headers()
+            return
+
+        params = parse_qs(url.query)
+        query = params.get('q', [''])[0]
+        start = int(params.get('startIndex', ['0'])[0])
+        count = min(int(params.get('maxResults', ['10'])[0]), 40, server.page_items)
+        filters = {name: params[name][0] for name in FILTER_PARAMS if name in params}
+        indices = server.matching(query, filters)
+        end = min(start + count, len(indices))
+
+        payload = {'kind': 'books#volumes', 'totalItems': len(indices)}
+        if start < end:
+            payload['items'] = [make_volume(query, i, server.total_items) for i in indices[start:end]]
+            for item in payload['items']:
+                links = item['volumeInfo'].get('imageLinks', {})
+                for size, link in links.items():
+                    links[size] = link.replace(GOOGLE_IMAGE_BASE, server.image_base)
+        body = json.dumps(payload).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_cover(self, volume_id):
+        server = self.server
+        with server.lock:
+            server.image_requests += 1
+        if server.image_latency:
+            time.sleep(server.image_latency)
+        if not volume_id:
+            self.send_error(404)
+            return
+        body = make_cover(volume_id)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded stub server that counts the requests it has served"""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, total_items=1000, latency=0.0, error_rate=0.0, jitter=0.0, image_latency=0.0,
+                 page_items=40, retry_after=0):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.total_items = total_items
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.image_latency = image_latency
+        self.page_items = page_items
+        self.retry_after = retry_after
+        self.throttle_next = 0  # this many next requests are answered with 429
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.image_requests = 0
+        self._matching = {}
+
+    def matching(self, query, filters):
+        """Catalog positions of query's volumes that pass filters"""
+        if not filters:
+            return range(self.total_items)
+        key = (query, tuple(sorted(filters.items())))
+        with self.lock:
+            indices = self._matching.get(key)
+        if indices is None:
+            indices = [
+                i for i in range(self.total_items)
+                if passes(make_volume(query, i, self.total_items), filters)
+            ]
+            with self.lock:
+                self._matching[key] = indices
+        return indices
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/books/v1/volumes"
+
+    @property
+    def image_base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/books/content"
+
+    def start(self):
+        """Serve from a background thread and return self"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Google Books volumes server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--total-items', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra seconds, at random")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument('--image-latency', type=float, default=0.0, help="seconds added to every thumbnail response")
+    parser.add_argument('--page-items', type=int, default=40, help="most items per page, to mimic short pages")
+    parser.add_argument('--retry-after', type=int, default=0, help="Retry-After seconds sent with 429 responses")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.total_items, args.latency, args.error_rate, args.jitter, args.image_latency,
+                        args.page_items, args.retry_after)
+    print(f"Serving {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
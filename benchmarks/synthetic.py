@@ -0,0 +1,188 @@
+# benchmarks/synthetic.py
+"""
+Synthetic Google Books catalog.
+
+Volumes are shaped like real /books/v1/volumes resources, with skewed
+author, publisher and category popularity, long-tailed rating counts,
+mixed publishedDate precision and the optional fields real results leave
+out. Each volume depends only on (seed, index), so any slice of a
+10M-book catalog can be produced without generating what comes before:
+
+    python benchmarks/synthetic.py --books 10000000 --out catalog.jsonl.gz
+"""
+import argparse
+import gzip
+import json
+import random
+import sys
+
+CATEGORIES = [
+    "Fiction", "Juvenile Fiction", "History", "Biography & Autobiography", "Religion",
+    "Social Science", "Business & Economics", "Science", "Computers", "Medical",
+    "Education", "Literary Criticism", "Poetry", "Philosophy", "Psychology",
+    "Political Science", "Art", "Cooking", "Health & Fitness", "Travel",
+    "Self-Help", "Language Arts & Disciplines", "Mathematics", "Technology & Engineering",
+    "Music", "Sports & Recreation", "Drama", "Comics & Graphic Novels", "Juvenile Nonfiction", "Law"
+]
+LANGUAGES = ['en'] * 70 + ['es'] * 6 + ['fr'] * 5 + ['de'] * 5 + ['pt'] * 3 + ['it'] * 3 + \
+    ['ja'] * 2 + ['ru'] * 2 + ['zh-CN'] * 2 + ['hi'] * 2
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Susan", "Richard", "Jessica", "Joseph", "Sarah", "Thomas", "Karen", "Charles", "Lisa",
+    "Ana", "Luis", "Sofia", "Hiroshi", "Yuki", "Priya", "Arjun", "Olga", "Ivan", "Mei"
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+    "Tanaka", "Sato", "Sharma", "Patel", "Ivanova", "Petrov", "Dubois", "Rossi", "Muller", "Wang"
+]
+WORDS = (
+    "the of and a history guide art life world new story war love science introduction handbook "
+    "modern theory practice city house secret last night river light dark time children American "
+    "english garden power mind study journey field road voices memory dream empire sea stone fire"
+).split()
+# Descriptions are slices of one pre-generated text, which keeps 10M volumes affordable
+_corpus_rng = random.Random(0)
+DESCRIPTION_CORPUS = ' '.join(
+    ' '.join(_corpus_rng.choices(WORDS, k=_corpus_rng.randint(6, 18))).capitalize() + '.'
+    for _ in range(2000)
+)
+SALEABILITY = ['NOT_FOR_SALE'] * 60 + ['FOR_SALE'] * 30 + ['FREE'] * 7 + ['FOR_PREORDER'] * 3
+
+ID_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+ID_SPACE = 64 ** 12
+ID_MULTIPLIER = 0x5DEECE66D  # odd, so index -> id is a bijection
+ID_OFFSET = 0x2F6B1C93A7D
+
+def volume_id(index, seed=0):
+    """12-character id like the real API's; distinct for every index under one seed"""
+    n = (index * ID_MULTIPLIER + seed + ID_OFFSET) % ID_SPACE
+    chars = []
+    for _ in range(12):
+        n, digit = divmod(n, 64)
+        chars.append(ID_ALPHABET[digit])
+    return ''.join(chars)
+
+
+def _zipf(rng, size, flatten=1.0):
+    """Rank in [0, size) with roughly 1/rank popularity; flatten < 1 thins out the head"""
+    return min(int(size ** (rng.random() ** flatten)) - 1, size - 1)
+
+
+def _title(rng):
+    title = ' '.join(rng.choices(WORDS, k=rng.randint(1, 6))).capitalize()
+    if rng.random() < 0.2:
+        title += ': ' + ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))).capitalize()
+    return title
+
+
+def _author(rank):
+    return (f"{FIRST_NAMES[rank % len(FIRST_NAMES)]} "
+            f"{LAST_NAMES[rank // len(FIRST_NAMES) % len(LAST_NAMES)]}"
+            + (f" {rank // 900}" if rank >= 900 else ""))
+
+
+def _published_date(rng):
+    year = max(1800, 2025 - int(abs(rng.gauss(0, 25))))
+    shape = rng.random()
+    if shape < 0.4:
+        return str(year)
+    if shape < 0.55:
+        return f"{year}-{rng.randint(1, 12):02d}"
+    return f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def make_volume(index, seed=0, catalog_size=1000000):
+    """
+    Build volume number index of a synthetic catalog.
+
+    catalog_size scales the author and publisher pools (about one author
+    per four books), so popularity skew looks the same at every scale.
+    """
+    rng = random.Random(seed * 1000003 + index)
+    book_id = volume_id(index, seed)
+
+    info = {'title': _title(rng)}
+    if rng.random() < 0.95:
+        authors = max(catalog_size // 4, 10)
+        info['authors'] = [_author(_zipf(rng, authors, 0.5)) for _ in range(1 if rng.random() < 0.85 else rng.randint(2, 3))]
+    if rng.random() < 0.85:
+        info['publisher'] = f"{rng.choice(LAST_NAMES)} {rng.choice(['Press', 'Books', 'Publishing', 'House'])} " \
+                            f"{_zipf(rng, max(catalog_size // 50, 10), 0.5)}"
+    if rng.random() < 0.95:
+        info['publishedDate'] = _published_date(rng)
+    if rng.random() < 0.7:
+        start = DESCRIPTION_CORPUS.find('. ', rng.randrange(len(DESCRIPTION_CORPUS) // 2)) + 2
+        info['description'] = DESCRIPTION_CORPUS[start:start + rng.randint(60, 1200)].rsplit('.', 1)[0] + '.'
+    if rng.random() < 0.7:
+        isbn = f"{978000000000 + index * 7 % 1000000000:012d}"
+        info['industryIdentifiers'] = [
+            {'type': 'ISBN_13', 'identifier': isbn + str(index % 10)},
+            {'type': 'ISBN_10', 'identifier': isbn[3:12] + str(index % 10)}
+        ]
+    else:
+        info['industryIdentifiers'] = [{'type': 'OTHER', 'identifier': f"OCLC:{index}"}]
+    info['readingModes'] = {'text': rng.random() < 0.3, 'image': rng.random() < 0.6}
+    if rng.random() < 0.8:
+        info['pageCount'] = max(8, min(int(rng.lognormvariate(5.3, 0.6)), 3000))
+    info['printType'] = 'BOOK' if rng.random() < 0.97 else 'MAGAZINE'
+    if rng.random() < 0.75:
+        info['categories'] = [CATEGORIES[_zipf(rng, len(CATEGORIES))]]
+    if rng.random() < 0.3:
+        info['averageRating'] = max(1.0, min(5.0, round(rng.gauss(3.9, 0.6) * 2) / 2))
+        info['ratingsCount'] = int(rng.paretovariate(1.2))
+    info['maturityRating'] = 'NOT_MATURE' if rng.random() < 0.98 else 'MATURE'
+    if rng.random() < 0.8:
+        link = f"http://books.google.com/books/content?id={book_id}&printsec=frontcover&img=1&source=gbs_api"
+        info['imageLinks'] = {'smallThumbnail': link + '&zoom=5', 'thumbnail': link + '&zoom=1'}
+    info['language'] = rng.choice(LANGUAGES)
+
+    saleability = rng.choice(SALEABILITY)
+    sale = {'country': 'US', 'saleability': saleability, 'isEbook': saleability != 'NOT_FOR_SALE'}
+    if saleability == 'FOR_SALE':
+        price = round(rng.lognormvariate(2.5, 0.7), 2)
+        sale['listPrice'] = {'amount': price, 'currencyCode': 'USD'}
+        sale['retailPrice'] = {'amount': round(price * rng.choice([1.0, 1.0, 0.9, 0.8, 0.5]), 2),
+                               'currencyCode': 'USD'}
+    if saleability in ('FOR_SALE', 'FREE'):
+        sale['buyLink'] = f"https://play.google.com/store/books/details?id={book_id}&rdid=book-{book_id}&rdot=1"
+
+    return {
+        'kind': 'books#volume',
+        'id': book_id,
+        'selfLink': f"https://www.googleapis.com/books/v1/volumes/{book_id}",
+        'volumeInfo': info,
+        'saleInfo': sale
+    }
+
+
+def generate_volumes(count, seed=0):
+    """Yield every volume of a catalog of count books, in index order"""
+    for index in range(count):
+        yield make_volume(index, seed, catalog_size=count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Google Books catalog as JSON lines")
+    parser.add_argument('--books', type=int, default=10000, help="catalog size (10k to 10M is typical)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='-', help="output file; .gz is compressed, - is stdout")
+    args = parser.parse_args()
+
+    if args.out == '-':
+        out = sys.stdout
+    elif args.out.endswith('.gz'):
+        out = gzip.open(args.out, 'wt', encoding='utf-8')
+    else:
+        out = open(args.out, 'w', encoding='utf-8')
+    try:
+        for volume in generate_volumes(args.books, args.seed):
+            out.write(json.dumps(volume))
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# book.py
+# One compact record per volume, parsed once from the API payload and used
+# by search, storage and the result cards
+import json
+from typing import Dict, Optional
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # orjson is optional; the standard decoder is slower
+    loads = json.loads
+
+
+def parse_year(published_date):
+    """Return the year of a Google Books publishedDate ('2004', '2004-05', ...) or None"""
+    year = (published_date or '')[:4]
+    return int(year) if len(year) == 4 and year.isdigit() else None
+
+
+def to_float(value, missing=None):
+    """Return a numeric column value as float, or missing for NULL (MySQL DECIMAL columns arrive as Decimal objects)"""
+    return float(value) if value is not None else missing
+
+
+class Book:
+    """
+    The fields BookScape uses from a Google Books volume.
+
+    Slots keep a book to one small object instead of the API's nested
+    dicts. Build one with from_volume (API payload) or from_row (books
+    table); to_row gives the books table row DatabaseManager writes.
+    authors and categories are tuples.
+    """
+
+    __slots__ = (
+        'book_id', 'title', 'authors', 'publisher', 'published_date', 'description',
+        'isbn', 'page_count', 'categories', 'average_rating', 'ratings_count',
+        'maturity_rating', 'language', 'print_type', 'is_ebook', 'saleability',
+        'list_price', 'retail_price', 'thumbnail', 'buy_link', 'search_key'
+    )
+
+    def __init__(self, book_id: str, title: Optional[str] = None, **fields):
+        self.book_id = book_id
+        self.title = title
+        for name in self.__slots__[2:]:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"Unknown Book fields: {', '.join(fields)}")
+        self.authors = self.authors or ()
+        self.categories = self.categories or ()
+        self.is_ebook = bool(self.is_ebook)
+
+    @classmethod
+    def from_volume(cls, volume: Dict, search_key: Optional[str] = None) -> 'Book':
+        """Build a book from one item of a volumes response"""
+        info = volume.get('volumeInfo') or {}
+        sale = volume.get('saleInfo') or {}
+        book = cls.__new__(cls)
+        book.book_id = volume.get('id')
+        book.title = info.get('title')
+        book.authors = tuple(info.get('authors') or ())
+        book.publisher = info.get('publisher')
+        book.published_date = info.get('publishedDate')
+        book.description = info.get('description')
+        identifiers = info.get('industryIdentifiers')
+        book.isbn = identifiers[0].get('identifier') if identifiers else None
+        book.page_count = info.get('pageCount')
+        book.categories = tuple(info.get('categories') or ())
+        book.average_rating = info.get('averageRating')
+        book.ratings_count = info.get('ratingsCount')
+        book.maturity_rating = info.get('maturityRating')
+        book.language = info.get('language')
+        book.print_type = info.get('printType')
+        book.is_ebook = bool(sale.get('isEbook', False))
+        book.saleability = sale.get('saleability')
+        book.list_price = (sale.get('listPrice') or {}).get('amount')
+        book.retail_price = (sale.get('retailPrice') or {}).get('amount')
+        book.thumbnail = (info.get('imageLinks') or {}).get('thumbnail')
+        book.buy_link = sale.get('buyLink')
+        book.search_key = search_key
+        return book
+
+    @classmethod
+    def from_row(cls, row: Dict) -> 'Book':
+        """Build a book from a books table row; columns the query did not select are None"""
+        book = cls.__new__(cls)
+        book.book_id = row['book_id']
+        book.title = row.get('book_title')
+        book.authors = tuple(json.loads(row.get('book_authors') or '[]'))
+        book.publisher = row.get('publisher')
+        book.published_date = row.get('publishedDate')
+        book.description = row.get('description')
+        book.isbn = row.get('isbn')
+        book.page_count = row.get('pageCount')
+        book.categories = tuple(json.loads(row.get('categories') or '[]'))
+        rating = row.get('averageRating')
+        book.average_rating = float(rating) if rating is not None else None
+        book.ratings_count = row.get('ratingsCount')
+        book.maturity_rating = row.get('maturityRating')
+        book.language = row.get('language')
+        book.print_type = row.get('printType')
+        book.is_ebook = bool(row.get('isEbook'))
+        book.saleability = row.get('saleability')
+        book.list_price = to_float(row.get('amount_listPrice'))
+        book.retail_price = to_float(row.get('amount_retailPrice'))
+        book.thumbnail = row.get('thumbnail')
+        book.buy_link = row.get('buyLink')
+        book.search_key = row.get('search_key')
+        return book
+
+    def to_row(self) -> Dict:
+        """The books table row for this book (see database_manager.BOOK_COLUMNS)"""
+        return {
+            'book_id': self.book_id,
+            'book_title': self.title,
+            'book_authors': json.dumps(list(self.authors)),
+            'publisher': self.publisher,
+            'publishedDate': self.published_date,
+            'description': self.description,
+            'isbn': self.isbn,
+            'pageCount': self.page_count,
+            'categories': json.dumps(list(self.categories)),
+            'averageRating': self.average_rating,
+            'ratingsCount': self.ratings_count,
+            'maturityRating': self.maturity_rating,
+            'language': self.language,
+            'isEbook': self.is_ebook,
+            'saleability': self.saleability,
+            'amount_listPrice': self.list_price,
+            'amount_retailPrice': self.retail_price,
+            'search_key': self.search_key,
+            'year': parse_year(self.published_date),
+            # Authors and categories as plain text for the FULLTEXT index
+            'search_text': ' '.join(self.authors + self.categories),
+            'thumbnail': self.thumbnail,
+            'printType': self.print_type,
+            'buyLink': self.buy_link
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Book):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Book({self.book_id!r}, {self.title!r})"
@@ -10,4 +10,50 @@ DATABASE_CONFIG = {
     'database': os.getenv('DB_NAME')
 }
 
+# 'sqlite' runs on an embedded database file instead of a MySQL server
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'bookscape.sqlite')
+if DB_BACKEND == 'sqlite':
+    DATABASE_CONFIG = {'backend': 'sqlite', 'path': SQLITE_PATH}
+
 GOOGLE_BOOKS_API_KEY = os.getenv('GOOGLE_BOOKS_API_KEY')
+
+# Connections shared by all Streamlit sessions in one process
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+
+# Google Books request rate shared by every caller in the process
+GOOGLE_BOOKS_RATE_LIMIT = float(os.getenv('GOOGLE_BOOKS_RATE_LIMIT', 5.0))
+GOOGLE_BOOKS_RATE_BURST = int(os.getenv('GOOGLE_BOOKS_RATE_BURST', 5))
+GOOGLE_BOOKS_MAX_WORKERS = int(os.getenv('GOOGLE_BOOKS_MAX_WORKERS', 4))
+# Most result pages one filtered search may fetch looking for matches
+GOOGLE_BOOKS_MAX_REQUESTS = int(os.getenv('GOOGLE_BOOKS_MAX_REQUESTS', 10))
+
+# On-disk Google Books response cache; survives restarts
+GOOGLE_BOOKS_CACHE_PATH = os.getenv('GOOGLE_BOOKS_CACHE_PATH', '.cache/google_books.sqlite')
+GOOGLE_BOOKS_CACHE_TTL = int(os.getenv('GOOGLE_BOOKS_CACHE_TTL', 86400))
+GOOGLE_BOOKS_CACHE_MAX_MB = int(os.getenv('GOOGLE_BOOKS_CACHE_MAX_MB', 100))
+
+# Dashboard query results cached in memory until the next write
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 512))
+QUERY_CACHE_MAX_AGE = int(os.getenv('QUERY_CACHE_MAX_AGE', 300))
+
+# Searches fetched within this many seconds are served from MySQL
+LOCAL_FIRST_MAX_AGE = int(os.getenv('LOCAL_FIRST_MAX_AGE', 86400))
+
+# Background refresh of stale stored searches (refresh_scheduler.py); 0 requests per hour = off
+REFRESH_REQUESTS_PER_HOUR = int(os.getenv('REFRESH_REQUESTS_PER_HOUR', 0))
+REFRESH_MIN_AGE = int(os.getenv('REFRESH_MIN_AGE', 43200))
+REFRESH_INTERVAL = float(os.getenv('REFRESH_INTERVAL', 300))
+
+# Downscaled cover images for result cards, shared by all sessions and kept across restarts
+THUMBNAIL_CACHE_PATH = os.getenv('THUMBNAIL_CACHE_PATH', '.cache/thumbnails.sqlite')
+THUMBNAIL_CACHE_MAX_MB = int(os.getenv('THUMBNAIL_CACHE_MAX_MB', 50))
+THUMBNAIL_MAX_WORKERS = int(os.getenv('THUMBNAIL_MAX_WORKERS', 8))
+
+# Parquet snapshot (snapshot.py) to serve the dashboard pages from instead of the database; empty = off
+DASHBOARD_SNAPSHOT_PATH = os.getenv('DASHBOARD_SNAPSHOT_PATH', '')
+
+# Timing metrics for the Performance page, off unless opted in (or switched on from that page);
+# METRICS_PORT > 0 also serves /metrics for Prometheus
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
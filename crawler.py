@@ -0,0 +1,268 @@
+# crawler.py
+"""
+Headless catalog crawler: fetch every result page of a list of seed queries
+and store the books, without the Streamlit search box.
+
+    python crawler.py seeds.txt
+    python crawler.py seeds.txt --concurrency 8 --max-requests 2000 --checkpoint .cache/crawl.json
+
+seeds.txt has one query per line; blank lines and lines starting with #
+are skipped. Pages are fetched from an asyncio event loop, at most
+--concurrency at a time (all requests still share the process rate limit),
+and at most --max-requests per run. Books go through the batched upsert
+path (WriteBehindQueue); a volume already seen under another query is not
+written again. Each page is also recorded as a stored search, so searching
+for a seed in the app is served locally.
+
+Progress is checkpointed every --checkpoint-interval seconds and on exit,
+once the books it covers are written. Running the same command again
+resumes: finished pages are skipped, and so are the volumes they found.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+
+from api_handler import PAGE_SIZE, GoogleBooksAPI
+from database_manager import DatabaseManager
+from write_behind import WriteBehindQueue
+
+
+def read_seeds(path: str) -> List[str]:
+    """Seed queries from a file, in order, without duplicates"""
+    with open(path, encoding='utf-8') as f:
+        lines = (line.strip() for line in f)
+        return list(dict.fromkeys(line for line in lines if line and not line.startswith('#')))
+
+
+class CrawlCheckpoint:
+    """
+    Crawl progress on disk: per query, totalItems and the page start
+    indexes already stored, plus the ids of every volume stored so far.
+    Saved atomically (write to a temporary file, then rename).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.queries: Dict[str, Dict] = {}
+        self.seen: Set[str] = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.queries = {
+                query: {'total': entry['total'], 'done': set(entry['done'])}
+                for query, entry in state['queries'].items()
+            }
+            self.seen = set(state['seen'])
+
+    def remaining_pages(self, query: str, max_per_query: int) -> Optional[List[int]]:
+        """Start indexes still to fetch for query; None while its totalItems is unknown"""
+        entry = self.queries.get(query)
+        if entry is None or entry['total'] is None:
+            return None
+        end = min(entry['total'], max_per_query)
+        return [start for start in range(0, end, PAGE_SIZE) if start not in entry['done']]
+
+    def mark_done(self, query: str, start: int, total: int, book_ids: Iterable[str]):
+        entry = self.queries.setdefault(query, {'total': None, 'done': set()})
+        entry['total'] = total
+        entry['done'].add(start)
+        self.seen.update(book_ids)
+
+    def save(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        state = {
+            'queries': {
+                query: {'total': entry['total'], 'done': sorted(entry['done'])}
+                for query, entry in self.queries.items()
+            },
+            'seen': sorted(self.seen)
+        }
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(temp, self.path)
+
+
+class Crawler:
+    """
+    Fetches seed queries page by page on an asyncio loop and streams the
+    books into the database. GoogleBooksAPI is blocking, so each page runs
+    on a worker thread; a semaphore caps how many are in flight.
+    """
+
+    def __init__(
+        self,
+        api: GoogleBooksAPI,
+        db: DatabaseManager,
+        checkpoint: CrawlCheckpoint,
+        concurrency: int = 8,
+        max_requests: int = 1000,
+        max_per_query: int = 400,
+        batch_size: int = 200,
+        checkpoint_interval: float = 10.0
+    ):
+        self.api = api
+        self.db = db
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self.max_per_query = max_per_query
+        self.checkpoint_interval = checkpoint_interval
+        self.writer = WriteBehindQueue(db, batch_size=batch_size, max_pending=batch_size * 10)
+        self._seen = set(checkpoint.seen)
+        self._completed = []
+        self._save_lock = threading.Lock()
+        self._semaphore = None
+        self._stats = {
+            'requests': 0, 'failed_requests': 0, 'pages': 0, 'books': 0, 'duplicates': 0,
+            'queries': 0, 'budget_exhausted': False
+        }
+
+    def stats(self) -> Dict:
+        """Crawl counters, with the upsert counters of the writer"""
+        writer = self.writer.stats()
+        return {
+            **self._stats,
+            'inserted': writer['inserted'],
+            'updated': writer['updated'],
+            'unchanged': writer.get('unchanged', 0),
+            'write_failed': writer['failed']
+        }
+
+    def run(self, seeds: List[str]) -> Dict:
+        """Crawl seeds to completion or until the request budget is spent"""
+        return asyncio.run(self.crawl(seeds))
+
+    async def crawl(self, seeds: List[str]) -> Dict:
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency + 1))
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        start = time.perf_counter()
+        # Pages still to fetch per query, read before the checkpoint starts changing
+        plans = {query: self.checkpoint.remaining_pages(query, self.max_per_query) for query in seeds}
+        saver = asyncio.create_task(self._save_periodically(start))
+        try:
+            await asyncio.gather(*(self._crawl_query(query, starts) for query, starts in plans.items()))
+        finally:
+            saver.cancel()
+            # Also reached on Ctrl-C, so an interrupted crawl keeps its progress
+            self._save(self._take_completed())
+            self.writer.close()
+        self._stats['seconds'] = time.perf_counter() - start
+        return self.stats()
+
+    async def _crawl_query(self, query: str, starts: Optional[List[int]]):
+        if starts is None:
+            # The first page tells us how many there are
+            total = await self._crawl_page(query, 0)
+            if total is None:
+                return
+            starts = list(range(PAGE_SIZE, min(total, self.max_per_query), PAGE_SIZE))
+        totals = await asyncio.gather(*(self._crawl_page(query, start) for start in starts))
+        if None not in totals:
+            self._stats['queries'] += 1
+
+    async def _crawl_page(self, query: str, start: int) -> Optional[int]:
+        """Fetch and queue one page; returns the query's totalItems, or None if the page was not fetched"""
+        async with self._semaphore:
+            if self._stats['requests'] >= self.max_requests:
+                self._stats['budget_exhausted'] = True
+                return None
+            self._stats['requests'] += 1
+            try:
+                total, books = await asyncio.to_thread(self.api.fetch_page, query, start, PAGE_SIZE, False)
+            except requests.exceptions.RequestException as e:
+                print(f"Crawl request failed for {query!r} at {start}: {e}")
+                self._stats['failed_requests'] += 1
+                return None
+
+        new = [book for book in books if book.book_id not in self._seen]
+        self._seen.update(book.book_id for book in new)
+        for book in new:
+            book.search_key = query
+        if new:
+            # Blocks while the writer is behind, so run it off the loop
+            await asyncio.to_thread(self.writer.put_many, new)
+        self._stats['pages'] += 1
+        self._stats['books'] += len(new)
+        self._stats['duplicates'] += len(books) - len(new)
+        self._completed.append((query, start, total, [book.book_id for book in books]))
+        return total
+
+    def _take_completed(self):
+        completed, self._completed = self._completed, []
+        return completed
+
+    async def _save_periodically(self, started: float):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            await asyncio.to_thread(self._save, self._take_completed())
+            elapsed = time.perf_counter() - started
+            print(f"{self._stats['pages']} pages, {self._stats['books']} new books, "
+                  f"{self._stats['requests']}/{self.max_requests} requests, "
+                  f"{self._stats['pages'] / elapsed:.1f} pages/s")
+
+    def _save(self, completed):
+        """Write the queued books, then record the completed pages as stored searches and in the checkpoint"""
+        # A periodic save may still be running when the final one starts
+        with self._save_lock:
+            self.writer.flush()
+            for query, start, total, book_ids in completed:
+                self.db.record_search(query, start, book_ids, total)
+                self.checkpoint.mark_done(query, start, total, book_ids)
+            self.checkpoint.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl seed queries into the books catalog")
+    parser.add_argument('seeds', help="file with one query per line")
+    parser.add_argument('--checkpoint', default='.cache/crawl.json', help="progress file; re-run to resume")
+    parser.add_argument('--concurrency', type=int, default=8, help="pages in flight at once")
+    parser.add_argument('--max-requests', type=int, default=1000, help="API requests this run may spend")
+    parser.add_argument('--max-per-query', type=int, default=400, help="most results fetched per query")
+    parser.add_argument('--batch-size', type=int, default=200, help="books per upsert batch")
+    parser.add_argument('--checkpoint-interval', type=float, default=10.0, help="seconds between checkpoints")
+    parser.add_argument('--base-url', help="volumes endpoint, e.g. a local stub server")
+    args = parser.parse_args()
+
+    from configuration import (
+        DATABASE_CONFIG, GOOGLE_BOOKS_API_KEY, GOOGLE_BOOKS_RATE_LIMIT, GOOGLE_BOOKS_RATE_BURST
+    )
+
+    api_options = {'base_url': args.base_url} if args.base_url else {}
+    api = GoogleBooksAPI(
+        GOOGLE_BOOKS_API_KEY,
+        rate_limit=GOOGLE_BOOKS_RATE_LIMIT,
+        rate_burst=GOOGLE_BOOKS_RATE_BURST,
+        max_workers=args.concurrency,
+        **api_options
+    )
+    seeds = read_seeds(args.seeds)
+    with DatabaseManager(DATABASE_CONFIG) as db:
+        crawler = Crawler(
+            api, db, CrawlCheckpoint(args.checkpoint),
+            concurrency=args.concurrency,
+            max_requests=args.max_requests,
+            max_per_query=args.max_per_query,
+            batch_size=args.batch_size,
+            checkpoint_interval=args.checkpoint_interval
+        )
+        stats = crawler.run(seeds)
+    print(f"Crawled {stats['queries']}/{len(seeds)} queries: {stats['pages']} pages, {stats['books']} new books "
+          f"({stats['duplicates']} duplicates skipped), {stats['inserted']} inserted, {stats['updated']} updated, "
+          f"{stats['unchanged']} unchanged in {stats['seconds']:.1f}s")
+    if stats['budget_exhausted']:
+        print("Request budget spent; run again to continue")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,19 +1,81 @@
 # database_manager.py
-import mysql.connector
-from mysql.connector import Error
+import hashlib
 import json
+import time
+from decimal import Decimal
+import queries
+from metrics import METRICS
+from storage import DatabaseError, create_backend
+from summaries import REBUILD_SUMMARIES_QUERIES, apply_summary_deltas, book_facts, summary_deltas
+
+BOOK_COLUMNS = [
+    'book_id', 'book_title', 'book_authors', 'publisher', 'publishedDate',
+    'description', 'isbn', 'pageCount', 'categories', 'averageRating',
+    'ratingsCount', 'maturityRating', 'language', 'isEbook', 'saleability',
+    'amount_listPrice', 'amount_retailPrice', 'search_key', 'year', 'search_text',
+    'thumbnail', 'printType', 'buyLink'
+]
+# The search that found a book is bookkeeping, not content; a repeat from
+# another search alone is no reason to rewrite the row
+FINGERPRINT_COLUMNS = [col for col in BOOK_COLUMNS if col not in ('book_id', 'search_key')]
+STORED_COLUMNS = BOOK_COLUMNS + ['content_hash']
+
+
+def link_names(names_json):
+    """Author or category names from a JSON list column, as stored in the link tables"""
+    names = {}
+    for name in json.loads(names_json or '[]'):
+        if name:
+            name = name[:255]
+            # Link table keys compare case-insensitively; keep the first spelling
+            names.setdefault(name.casefold(), name)
+    return list(names.values())
+
+
+def content_fingerprint(row):
+    """
+    Hash of a processed row's content columns, stored in books.content_hash.
+
+    Numbers are normalized first, so a row read back from a snapshot (Decimal
+    prices, bool flags) fingerprints the same as the one from the API.
+    """
+    values = []
+    for col in FINGERPRINT_COLUMNS:
+        value = row.get(col)
+        if isinstance(value, (Decimal, float)):
+            value = float(value)
+        elif isinstance(value, bool):
+            value = int(value)
+        values.append(value)
+    return hashlib.blake2b(json.dumps(values).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _frames():
+    """frames, imported on first use: it loads pandas, which pages that never build a DataFrame skip"""
+    import frames
+    return frames
+
 
 class DatabaseManager:
-    def __init__(self, config):
-        """Initialize database connection"""
+    def __init__(self, config, pool_size=None, query_cache=None):
+        """
+        Initialize database connection.
+
+        config is mysql.connector settings, or {'backend': 'sqlite', 'path': ...}
+        for an embedded database (see storage.py). With pool_size set, MySQL
+        connections come from a pool shared by every DatabaseManager in the
+        process and are checked out per query; SQLite connections are always
+        pooled, up to pool_size of them. With a QueryCache, SELECT results
+        are cached until the next write.
+        """
         self.config = config
-        self.connection = None
+        self.query_cache = query_cache
         try:
-            self.connection = mysql.connector.connect(**config)
-            print("Successfully connected to the database")
-        except Error as e:
-            print(f"Error connecting to MySQL database: {e}")
+            self.backend = create_backend(config, pool_size)
+        except DatabaseError as e:
+            print(f"Error connecting to the database: {e}")
             raise
+        self.upsert_query = self.backend.upsert('books', STORED_COLUMNS, ['book_id'])
 
     def __enter__(self):
         return self
@@ -22,93 +84,386 @@ class DatabaseManager:
         self.close()
 
     def close(self):
-        """Close the database connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Database connection closed")
+        """Close the database connection (pooled connections stay with the pool)"""
+        self.backend.close()
+
+    def _connection(self):
+        """Yield a live connection from the backend"""
+        return self.backend.checkout()
+
+    def _data_changed(self):
+        """Invalidate cached query results after a write"""
+        if self.query_cache:
+            self.query_cache.bump()
+
+    def pool_stats(self):
+        """Return connection pool usage, or dedicated connection stats when not pooled"""
+        return self.backend.stats()
+
+    def execute_query(self, query, params=None, use_cache=True):
+        """
+        Execute a SELECT query and return results.
+
+        Results may come from the query cache; treat them as read-only.
+        """
+        cache_key = None
+        if self.query_cache and use_cache:
+            cache_key = self.query_cache.make_key(query, params)
+            cached = self.query_cache.get(cache_key)
+            if cached is not None:
+                if METRICS.enabled:
+                    METRICS.inc('db_query_cache_hits_total', query=queries.query_name(query))
+                return cached
 
-    def execute_query(self, query, params=None):
-        """Execute a SELECT query and return results"""
         try:
-            if not self.connection or not self.connection.is_connected():
-                self.connection = mysql.connector.connect(**self.config)
-            
-            cursor = self.connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            results = cursor.fetchall()
-            cursor.close()
+            start = time.perf_counter()
+            with self._connection() as connection:
+                cursor = self.backend.cursor(connection, dictionary=True)
+                cursor.execute(self.backend.sql(query), params or ())
+
+                results = cursor.fetchall()
+                cursor.close()
+
+            if METRICS.enabled:
+                name = queries.query_name(query)
+                METRICS.observe('db_query_seconds', time.perf_counter() - start, query=name)
+                METRICS.inc('db_query_rows_total', len(results), query=name)
+
+            if cache_key:
+                self.query_cache.set(cache_key, results)
             return results
 
-        except Error as e:
+        except DatabaseError as e:
             print(f"Error executing query: {e}")
             raise
     
-    def insert_book(self, book_data):
-        """Insert book data into the database"""
+    def query_frame(self, query, params=None, columns=None, use_cache=True):
+        """
+        Execute a SELECT query and return a pandas DataFrame.
+
+        JSON list columns are decoded in bulk and columns get real dtypes
+        (categoricals, nullable integers, floats instead of Decimal). Pass
+        columns to fetch only those columns of the query's result.
+        """
+        name = queries.query_name(query) if METRICS.enabled else None
+        if columns:
+            query = f"SELECT {', '.join(columns)} FROM ({query}) AS projected"
+        rows = self.execute_query(query, params, use_cache)
+        start = time.perf_counter()
+        frame = _frames().to_frame(rows, columns)
+        if METRICS.enabled and name:
+            METRICS.observe('frame_build_seconds', time.perf_counter() - start, query=name)
+        return frame
+
+    def iter_query(self, query, params=None, chunk_size=1000, as_frame=False):
+        """
+        Stream a SELECT in chunks of up to chunk_size rows.
+
+        Rows are read off an unbuffered cursor with fetchmany, so memory use
+        depends on chunk_size, not on the size of the result. Chunks are lists
+        of tuples, or DataFrames (see frames.tuples_to_frame) with as_frame.
+
+        The stream runs on a connection of its own, so a long export does not
+        hold a pool slot. The connection is closed when the generator is
+        exhausted or closed: breaking out of a for loop over it, or
+        contextlib.closing(), releases it even though rows were left unread.
+        Results bypass the query cache.
+        """
+        try:
+            connection = self.backend.stream_connection()
+        except DatabaseError as e:
+            print(f"Error opening streaming connection: {e}")
+            raise
+
+        try:
+            cursor = self.backend.stream_cursor(connection)
+            cursor.execute(self.backend.sql(query), params or ())
+            names = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                if METRICS.enabled:
+                    METRICS.inc('db_stream_rows_total', len(rows), query=queries.query_name(query))
+                yield _frames().tuples_to_frame(rows, names) if as_frame else rows
+        except DatabaseError as e:
+            print(f"Error streaming query: {e}")
+            raise
+        finally:
+            # Closing drops any unread rows with the socket; draining them
+            # instead could mean reading millions of rows nobody wants
+            connection.close()
+
+    def keyset_page(self, query, params, keys, after=None, page_size=50):
+        """
+        Fetch one page of a query in keyset order.
+
+        query has an {after} placeholder in its WHERE clause and ends with
+        ORDER BY over keys, all descending, without a LIMIT (see
+        queries.keyset_page_query). keys is a list of (expression, column,
+        placeholder) triples whose values are unique together. after is the next_key from
+        the previous page, or None for the first page.
+
+        Returns:
+            (rows, next_key); next_key is None on the last page
+        """
+        sql = queries.keyset_page_query(query, keys, after is not None)
+        rows = self.execute_query(sql, (*params, *(after or ()), page_size + 1))
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, tuple(rows[-1][column] for _, column, _ in keys)
+
+    def search_catalog(self, text, limit=50):
+        """
+        Full-text search over stored books (title, authors, categories and
+        description), best matches first. Title matches weigh extra.
+        """
+        return self.execute_query(queries.CATALOG_SEARCH, (text, text, text, limit))
+
+    def record_search(self, search_key, start_index, book_ids, total_items):
+        """Remember which books an API search returned, by position, for local-first serving"""
+        search_key = search_key[:255]
+        statements = [(queries.RECORD_SEARCH, (search_key, total_items))]
+        if book_ids:
+            statements.append((
+                self.backend.sql(queries.RECORD_SEARCH_RESULTS).format(
+                    values=', '.join(['({p}, {p}, {p}, NOW())'.format(p=self.backend.placeholder)] * len(book_ids))
+                ),
+                [value
+                 for position, book_id in enumerate(book_ids, start_index)
+                 for value in (search_key, position, book_id)]
+            ))
+        self.execute_statements(statements, changes_catalog=False)
+
+    def stored_search(self, search_key, max_results, max_age):
+        """
+        Return (totalItems, rows) for a search recorded within max_age seconds.
+
+        rows are the stored books at positions below max_results, in order,
+        each with its 'position'; totalItems is None if the search was never
+        recorded or is stale.
+        """
+        search_key = search_key[:255]
+        log = self.execute_query(queries.STORED_SEARCH_LOG, (search_key, max_age), use_cache=False)
+        if not log:
+            return None, []
+        rows = self.execute_query(
+            queries.STORED_SEARCH_RESULTS, (search_key, max_results, max_age), use_cache=False
+        )
+        return log[0]['total_items'], rows
+
+    def refresh_candidates(self, min_age):
+        """Stored searches fetched more than min_age seconds ago, with their age, hits, change rate and stored results"""
+        return self.execute_query(queries.REFRESH_CANDIDATES, (min_age,), use_cache=False)
+
+    def add_search_hits(self, hits):
+        """Add to the hit counts of stored searches; hits maps search_key to count"""
+        if hits:
+            self.execute_statements([(queries.ADD_SEARCH_HITS, (count, key[:255])) for key, count in hits.items()],
+                                    changes_catalog=False)
+
+    def set_change_rate(self, search_key, change_rate):
+        """Record the share of a stored search's books that changed on recent refreshes"""
+        self.execute_statements([(queries.SET_CHANGE_RATE, (change_rate, search_key[:255]))], changes_catalog=False)
+
+    def insert_book(self, book):
+        """
+        Insert a Book into the database.
+
+        Returns False when the stored row already had the same content, in
+        which case nothing was written.
+        """
         try:
-            if not self.connection or not self.connection.is_connected():
-                self.connection = mysql.connector.connect(**self.config)
-
-            cursor = self.connection.cursor()
-
-            # Process book data
-            processed_data = {
-                'book_id': book_data.get('id'),
-                'book_title': book_data.get('title'),
-                'book_authors': json.dumps(book_data.get('authors', [])),
-                'publisher': book_data.get('publisher'),
-                'publishedDate': book_data.get('publishedDate'),
-                'description': book_data.get('description'),
-                'isbn': book_data.get('industryIdentifiers', [{}])[0].get('identifier'),
-                'pageCount': book_data.get('pageCount'),
-                'categories': json.dumps(book_data.get('categories', [])),
-                'averageRating': book_data.get('averageRating'),
-                'ratingsCount': book_data.get('ratingsCount'),
-                'maturityRating': book_data.get('maturityRating'),
-                'language': book_data.get('language'),
-                'isEbook': book_data.get('isEbook', False),
-                'saleability': book_data.get('saleability'),
-                'amount_listPrice': book_data.get('listPrice', {}).get('amount'),
-                'amount_retailPrice': book_data.get('retailPrice', {}).get('amount'),
-                'search_key': book_data.get('search_key'),
-                'year': book_data.get('publishedDate', '').split('-')[0] if book_data.get('publishedDate') else None
-            }
-
-            # Create the INSERT query
-            columns = ', '.join(processed_data.keys())
-            placeholders = ', '.join(['%s'] * len(processed_data))
-            query = f"""
-                INSERT INTO books ({columns})
-                VALUES ({placeholders})
-                ON DUPLICATE KEY UPDATE
-                    book_title = VALUES(book_title),
-                    book_authors = VALUES(book_authors),
-                    publisher = VALUES(publisher),
-                    publishedDate = VALUES(publishedDate),
-                    description = VALUES(description),
-                    isbn = VALUES(isbn),
-                    pageCount = VALUES(pageCount),
-                    categories = VALUES(categories),
-                    averageRating = VALUES(averageRating),
-                    ratingsCount = VALUES(ratingsCount),
-                    maturityRating = VALUES(maturityRating),
-                    language = VALUES(language),
-                    isEbook = VALUES(isEbook),
-                    saleability = VALUES(saleability),
-                    amount_listPrice = VALUES(amount_listPrice),
-                    amount_retailPrice = VALUES(amount_retailPrice),
-                    search_key = VALUES(search_key),
-                    year = VALUES(year)
-            """
-
-            cursor.execute(query, list(processed_data.values()))
-            self.connection.commit()
-            cursor.close()
-
-        except Error as e:
+            start = time.perf_counter()
+            with self._connection() as connection:
+                cursor = self.backend.cursor(connection)
+                _, unchanged = self._write_rows(cursor, [book.to_row()])
+                connection.commit()
+                cursor.close()
+            if not unchanged:
+                self._data_changed()
+
+            if METRICS.enabled:
+                METRICS.observe('db_write_seconds', time.perf_counter() - start, op='insert_book')
+                if unchanged:
+                    METRICS.inc('db_rows_skipped_total', op='insert_book')
+                else:
+                    METRICS.inc('db_rows_written_total', op='insert_book')
+            return not unchanged
+
+        except DatabaseError as e:
             print(f"Error inserting book data: {e}")
             raise
+
+    def insert_books(self, books, batch_size=100):
+        """
+        Upsert many Books, committing once per batch.
+
+        Each batch is sent as a single multi-row statement. If a batch fails it
+        is rolled back and retried row by row so one bad record only costs
+        itself. Stored books whose content fingerprint is unchanged are not
+        rewritten.
+
+        Returns:
+            Dict with 'inserted', 'updated' (changed), 'unchanged' (skipped)
+            and 'failed' row counts
+        """
+        return self.insert_rows((book.to_row() for book in books), batch_size)
+
+    def insert_rows(self, rows, batch_size=100):
+        """
+        insert_books for rows already in books table form (see
+        Book.to_row), e.g. read back from a Parquet snapshot.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._upsert_batch(batch, stats)
+                batch = []
+        if batch:
+            self._upsert_batch(batch, stats)
+        if stats['inserted'] or stats['updated']:
+            self._data_changed()
+        return stats
+
+    def _upsert_batch(self, rows, stats):
+        """Write one batch of processed rows and update the running stats"""
+        with self._connection() as connection:
+            # Volumes repeat inside a single search, keep the last copy of each
+            rows = list({row['book_id']: row for row in rows}.values())
+
+            cursor = self.backend.cursor(connection)
+            try:
+                start = time.perf_counter()
+                existing, unchanged = self._write_rows(cursor, rows)
+                connection.commit()
+                stats['updated'] += len(existing) - len(unchanged)
+                stats['unchanged'] += len(unchanged)
+                stats['inserted'] += len(rows) - len(existing)
+                if METRICS.enabled:
+                    METRICS.observe('db_write_seconds', time.perf_counter() - start, op='insert_books')
+                    METRICS.inc('db_rows_written_total', len(rows) - len(unchanged), op='insert_books')
+                    METRICS.inc('db_rows_skipped_total', len(unchanged), op='insert_books')
+            except DatabaseError as e:
+                print(f"Batch insert failed, retrying row by row: {e}")
+                connection.rollback()
+                for row in rows:
+                    try:
+                        existing, unchanged = self._write_rows(cursor, [row])
+                        connection.commit()
+                        stats['unchanged' if unchanged else 'updated' if existing else 'inserted'] += 1
+                    except DatabaseError as row_error:
+                        print(f"Error inserting book {row['book_id']}: {row_error}")
+                        connection.rollback()
+                        stats['failed'] += 1
+            finally:
+                cursor.close()
+
+    def _write_rows(self, cursor, rows):
+        """
+        Upsert processed rows, rebuild their author/category links and apply
+        the matching summary table deltas (caller commits). Rows whose
+        content fingerprint matches the stored one are left alone.
+
+        Returns the ids of the rows that already existed, and of those the
+        ones that were unchanged.
+        """
+        for row in rows:
+            if row.get('content_hash') is None:
+                row['content_hash'] = content_fingerprint(row)
+        ids = [row['book_id'] for row in rows]
+        placeholders = ', '.join([self.backend.placeholder] * len(ids))
+        self.backend.begin_write(cursor)
+
+        # Lock the current versions so summary deltas are computed against
+        # exactly what this transaction replaces
+        cursor.execute(
+            f"""
+            SELECT book_id, year, categories, book_authors, averageRating, ratingsCount, content_hash
+            FROM books WHERE book_id IN ({placeholders}){self.backend.for_update}
+            """,
+            ids
+        )
+        old_facts = {}
+        stored_hashes = {}
+        for book_id, year, categories, authors, rating, ratings_count, content_hash in cursor.fetchall():
+            old_facts[book_id] = book_facts(year, link_names(categories), link_names(authors), rating, ratings_count)
+            stored_hashes[book_id] = content_hash
+        existing = set(old_facts)
+
+        unchanged = {row['book_id'] for row in rows if stored_hashes.get(row['book_id']) == row['content_hash']}
+        if unchanged:
+            rows = [row for row in rows if row['book_id'] not in unchanged]
+            if not rows:
+                return existing, unchanged
+            ids = [row['book_id'] for row in rows]
+            placeholders = ', '.join([self.backend.placeholder] * len(ids))
+            old_facts = {book_id: facts for book_id, facts in old_facts.items() if book_id not in unchanged}
+
+        new_facts = {
+            row['book_id']: book_facts(
+                row['year'],
+                link_names(row['categories']),
+                link_names(row['book_authors']),
+                row['averageRating'],
+                row['ratingsCount']
+            )
+            for row in rows
+        }
+
+        cursor.executemany(self.upsert_query, [[row[col] for col in STORED_COLUMNS] for row in rows])
+
+        for table, (column, source) in queries.LINK_TABLES.items():
+            cursor.execute(f"DELETE FROM {table} WHERE book_id IN ({placeholders})", ids)
+            links = [
+                (row['book_id'], name)
+                for row in rows
+                for name in link_names(row[source])
+            ]
+            if links:
+                cursor.executemany(self.backend.insert_ignore(table, ['book_id', column]), sorted(links))
+
+        apply_summary_deltas(cursor, summary_deltas(old_facts, new_facts), self.backend.upsert)
+        return existing, unchanged
+
+    def execute_statements(self, statements, changes_catalog=True):
+        """
+        Run write statements in order and commit once at the end.
+
+        Each statement is either a SQL string or a (sql, params) tuple.
+        Cached query results are invalidated once the batch commits, unless
+        changes_catalog is False (search bookkeeping the dashboards do not read).
+        """
+        try:
+            with self._connection() as connection:
+                cursor = self.backend.cursor(connection)
+                try:
+                    for statement in statements:
+                        if isinstance(statement, tuple):
+                            sql, params = statement
+                            cursor.execute(self.backend.sql(sql), params)
+                        else:
+                            cursor.execute(self.backend.sql(statement))
+                    connection.commit()
+                except DatabaseError:
+                    connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            if changes_catalog:
+                self._data_changed()
+
+        except DatabaseError as e:
+            print(f"Error executing statements: {e}")
+            raise
+
+    def backfill_book_links(self):
+        """Populate book_author/book_category for books stored before those tables existed"""
+        self.execute_statements(queries.BACKFILL_LINKS_QUERIES)
+
+    def rebuild_summaries(self):
+        """Recompute the year/category/author summary tables from the books table"""
+        self.execute_statements(REBUILD_SUMMARIES_QUERIES)
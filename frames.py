@@ -0,0 +1,105 @@
+# frames.py
+# Turns query results into typed pandas DataFrames in bulk, instead of
+# per-row json.loads calls in every page
+import json
+
+import numpy as np
+import pandas as pd
+
+from book import to_float
+
+JSON_COLUMNS = ('book_authors', 'categories')
+CATEGORICAL_COLUMNS = ('language', 'maturityRating', 'saleability')
+FLOAT_COLUMNS = ('averageRating', 'amount_listPrice', 'amount_retailPrice', 'avg_rating')
+INTEGER_COLUMNS = ('year', 'pageCount', 'ratingsCount', 'count', 'book_count', 'total_ratings')
+BOOLEAN_COLUMNS = ('isEbook',)
+
+
+def decode_json_column(values):
+    """
+    Decode a column of JSON list strings.
+
+    Each distinct string is parsed once (authors and categories repeat
+    heavily), and the distinct strings are spliced into one JSON array so
+    the C decoder runs a single time for the whole column. NULLs become
+    empty lists. Rows with the same JSON share one list object, so treat
+    the result as read-only.
+    """
+    values = [v.decode('utf-8') if isinstance(v, (bytes, bytearray)) else v for v in values]
+    distinct = list({v for v in values if isinstance(v, str)})
+    if not distinct:
+        return [[] for _ in values]
+    decoded = dict(zip(distinct, json.loads('[' + ','.join(distinct) + ']')))
+    empty = []
+    return [decoded.get(v) or empty if isinstance(v, str) else empty for v in values]
+
+
+def _column_array(name, values):
+    """Convert one column of Python values to a typed array"""
+    if name in JSON_COLUMNS:
+        return pd.Series(decode_json_column(values), dtype=object)
+    if name in CATEGORICAL_COLUMNS:
+        return pd.Categorical(values)
+    if name in FLOAT_COLUMNS:
+        return np.fromiter((to_float(v, np.nan) for v in values), dtype='float64', count=len(values))
+    if name in INTEGER_COLUMNS:
+        return pd.array([int(v) if v is not None else None for v in values], dtype='Int64')
+    if name in BOOLEAN_COLUMNS:
+        return pd.array([bool(v) if v is not None else None for v in values], dtype='boolean')
+    return pd.Series(values, dtype=object)
+
+
+def to_frame(rows, columns=None):
+    """
+    Build a DataFrame from execute_query rows with decoded JSON and sensible dtypes.
+
+    Columns are converted straight from Python lists to typed arrays, which
+    skips pandas' per-value type inference.
+    """
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    names = columns or list(rows[0])
+    return pd.DataFrame({
+        name: _column_array(name, [row[name] for row in rows])
+        for name in names
+    })
+
+
+def tuples_to_frame(rows, names):
+    """to_frame for tuple rows, e.g. chunks from DatabaseManager.iter_query"""
+    if not rows:
+        return pd.DataFrame(columns=list(names))
+    return pd.DataFrame({
+        name: _column_array(name, list(values))
+        for name, values in zip(names, zip(*rows))
+    })
+
+
+def books_to_frame(books):
+    """
+    Columnar view of Books for filtering and paging result cards. Missing
+    ratings are NaN and missing page counts <NA>.
+    """
+    return pd.DataFrame({
+        'book_id': pd.Series([book.book_id for book in books], dtype=object),
+        'title': pd.Series([book.title for book in books], dtype=object),
+        'authors': pd.Series([book.authors or ('Unknown',) for book in books], dtype=object),
+        'publishedDate': pd.Series([book.published_date for book in books], dtype=object),
+        'description': pd.Series([book.description for book in books], dtype=object),
+        'averageRating': np.fromiter(
+            (book.average_rating if book.average_rating is not None else np.nan for book in books),
+            dtype='float64', count=len(books)
+        ),
+        'pageCount': pd.array([book.page_count for book in books], dtype='Int64'),
+        'isEbook': np.fromiter((book.is_ebook for book in books), dtype=bool, count=len(books)),
+        'saleability': pd.Categorical([book.saleability for book in books]),
+        'language': pd.Categorical([book.language for book in books]),
+        'printType': pd.Categorical([book.print_type for book in books]),
+        'thumbnail': pd.Series([book.thumbnail for book in books], dtype=object),
+        'buyLink': pd.Series([book.buy_link for book in books], dtype=object)
+    })
+
+
+def join_names(series, sep=', '):
+    """Render a decoded JSON list column as display strings"""
+    return pd.Series([sep.join(names) for names in series], index=series.index, dtype=object)
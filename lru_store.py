@@ -0,0 +1,202 @@
+# lru_store.py
+# Two-tier LRU store behind the response and thumbnail caches: a small
+# in-memory LRU in front of a size-bounded SQLite table
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# A disk hit refreshes an entry's accessed_at at most once per TOUCH_INTERVAL
+# seconds, and refreshes are written TOUCH_BATCH at a time (or before an
+# eviction), instead of an UPDATE and commit per hit
+TOUCH_INTERVAL = 60.0
+TOUCH_BATCH = 64
+# Eviction trims the disk tier to this share of max_disk_bytes, so it runs
+# once per batch of new entries rather than on every set
+EVICT_TO = 0.9
+
+
+class LRUStore:
+    """
+    Key/value store with an in-memory LRU in front of a SQLite table.
+
+    Values are written to disk as bodies (text or bytes) and read back
+    through load; the memory tier keeps loaded values. The table is trimmed
+    back under max_disk_bytes by evicting least recently used entries, and
+    its size is kept as a running total rather than summed per write. With
+    expires, every entry carries an expiry time, and expired entries are
+    misses that eviction drops first. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        key_column: str,
+        body_type: str = 'TEXT',
+        expires: bool = False,
+        load: Optional[Callable[[Any], Any]] = None,
+        memory_entries: int = 256,
+        max_disk_bytes: int = 100 * 1024 * 1024
+    ):
+        self.path = path
+        self.table = table
+        self.key_column = key_column
+        self.expires = expires
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._load = load or (lambda body: body)
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._touched = {}  # key -> accessed_at not yet written
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        if expires:
+            self._stats['expired'] = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        columns = [f"{key_column} TEXT PRIMARY KEY", f"body {body_type} NOT NULL", "size INTEGER NOT NULL"]
+        if expires:
+            columns.append("expires_at REAL NOT NULL")
+        columns.append("accessed_at REAL NOT NULL")
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})")
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed ON {table} (accessed_at)")
+        self._db.commit()
+        self._disk_entries, self._disk_bytes = self._db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+        ).fetchone()
+
+    def get(self, key: str) -> Tuple[Any, Optional[str]]:
+        """Return (value, tier) with tier 'memory' or 'disk', or (None, None) if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    return value, 'memory'
+                del self._memory[key]
+
+            row = self._db.execute(
+                f"SELECT body, size, {'expires_at' if self.expires else 'NULL'}, accessed_at "
+                f"FROM {self.table} WHERE {self.key_column} = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None, None
+
+            body, size, expires_at, accessed_at = row
+            if expires_at is not None and expires_at <= now:
+                self._db.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (key,))
+                self._db.commit()
+                self._touched.pop(key, None)
+                self._disk_entries -= 1
+                self._disk_bytes -= size
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None, None
+
+            if now - self._touched.get(key, accessed_at) >= TOUCH_INTERVAL:
+                self._touched[key] = now
+                if len(self._touched) >= TOUCH_BATCH:
+                    self._write_touches()
+                    self._db.commit()
+            value = self._load(body)
+            self._remember(key, expires_at, value)
+            self._stats['disk_hits'] += 1
+            return value, 'disk'
+
+    def set(self, key: str, value: Any, body, expires_at: Optional[float] = None):
+        """Store value in memory and its body on disk, trimming the disk tier if it is over budget"""
+        now = time.time()
+        columns = [self.key_column, 'body', 'size', 'accessed_at']
+        params = [key, body, len(body), now]
+        if self.expires:
+            columns.append('expires_at')
+            params.append(expires_at)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            old = self._db.execute(
+                f"SELECT size FROM {self.table} WHERE {self.key_column} = ?", (key,)
+            ).fetchone()
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['?'] * len(columns))})",
+                params
+            )
+            self._touched.pop(key, None)
+            if old is None:
+                self._disk_entries += 1
+            else:
+                self._disk_bytes -= old[0]
+            self._disk_bytes += len(body)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk(now)
+            self._db.commit()
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._db.execute(f"DELETE FROM {self.table}")
+            self._db.commit()
+            self._disk_entries = self._disk_bytes = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            hits = self._stats['memory_hits'] + self._stats['disk_hits']
+            lookups = hits + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': self._disk_entries,
+                'disk_bytes': self._disk_bytes
+            }
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _write_touches(self):
+        """Write the pending accessed_at refreshes (the caller commits)"""
+        if self._touched:
+            self._db.executemany(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE {self.key_column} = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict_disk(self, now):
+        # Least recently used is only right once pending touches are written
+        self._write_touches()
+        victims = []
+        live, params = '', ()
+        if self.expires:
+            expired = self._db.execute(
+                f"SELECT {self.key_column}, size FROM {self.table} WHERE expires_at <= ?", (now,)
+            ).fetchall()
+            victims = [(key,) for key, _ in expired]
+            self._disk_bytes -= sum(size for _, size in expired)
+            live, params = "WHERE expires_at > ?", (now,)
+        target = self.max_disk_bytes * EVICT_TO
+        if self._disk_bytes > target:
+            for key, size in self._db.execute(
+                f"SELECT {self.key_column}, size FROM {self.table} {live} ORDER BY accessed_at", params
+            ).fetchall():
+                victims.append((key,))
+                self._disk_bytes -= size
+                self._stats['evictions'] += 1
+                if self._disk_bytes <= target:
+                    break
+        self._db.executemany(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", victims)
+        self._disk_entries -= len(victims)
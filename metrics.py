@@ -0,0 +1,190 @@
+# metrics.py
+# Latency histograms and counters for the hot paths (MySQL queries and
+# writes, Google Books requests, page renders). Shown on the Performance
+# page and exported in the Prometheus text format.
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+PREFIX = 'bookscape_'
+
+# Upper bounds in seconds, from a cached lookup up to a slow page render
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Bucketed latency distribution with sum and count, like a Prometheus histogram"""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float):
+        """Estimate a quantile by interpolating inside the bucket it falls in"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts[:-1]):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        # Beyond the last bound; the largest finite bound is the best estimate
+        return BUCKETS[-1]
+
+
+class Metrics:
+    """
+    Process-wide registry of labelled histograms and counters.
+
+    Callers on hot paths check `enabled` before computing labels, so a
+    disabled registry costs one attribute lookup per call site.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration in the histogram name{labels}"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Add amount to the counter name{labels}"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def timer(self, name: str, **labels):
+        """Context manager that observes its block's duration"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return self._timer(name, labels)
+
+    @contextmanager
+    def _timer(self, name, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """Return histograms (with mean and estimated percentiles, in ms) and counters"""
+        with self._lock:
+            histograms = [(name, dict(labels), h.count, h.sum, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                          for (name, labels), h in sorted(self._histograms.items())]
+            counters = [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+        return {
+            'histograms': [
+                {
+                    'name': name,
+                    'labels': labels,
+                    'count': count,
+                    'mean_ms': total / count * 1000 if count else None,
+                    'p50_ms': p50 * 1000 if p50 is not None else None,
+                    'p95_ms': p95 * 1000 if p95 is not None else None,
+                    'p99_ms': p99 * 1000 if p99 is not None else None
+                }
+                for name, labels, count, total, p50, p95, p99 in histograms
+            ],
+            'counters': [{'name': name, 'labels': labels, 'value': value} for name, labels, value in counters]
+        }
+
+    def prometheus_text(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = [(name, labels, list(h.counts), h.sum, h.count)
+                          for (name, labels), h in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+
+        lines = []
+        typed = set()
+        for name, labels, counts, total, count in histograms:
+            metric = PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, n in zip([*BUCKETS, '+Inf'], counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        for (name, labels), value in counters:
+            metric = PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+# Shared by DatabaseManager, GoogleBooksAPI and app.py; off until enabled
+METRICS = Metrics()
+
+
+def serve_metrics(port: int, registry: Metrics = METRICS) -> ThreadingHTTPServer:
+    """Serve the Prometheus export at http://<host>:port/metrics from a background thread"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('', port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
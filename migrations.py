@@ -0,0 +1,208 @@
+# migrations.py
+"""
+Versioned schema migrations for the BookScape database.
+
+Applied versions are recorded in schema_migrations, so running this again
+only applies what is new:
+
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied and pending versions
+    python migrations.py --explain  # check every dashboard query uses an index
+    python migrations.py --rebuild-summaries  # recompute the summary tables
+
+Migrations are MySQL only. An SQLite database (DB_BACKEND=sqlite) gets the
+current schema from schema_sqlite.sql when it is opened, so only
+--rebuild-summaries applies to it.
+"""
+import argparse
+import sys
+
+import queries
+from configuration import DATABASE_CONFIG
+from database_manager import DatabaseManager
+from queries import BACKFILL_LINKS_QUERIES
+from storage import DatabaseError
+from summaries import REBUILD_SUMMARIES_QUERIES, SUMMARY_COLUMNS, SUMMARY_TABLES
+
+MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# (version, description, statements); never edit a migration once released,
+# add a new one instead
+MIGRATIONS = [
+    (1, "book_author/book_category link tables", [
+        """
+        CREATE TABLE IF NOT EXISTS book_author (
+            book_id VARCHAR(255) NOT NULL,
+            author VARCHAR(255) NOT NULL,
+            PRIMARY KEY (book_id, author),
+            INDEX idx_book_author_author (author, book_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS book_category (
+            book_id VARCHAR(255) NOT NULL,
+            category VARCHAR(255) NOT NULL,
+            PRIMARY KEY (book_id, category),
+            INDEX idx_book_category_category (category, book_id)
+        )
+        """,
+        *BACKFILL_LINKS_QUERIES
+    ]),
+    (2, "numeric year column", [
+        "UPDATE books SET year = NULL WHERE year NOT REGEXP '^[0-9]{4}$'",
+        "ALTER TABLE books MODIFY year SMALLINT NULL"
+    ]),
+    (3, "indexes for dashboard queries", [
+        # Top rated: walk averageRating backwards, filter ratingsCount from the index
+        "CREATE INDEX idx_books_rating ON books (averageRating, ratingsCount)",
+        # Trending: range on ratingsCount, year filter checked in the index
+        "CREATE INDEX idx_books_popularity ON books (ratingsCount, year)",
+        # Publication trends: GROUP BY year straight off the index
+        "CREATE INDEX idx_books_year ON books (year)",
+        # Price analysis: range + ORDER BY price, isEbook covered
+        "CREATE INDEX idx_books_retail_price ON books (amount_retailPrice, isEbook)"
+    ]),
+    (4, "year/category/author summary tables", [
+        *SUMMARY_TABLES,
+        *REBUILD_SUMMARIES_QUERIES
+    ]),
+    (5, "full-text search over title, authors, categories and description", [
+        "ALTER TABLE books ADD COLUMN search_text TEXT",
+        """
+        UPDATE books
+        SET search_text = CONCAT_WS(' ',
+            (SELECT GROUP_CONCAT(j.name SEPARATOR ' ')
+             FROM JSON_TABLE(book_authors, '$[*]' COLUMNS (name VARCHAR(1024) PATH '$')) j),
+            (SELECT GROUP_CONCAT(j.name SEPARATOR ' ')
+             FROM JSON_TABLE(categories, '$[*]' COLUMNS (name VARCHAR(1024) PATH '$')) j))
+        """,
+        "CREATE FULLTEXT INDEX ft_books_title ON books (book_title)",
+        "CREATE FULLTEXT INDEX ft_books_text ON books (book_title, search_text, description)"
+    ]),
+    (6, "search log for local-first search", [
+        "ALTER TABLE books ADD COLUMN thumbnail VARCHAR(1024)",
+        """
+        CREATE TABLE IF NOT EXISTS search_log (
+            search_key VARCHAR(255) PRIMARY KEY,
+            total_items INT NOT NULL,
+            fetched_at TIMESTAMP NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS search_results (
+            search_key VARCHAR(255) NOT NULL,
+            position INT NOT NULL,
+            book_id VARCHAR(255) NOT NULL,
+            fetched_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (search_key, position)
+        )
+        """
+    ]),
+    # Filled in as books are next written; NULL never matches, so each
+    # existing row is rewritten once
+    (7, "content fingerprint to skip unchanged upserts", [
+        "ALTER TABLE books ADD COLUMN content_hash CHAR(32)"
+    ]),
+    (8, "search popularity and change rate for the refresh scheduler", [
+        "ALTER TABLE search_log ADD COLUMN hits INT NOT NULL DEFAULT 0, ADD COLUMN change_rate FLOAT NULL",
+        "CREATE INDEX idx_search_log_fetched ON search_log (fetched_at)"
+    ]),
+    # Filled in as books are next written, like content_hash in 7
+    (9, "print type and buy link for locally served searches", [
+        "ALTER TABLE books ADD COLUMN printType VARCHAR(50) NULL, ADD COLUMN buyLink VARCHAR(1024) NULL"
+    ])
+]
+
+
+def applied_versions(db):
+    """Return the set of migration versions already applied"""
+    db.execute_statements([MIGRATIONS_TABLE])
+    return {row['version'] for row in db.execute_query("SELECT version FROM schema_migrations")}
+
+
+def migrate(db):
+    """Apply pending migrations in order; returns the versions applied"""
+    done = applied_versions(db)
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in done:
+            continue
+        print(f"Applying migration {version}: {description}")
+        try:
+            db.execute_statements([
+                *statements,
+                ("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                 (version, description))
+            ])
+        except DatabaseError as e:
+            # DDL commits implicitly in MySQL, so a failed migration may be
+            # partly applied and needs fixing by hand before re-running
+            print(f"Migration {version} failed: {e}")
+            raise
+        applied.append(version)
+    return applied
+
+
+def explain_dashboard_queries(db):
+    """
+    EXPLAIN every dashboard query.
+
+    Returns a dict of query name -> list of (table, access type, key) plans,
+    and the names of queries with a full table scan (access type ALL).
+    Scans of the summary tables are fine; they hold one row per year,
+    category or author.
+    """
+    plans = {}
+    scans = []
+    for name, (sql, params) in queries.dashboard_queries().items():
+        rows = db.execute_query("EXPLAIN " + sql, params, use_cache=False)
+        plans[name] = [(row['table'], row['type'], row['key']) for row in rows]
+        if any(row['type'] == 'ALL' and row['table'] not in SUMMARY_COLUMNS for row in rows):
+            scans.append(name)
+    return plans, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BookScape schema migrations")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--explain', action='store_true', help="check dashboard queries use indexes")
+    parser.add_argument('--rebuild-summaries', action='store_true', help="recompute the summary tables")
+    args = parser.parse_args()
+
+    with DatabaseManager(DATABASE_CONFIG) as db:
+        if args.rebuild_summaries:
+            db.rebuild_summaries()
+            print("Summary tables rebuilt")
+            return 0
+
+        if db.backend.name != 'mysql':
+            print(f"Nothing to migrate: the {db.backend.name} schema is applied when the database is opened")
+            return 0
+
+        if args.status:
+            done = applied_versions(db)
+            for version, description, _ in MIGRATIONS:
+                state = "applied" if version in done else "pending"
+                print(f"{version:>4}  {state:<8} {description}")
+            return 0
+
+        if args.explain:
+            plans, scans = explain_dashboard_queries(db)
+            for name, plan in plans.items():
+                steps = ', '.join(f"{table}:{access}/{key or '-'}" for table, access, key in plan)
+                print(f"{'SCAN' if name in scans else 'ok':<5} {name:<28} {steps}")
+            return 1 if scans else 0
+
+        applied = migrate(db)
+        print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
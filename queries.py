@@ -0,0 +1,295 @@
+# queries.py
+# SQL behind the dashboard pages, shared by app.py and the index checks in migrations.py
+
+# Trending page time periods; substituted into {year_filter}
+YEAR_FILTERS = {
+    "All Time": "",
+    "Last Year": "AND year >= YEAR(CURDATE()) - 1",
+    "Last 5 Years": "AND year >= YEAR(CURDATE()) - 5"
+}
+
+TOP_RATED_BOOKS = """
+    SELECT book_title, averageRating, ratingsCount, book_authors
+    FROM books
+    WHERE ratingsCount > 100
+    ORDER BY averageRating DESC
+    LIMIT 10
+"""
+
+# Read from the summary tables maintained by DatabaseManager (see summaries.py)
+YEAR_DISTRIBUTION = """
+    SELECT year, book_count as count
+    FROM year_stats
+    WHERE book_count > 0
+    ORDER BY year DESC
+"""
+
+PRICE_DISTRIBUTION = """
+    SELECT
+        amount_retailPrice,
+        book_title,
+        isEbook
+    FROM books
+    WHERE amount_retailPrice > 0
+    ORDER BY amount_retailPrice DESC
+    LIMIT 100
+"""
+
+TRENDING_BOOKS = """
+    SELECT
+        book_title,
+        ratingsCount,
+        averageRating,
+        book_authors,
+        categories
+    FROM books
+    WHERE ratingsCount > 1000 {year_filter}
+    ORDER BY ratingsCount DESC
+    LIMIT 10
+"""
+
+GENRE_DISTRIBUTION = """
+    SELECT
+        category,
+        book_count as count,
+        rating_sum / NULLIF(rating_count, 0) as avg_rating
+    FROM category_stats
+    WHERE book_count > 0
+    ORDER BY book_count DESC
+    LIMIT 10
+"""
+
+# Each co-author gets credit for the book
+TOP_AUTHORS_ALL_TIME = """
+    SELECT
+        author,
+        book_count,
+        rating_sum / NULLIF(rating_count, 0) as avg_rating,
+        total_ratings
+    FROM author_stats
+    WHERE book_count > 0
+    ORDER BY total_ratings DESC
+    LIMIT 10
+"""
+
+# The summary tables are not broken down by year, so time-limited author
+# rankings still aggregate over the link table
+TOP_AUTHORS = """
+    SELECT
+        ba.author,
+        COUNT(*) as book_count,
+        AVG(b.averageRating) as avg_rating,
+        SUM(b.ratingsCount) as total_ratings
+    FROM book_author ba
+    JOIN books b ON b.book_id = ba.book_id
+    WHERE 1 = 1 {year_filter}
+    GROUP BY ba.author
+    ORDER BY total_ratings DESC
+    LIMIT 10
+"""
+
+GENRE_LIST = """
+    SELECT DISTINCT category
+    FROM book_category
+    ORDER BY category
+"""
+
+GENRE_BOOKS = """
+    SELECT
+        book_title,
+        book_authors,
+        averageRating,
+        ratingsCount,
+        pageCount,
+        year,
+        amount_retailPrice,
+        isEbook
+    FROM book_category bc
+    JOIN books b ON b.book_id = bc.book_id
+    WHERE bc.category = %s
+    AND averageRating > 0
+    ORDER BY averageRating DESC, ratingsCount DESC
+    LIMIT 50
+"""
+
+# The full book list of one genre, a page at a time (DatabaseManager.keyset_page)
+GENRE_BOOKS_PAGE = """
+    SELECT
+        b.book_id,
+        book_title,
+        book_authors,
+        averageRating,
+        COALESCE(ratingsCount, 0) as ratingsCount,
+        pageCount,
+        year,
+        amount_retailPrice,
+        isEbook
+    FROM book_category bc
+    JOIN books b ON b.book_id = bc.book_id
+    WHERE bc.category = %s
+    AND averageRating > 0
+    {after}
+    ORDER BY b.averageRating DESC, COALESCE(b.ratingsCount, 0) DESC, b.book_id DESC
+"""
+
+# (expression, column, placeholder) per key. averageRating is a FLOAT
+# column while a Python float binds as DOUBLE, and MySQL compares 4.1 in
+# the two types as unequal, so the previous page's rating is cast back
+GENRE_BOOKS_KEY = [
+    ('b.averageRating', 'averageRating', 'CAST(%s AS FLOAT)'),
+    ('COALESCE(b.ratingsCount, 0)', 'ratingsCount', '%s'),
+    ('b.book_id', 'book_id', '%s')
+]
+
+# Link table -> (name column, JSON list column in books it is derived from)
+LINK_TABLES = {
+    'book_author': ('author', 'book_authors'),
+    'book_category': ('category', 'categories')
+}
+
+BACKFILL_LINKS_QUERIES = [
+    f"""
+    INSERT IGNORE INTO {table} (book_id, {column})
+    SELECT b.book_id, LEFT(j.name, 255)
+    FROM books b,
+         JSON_TABLE(b.{source}, '$[*]' COLUMNS (name VARCHAR(1024) PATH '$')) j
+    WHERE j.name IS NOT NULL AND j.name != ''
+    """
+    for table, (column, source) in LINK_TABLES.items()
+]
+
+# Local full-text search; needs the FULLTEXT indexes from migration 5
+CATALOG_SEARCH = """
+    SELECT
+        book_id,
+        book_title,
+        book_authors,
+        categories,
+        description,
+        publishedDate,
+        averageRating,
+        pageCount,
+        amount_retailPrice,
+        isEbook,
+        saleability,
+        language,
+        thumbnail,
+        printType,
+        buyLink,
+        MATCH(book_title) AGAINST (%s IN NATURAL LANGUAGE MODE) * 2
+            + MATCH(book_title, search_text, description) AGAINST (%s IN NATURAL LANGUAGE MODE) as score
+    FROM books
+    WHERE MATCH(book_title, search_text, description) AGAINST (%s IN NATURAL LANGUAGE MODE)
+    ORDER BY score DESC
+    LIMIT %s
+"""
+
+# Local-first search: which books each API search returned, and when
+RECORD_SEARCH = """
+    INSERT INTO search_log (search_key, total_items, fetched_at)
+    VALUES (%s, %s, NOW())
+    ON DUPLICATE KEY UPDATE total_items = VALUES(total_items), fetched_at = VALUES(fetched_at)
+"""
+
+RECORD_SEARCH_RESULTS = """
+    INSERT INTO search_results (search_key, position, book_id, fetched_at)
+    VALUES {values}
+    ON DUPLICATE KEY UPDATE book_id = VALUES(book_id), fetched_at = VALUES(fetched_at)
+"""
+
+STORED_SEARCH_LOG = """
+    SELECT total_items
+    FROM search_log
+    WHERE search_key = %s
+    AND fetched_at >= NOW() - INTERVAL %s SECOND
+"""
+
+# Stored searches last fetched more than %s seconds ago, with what the
+# refresh scheduler ranks them by
+REFRESH_CANDIDATES = """
+    SELECT
+        l.search_key,
+        TIMESTAMPDIFF(SECOND, l.fetched_at, NOW()) AS age,
+        l.hits,
+        l.change_rate,
+        (SELECT COUNT(*) FROM search_results r WHERE r.search_key = l.search_key) AS stored
+    FROM search_log l
+    WHERE l.fetched_at < NOW() - INTERVAL %s SECOND
+"""
+
+ADD_SEARCH_HITS = "UPDATE search_log SET hits = hits + %s WHERE search_key = %s"
+
+SET_CHANGE_RATE = "UPDATE search_log SET change_rate = %s WHERE search_key = %s"
+
+STORED_SEARCH_RESULTS = """
+    SELECT sr.position, b.*
+    FROM search_results sr
+    JOIN books b ON b.book_id = sr.book_id
+    WHERE sr.search_key = %s
+    AND sr.position < %s
+    AND sr.fetched_at >= NOW() - INTERVAL %s SECOND
+    ORDER BY sr.position
+"""
+
+
+def keyset_page_query(sql, keys, has_after):
+    """
+    Fill a keyset query's {after} placeholder and append its LIMIT.
+
+    keys is a list of (expression, column, placeholder) triples, as
+    GENRE_BOOKS_KEY. Placeholders, in order: the query's own parameters, one
+    per key when has_after, then the limit. Rows come strictly after the
+    previous page's last key, so every page costs the same however deep it
+    is, unlike OFFSET.
+    """
+    after = ''
+    if has_after:
+        after = "AND ({keys}) < ({placeholders})".format(
+            keys=', '.join(expression for expression, _, _ in keys),
+            placeholders=', '.join(placeholder for _, _, placeholder in keys)
+        )
+    return sql.format(after=after) + " LIMIT %s"
+
+
+def top_authors(year_filter):
+    """Top Authors query for a YEAR_FILTERS value"""
+    if not year_filter:
+        return TOP_AUTHORS_ALL_TIME
+    return TOP_AUTHORS.format(year_filter=year_filter)
+
+
+def dashboard_queries():
+    """Every dashboard query with sample parameters, for EXPLAIN checks and benchmarks"""
+    queries = {
+        'top_rated_books': (TOP_RATED_BOOKS, None),
+        'year_distribution': (YEAR_DISTRIBUTION, None),
+        'price_distribution': (PRICE_DISTRIBUTION, None),
+        'genre_distribution': (GENRE_DISTRIBUTION, None),
+        'genre_list': (GENRE_LIST, None),
+        'genre_books': (GENRE_BOOKS, ('Fiction',)),
+        'genre_books_page': (
+            keyset_page_query(GENRE_BOOKS_PAGE, GENRE_BOOKS_KEY, True),
+            ('Fiction', 4.5, 100, '', 51)
+        )
+    }
+    for period, year_filter in YEAR_FILTERS.items():
+        suffix = period.lower().replace(' ', '_')
+        queries[f'trending_books_{suffix}'] = (TRENDING_BOOKS.format(year_filter=year_filter), None)
+        queries[f'top_authors_{suffix}'] = (top_authors(year_filter), None)
+    return queries
+
+
+# Metric labels for known statements; anything else is labelled by its text
+QUERY_NAMES = {
+    CATALOG_SEARCH: 'catalog_search',
+    STORED_SEARCH_LOG: 'stored_search_log',
+    STORED_SEARCH_RESULTS: 'stored_search_results',
+    REFRESH_CANDIDATES: 'refresh_candidates',
+    keyset_page_query(GENRE_BOOKS_PAGE, GENRE_BOOKS_KEY, False): 'genre_books_first_page',
+    **{sql: name for name, (sql, _) in dashboard_queries().items()}
+}
+
+
+def query_name(sql):
+    """Short label for a SQL statement in metrics"""
+    return QUERY_NAMES.get(sql) or ' '.join(sql.split())[:80]
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of SELECT results, shared by every session in the process.
+
+    Keys include a dataset version that DatabaseManager bumps on every write,
+    so a cached result can never outlive the data it was computed from. The
+    max_age bound covers writes made by other processes (crawler, refresh
+    worker), which this process cannot see.
+    """
+
+    def __init__(self, max_entries: int = 512, max_rows: int = 10000, max_age: float = 300):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'uncacheable': 0}
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self):
+        """Mark every cached result as stale after a write"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def make_key(self, query: str, params) -> tuple:
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return (self._version, query, params)
+
+    def get(self, key: tuple) -> Optional[list]:
+        """Return cached rows for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic() - self.max_age:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
+
+    def set(self, key: tuple, rows: list):
+        """Cache rows under key unless the result is too large or already stale"""
+        with self._lock:
+            if len(rows) > self.max_rows:
+                self._stats['uncacheable'] += 1
+                return
+            if key[0] != self._version:
+                return
+            self._entries[key] = (time.monotonic(), rows)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'dataset_version': self._version
+            }
@@ -0,0 +1,206 @@
+# refresh_scheduler.py
+"""
+Background refresh of stored searches, so ratings, prices and saleability
+in the books table do not wait for someone to repeat a search.
+
+Every interval, stored searches last fetched more than min_age seconds ago
+are ranked by how stale they are, how often they are searched (hits) and
+how much their books changed on earlier refreshes (change_rate), and the
+top ones are re-fetched while the hourly request budget allows. It runs on
+a daemon thread inside the app (REFRESH_REQUESTS_PER_HOUR > 0), or as its
+own process:
+
+    python refresh_scheduler.py --once       # one round, then exit
+    python refresh_scheduler.py --worker     # keep refreshing
+"""
+import argparse
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from api_handler import PAGE_SIZE
+from metrics import METRICS
+from search_service import SearchService
+
+# Change rate assumed for a search that has not been refreshed yet
+UNKNOWN_CHANGE_RATE = 0.5
+# Weight of the latest refresh in a search's change_rate
+CHANGE_RATE_WEIGHT = 0.5
+
+
+class RefreshScheduler:
+    """
+    Re-fetches the stored searches most worth refreshing, off the request
+    path and within requests_per_hour API requests.
+
+    A search's priority is its age in units of min_age, times
+    1 + log(1 + hits), times 0.1 + change_rate: old, popular and volatile
+    searches go first, and one whose books never change still comes round
+    eventually.
+    """
+
+    def __init__(
+        self,
+        service: SearchService,
+        requests_per_hour: int = 60,
+        min_age: int = 43200,
+        max_results: int = 40,
+        interval: float = 300.0
+    ):
+        self.service = service
+        self.db = service.db
+        self.requests_per_hour = requests_per_hour
+        self.min_age = min_age
+        self.max_results = max_results
+        self.interval = interval
+        self._spent = deque()  # (monotonic time, requests) within the last hour
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'rounds': 0, 'refreshed': 0, 'requests': 0, 'changed': 0, 'unchanged': 0, 'errors': 0}
+
+    def priority(self, candidate: Dict) -> float:
+        """Refresh priority of a refresh_candidates row; higher goes first"""
+        change_rate = candidate['change_rate']
+        change_rate = UNKNOWN_CHANGE_RATE if change_rate is None else float(change_rate)
+        age = float(candidate['age'] or 0) / self.min_age
+        return age * (1 + math.log1p(candidate['hits'] or 0)) * (0.1 + change_rate)
+
+    def pages(self, candidate: Dict) -> int:
+        """API requests a refresh of candidate costs"""
+        return max(1, math.ceil(min(candidate['stored'] or 0, self.max_results) / PAGE_SIZE))
+
+    def budget_left(self) -> int:
+        """Requests still allowed in the current hour"""
+        cutoff = time.monotonic() - 3600
+        with self._lock:
+            while self._spent and self._spent[0][0] < cutoff:
+                self._spent.popleft()
+            return self.requests_per_hour - sum(requests for _, requests in self._spent)
+
+    def run_once(self) -> List[Dict]:
+        """Refresh the highest priority stale searches the budget allows; returns what was done"""
+        self.service.flush_hits()
+        self._stats['rounds'] += 1
+        budget = self.budget_left()
+        if budget <= 0:
+            return []
+
+        queue = [
+            (-self.priority(candidate), candidate['search_key'], candidate)
+            for candidate in self.db.refresh_candidates(self.min_age)
+        ]
+        heapq.heapify(queue)
+        done = []
+        while queue and budget > 0:
+            _, search_key, candidate = heapq.heappop(queue)
+            pages = self.pages(candidate)
+            if pages > budget:
+                continue
+            with self._lock:
+                self._spent.append((time.monotonic(), pages))
+            budget -= pages
+            done.append(self._refresh(candidate))
+        return done
+
+    def start(self) -> 'RefreshScheduler':
+        """Run rounds on a daemon thread every interval seconds"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict:
+        """Refresh counters and the request budget left this hour"""
+        return {**self._stats, 'budget_left': self.budget_left(), 'requests_per_hour': self.requests_per_hour}
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Any failure (database, network, a malformed response) costs one
+            # round, not the thread: later rounds keep running
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Refresh round failed: {type(e).__name__}: {e}")
+                self._stats['errors'] += 1
+
+    def _refresh(self, candidate):
+        search_key = candidate['search_key']
+        start = time.perf_counter()
+        counts = self.service.refresh(search_key, self.max_results)
+        changed = counts['inserted'] + counts['updated']
+        written = changed + counts['unchanged']
+        if written:
+            observed = changed / written
+            previous = candidate['change_rate']
+            change_rate = observed if previous is None else \
+                CHANGE_RATE_WEIGHT * observed + (1 - CHANGE_RATE_WEIGHT) * float(previous)
+            self.db.set_change_rate(search_key, change_rate)
+
+        self._stats['refreshed'] += 1
+        self._stats['requests'] += counts['requests']
+        self._stats['changed'] += changed
+        self._stats['unchanged'] += counts['unchanged']
+        if METRICS.enabled:
+            METRICS.observe('search_refresh_seconds', time.perf_counter() - start)
+            METRICS.inc('search_refresh_books_total', changed, outcome='changed')
+            METRICS.inc('search_refresh_books_total', counts['unchanged'], outcome='unchanged')
+        return {'search_key': search_key, 'priority': self.priority(candidate), **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh stale stored searches from Google Books")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--once', action='store_true', help="run one round and exit")
+    mode.add_argument('--worker', action='store_true', help="keep running rounds every REFRESH_INTERVAL seconds")
+    parser.add_argument('--base-url', help="volumes endpoint, e.g. a local stub server")
+    args = parser.parse_args()
+
+    from api_handler import GoogleBooksAPI
+    from configuration import (
+        DATABASE_CONFIG, GOOGLE_BOOKS_API_KEY, GOOGLE_BOOKS_RATE_LIMIT, GOOGLE_BOOKS_RATE_BURST,
+        LOCAL_FIRST_MAX_AGE, REFRESH_REQUESTS_PER_HOUR, REFRESH_MIN_AGE, REFRESH_INTERVAL
+    )
+    from database_manager import DatabaseManager
+
+    api_options = {'base_url': args.base_url} if args.base_url else {}
+    api = GoogleBooksAPI(
+        GOOGLE_BOOKS_API_KEY,
+        rate_limit=GOOGLE_BOOKS_RATE_LIMIT,
+        rate_burst=GOOGLE_BOOKS_RATE_BURST,
+        **api_options
+    )
+    with DatabaseManager(DATABASE_CONFIG) as db:
+        scheduler = RefreshScheduler(
+            SearchService(api, db, max_age=LOCAL_FIRST_MAX_AGE),
+            requests_per_hour=REFRESH_REQUESTS_PER_HOUR,
+            min_age=REFRESH_MIN_AGE,
+            interval=REFRESH_INTERVAL
+        )
+        if args.once:
+            for refresh in scheduler.run_once():
+                print(f"{refresh['search_key']!r}: {refresh['requests']} requests, "
+                      f"{refresh['inserted'] + refresh['updated']} changed, {refresh['unchanged']} unchanged")
+            return 0
+        print(f"Refreshing up to {REFRESH_REQUESTS_PER_HOUR} requests per hour; Ctrl-C to stop")
+        while True:
+            try:
+                scheduler.run_once()
+            except Exception as e:
+                print(f"Refresh round failed: {type(e).__name__}: {e}")
+                scheduler._stats['errors'] += 1
+            print(scheduler.stats())
+            time.sleep(REFRESH_INTERVAL)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
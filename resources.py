@@ -0,0 +1,126 @@
+# resources.py
+# Long-lived objects the app shares across sessions and reruns. Each is
+# built on first use and cached for the life of the process, so a page
+# only pays for what it touches.
+import functools
+
+import streamlit as st
+
+from api_handler import GoogleBooksAPI
+from configuration import (
+    DATABASE_CONFIG, GOOGLE_BOOKS_API_KEY, DB_POOL_SIZE, GOOGLE_BOOKS_RATE_LIMIT, GOOGLE_BOOKS_RATE_BURST, GOOGLE_BOOKS_MAX_WORKERS,
+    GOOGLE_BOOKS_CACHE_PATH, GOOGLE_BOOKS_CACHE_TTL, GOOGLE_BOOKS_CACHE_MAX_MB,
+    QUERY_CACHE_MAX_ENTRIES, QUERY_CACHE_MAX_AGE, LOCAL_FIRST_MAX_AGE, METRICS_ENABLED, METRICS_PORT,
+    DASHBOARD_SNAPSHOT_PATH, THUMBNAIL_CACHE_PATH, THUMBNAIL_CACHE_MAX_MB, THUMBNAIL_MAX_WORKERS,
+    REFRESH_REQUESTS_PER_HOUR, REFRESH_MIN_AGE, REFRESH_INTERVAL
+)
+from database_manager import DatabaseManager
+from metrics import METRICS, Metrics, serve_metrics
+from query_cache import QueryCache
+from refresh_scheduler import RefreshScheduler
+from response_cache import ResponseCache
+from search_service import SearchService
+from thumbnail_cache import ThumbnailCache
+from write_behind import WriteBehindQueue
+
+# What the factories below have built in this process, by factory name
+_BUILT = {}
+
+
+def _tracked(factory):
+    """Remember what factory builds, so peek can return it without building it"""
+    @functools.wraps(factory)
+    def build():
+        resource = _BUILT[factory.__name__] = factory()
+        return resource
+    return build
+
+
+def peek(factory):
+    """What factory has already built in this process, or None; never builds it (for the sidebar stats)"""
+    return _BUILT.get(factory.__name__)
+
+
+@st.cache_resource
+@_tracked
+def get_database() -> DatabaseManager:
+    """One pooled DatabaseManager shared by every session for the life of the process"""
+    return DatabaseManager(
+        DATABASE_CONFIG,
+        pool_size=DB_POOL_SIZE,
+        query_cache=QueryCache(max_entries=QUERY_CACHE_MAX_ENTRIES, max_age=QUERY_CACHE_MAX_AGE)
+    )
+
+
+@st.cache_resource
+@_tracked
+def get_api() -> GoogleBooksAPI:
+    """One API client, and so one keep-alive HTTP session, per process"""
+    return GoogleBooksAPI(
+        GOOGLE_BOOKS_API_KEY,
+        rate_limit=GOOGLE_BOOKS_RATE_LIMIT,
+        rate_burst=GOOGLE_BOOKS_RATE_BURST,
+        max_workers=GOOGLE_BOOKS_MAX_WORKERS,
+        cache=ResponseCache(
+            GOOGLE_BOOKS_CACHE_PATH,
+            ttl=GOOGLE_BOOKS_CACHE_TTL,
+            max_disk_bytes=GOOGLE_BOOKS_CACHE_MAX_MB * 1024 * 1024
+        )
+    )
+
+
+@st.cache_resource
+@_tracked
+def get_writer() -> WriteBehindQueue:
+    """Background writer that stores search results without blocking rendering"""
+    return WriteBehindQueue(get_database())
+
+
+@st.cache_resource
+@_tracked
+def get_search_service() -> SearchService:
+    """Serves recent searches from MySQL and only asks Google Books for the rest"""
+    return SearchService(get_api(), get_database(), get_writer(), max_age=LOCAL_FIRST_MAX_AGE)
+
+
+@st.cache_resource
+def get_refresh_scheduler():
+    """Background refresh of stale stored searches, if REFRESH_REQUESTS_PER_HOUR is set"""
+    if not REFRESH_REQUESTS_PER_HOUR:
+        return None
+    return RefreshScheduler(
+        get_search_service(),
+        requests_per_hour=REFRESH_REQUESTS_PER_HOUR,
+        min_age=REFRESH_MIN_AGE,
+        interval=REFRESH_INTERVAL
+    ).start()
+
+
+@st.cache_resource
+@_tracked
+def get_thumbnails() -> ThumbnailCache:
+    """Cover images shared by every session and kept on disk across restarts"""
+    return ThumbnailCache(
+        THUMBNAIL_CACHE_PATH,
+        max_disk_bytes=THUMBNAIL_CACHE_MAX_MB * 1024 * 1024,
+        max_workers=THUMBNAIL_MAX_WORKERS
+    )
+
+
+@st.cache_resource
+def get_snapshot():
+    """Read-only dashboard source backed by a Parquet snapshot, if one is configured"""
+    if not DASHBOARD_SNAPSHOT_PATH:
+        return None
+    # Imported here: snapshot loads pyarrow and pandas
+    from snapshot import SnapshotCatalog
+    return SnapshotCatalog(DASHBOARD_SNAPSHOT_PATH)
+
+
+@st.cache_resource
+def get_metrics() -> Metrics:
+    """Switch metrics on once per process and start the /metrics endpoint if configured"""
+    METRICS.enabled = METRICS_ENABLED
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
+    return METRICS
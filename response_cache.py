@@ -0,0 +1,55 @@
+import json
+import time
+from typing import Dict, Optional
+
+from lru_store import LRUStore
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Google Books responses.
+
+    An LRUStore keeps a small in-memory LRU in front of a SQLite file, so hot
+    queries are served without touching disk and everything survives an app
+    restart. Every entry carries its own expiry time; the disk tier is
+    trimmed back under max_disk_bytes by evicting expired, then least
+    recently used entries.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 86400,
+        memory_entries: int = 256,
+        max_disk_bytes: int = 100 * 1024 * 1024
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._store = LRUStore(
+            path, 'responses', 'cache_key', expires=True, load=json.loads,
+            memory_entries=memory_entries, max_disk_bytes=max_disk_bytes
+        )
+
+    @staticmethod
+    def make_key(params: Dict) -> str:
+        """Build a stable key from request parameters (query, paging and filters)"""
+        return json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response, or None if missing or expired"""
+        return self._store.get(key)[0]
+
+    def set(self, key: str, value: Dict, ttl: Optional[float] = None):
+        """Store a response in both tiers"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._store.set(key, value, json.dumps(value), expires_at)
+
+    def clear(self):
+        """Drop every cached response"""
+        self._store.clear()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        return self._store.stats()
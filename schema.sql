@@ -20,10 +20,100 @@ CREATE TABLE IF NOT EXISTS books (
     amount_listPrice DECIMAL(10,2),
     amount_retailPrice DECIMAL(10,2),
     search_key VARCHAR(255),
-    year VARCHAR(4),
+    year SMALLINT,
+    search_text TEXT,
+    thumbnail VARCHAR(1024),
+    printType VARCHAR(50),
+    buyLink VARCHAR(1024),
+    content_hash CHAR(32),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_books_rating (averageRating, ratingsCount),
+    INDEX idx_books_popularity (ratingsCount, year),
+    INDEX idx_books_year (year),
+    INDEX idx_books_retail_price (amount_retailPrice, isEbook),
+    FULLTEXT INDEX ft_books_title (book_title),
+    FULLTEXT INDEX ft_books_text (book_title, search_text, description)
 );
+
+-- This file creates a new database at the latest schema version. Existing
+-- databases are upgraded with `python migrations.py` instead
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO schema_migrations (version, description) VALUES
+    (1, 'book_author/book_category link tables'),
+    (2, 'numeric year column'),
+    (3, 'indexes for dashboard queries'),
+    (4, 'year/category/author summary tables'),
+    (5, 'full-text search over title, authors, categories and description'),
+    (6, 'search log for local-first search'),
+    (7, 'content fingerprint to skip unchanged upserts'),
+    (8, 'search popularity and change rate for the refresh scheduler'),
+    (9, 'print type and buy link for locally served searches');
+
+-- One row per (book, author) and (book, category) so genre and author
+-- queries use index lookups instead of scanning the JSON columns
+CREATE TABLE IF NOT EXISTS book_author (
+    book_id VARCHAR(255) NOT NULL,
+    author VARCHAR(255) NOT NULL,
+    PRIMARY KEY (book_id, author),
+    INDEX idx_book_author_author (author, book_id)
+);
+
+CREATE TABLE IF NOT EXISTS book_category (
+    book_id VARCHAR(255) NOT NULL,
+    category VARCHAR(255) NOT NULL,
+    PRIMARY KEY (book_id, category),
+    INDEX idx_book_category_category (category, book_id)
+);
+
+-- Pre-aggregated chart data, kept current by DatabaseManager on every upsert.
+-- Recompute from scratch with `python migrations.py --rebuild-summaries`
+CREATE TABLE IF NOT EXISTS year_stats (
+    year SMALLINT PRIMARY KEY,
+    book_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS category_stats (
+    category VARCHAR(255) PRIMARY KEY,
+    book_count INT NOT NULL DEFAULT 0,
+    rating_sum DOUBLE NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
+    INDEX idx_category_stats_count (book_count)
+);
+
+CREATE TABLE IF NOT EXISTS author_stats (
+    author VARCHAR(255) PRIMARY KEY,
+    book_count INT NOT NULL DEFAULT 0,
+    rating_sum DOUBLE NOT NULL DEFAULT 0,
+    rating_count INT NOT NULL DEFAULT 0,
+    total_ratings BIGINT NOT NULL DEFAULT 0,
+    INDEX idx_author_stats_total (total_ratings)
+);
+
+-- Which books each Google Books search returned, by position, so repeated
+-- searches can be served locally while they are fresh
+CREATE TABLE IF NOT EXISTS search_log (
+    search_key VARCHAR(255) PRIMARY KEY,
+    total_items INT NOT NULL,
+    fetched_at TIMESTAMP NOT NULL,
+    hits INT NOT NULL DEFAULT 0,
+    change_rate FLOAT NULL,
+    INDEX idx_search_log_fetched (fetched_at)
+);
+
+CREATE TABLE IF NOT EXISTS search_results (
+    search_key VARCHAR(255) NOT NULL,
+    position INT NOT NULL,
+    book_id VARCHAR(255) NOT NULL,
+    fetched_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (search_key, position)
+);
+
 -- Check if data exists
 SELECT COUNT(*) FROM books;
 
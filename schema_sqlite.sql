@@ -0,0 +1,123 @@
+-- SQLite version of schema.sql, for the embedded backend (storage.py).
+-- Applied automatically whenever the database is opened, so it must stay
+-- idempotent. Author, category and search keys use NOCASE to match MySQL's
+-- case-insensitive collation.
+PRAGMA journal_mode = WAL;
+
+CREATE TABLE IF NOT EXISTS books (
+    book_id TEXT PRIMARY KEY,
+    book_title TEXT,
+    book_authors TEXT,
+    publisher TEXT,
+    publishedDate TEXT,
+    description TEXT,
+    isbn TEXT,
+    pageCount INTEGER,
+    categories TEXT,
+    averageRating REAL,
+    ratingsCount INTEGER,
+    maturityRating TEXT,
+    language TEXT,
+    isEbook INTEGER,
+    saleability TEXT,
+    amount_listPrice REAL,
+    amount_retailPrice REAL,
+    search_key TEXT,
+    year INTEGER,
+    search_text TEXT,
+    thumbnail TEXT,
+    printType TEXT,
+    buyLink TEXT,
+    content_hash TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_books_rating ON books (averageRating, ratingsCount);
+CREATE INDEX IF NOT EXISTS idx_books_popularity ON books (ratingsCount, year);
+CREATE INDEX IF NOT EXISTS idx_books_year ON books (year);
+CREATE INDEX IF NOT EXISTS idx_books_retail_price ON books (amount_retailPrice, isEbook);
+
+-- MySQL's ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS books_updated_at AFTER UPDATE ON books
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE books SET updated_at = CURRENT_TIMESTAMP WHERE book_id = NEW.book_id;
+END;
+
+-- Full-text search over title, authors/categories and description (the
+-- FULLTEXT indexes in MySQL), kept in step with books by triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    book_title, search_text, description,
+    content = 'books', content_rowid = 'rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, book_title, search_text, description)
+    VALUES (NEW.rowid, NEW.book_title, NEW.search_text, NEW.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_delete AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, book_title, search_text, description)
+    VALUES ('delete', OLD.rowid, OLD.book_title, OLD.search_text, OLD.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS books_fts_update AFTER UPDATE OF book_title, search_text, description ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, book_title, search_text, description)
+    VALUES ('delete', OLD.rowid, OLD.book_title, OLD.search_text, OLD.description);
+    INSERT INTO books_fts (rowid, book_title, search_text, description)
+    VALUES (NEW.rowid, NEW.book_title, NEW.search_text, NEW.description);
+END;
+
+CREATE TABLE IF NOT EXISTS book_author (
+    book_id TEXT NOT NULL,
+    author TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (book_id, author)
+);
+CREATE INDEX IF NOT EXISTS idx_book_author_author ON book_author (author, book_id);
+
+CREATE TABLE IF NOT EXISTS book_category (
+    book_id TEXT NOT NULL,
+    category TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (book_id, category)
+);
+CREATE INDEX IF NOT EXISTS idx_book_category_category ON book_category (category, book_id);
+
+CREATE TABLE IF NOT EXISTS year_stats (
+    year INTEGER PRIMARY KEY,
+    book_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS category_stats (
+    category TEXT PRIMARY KEY COLLATE NOCASE,
+    book_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_category_stats_count ON category_stats (book_count);
+
+CREATE TABLE IF NOT EXISTS author_stats (
+    author TEXT PRIMARY KEY COLLATE NOCASE,
+    book_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum REAL NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    total_ratings INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_author_stats_total ON author_stats (total_ratings);
+
+CREATE TABLE IF NOT EXISTS search_log (
+    search_key TEXT PRIMARY KEY COLLATE NOCASE,
+    total_items INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    change_rate REAL
+);
+CREATE INDEX IF NOT EXISTS idx_search_log_fetched ON search_log (fetched_at);
+
+CREATE TABLE IF NOT EXISTS search_results (
+    search_key TEXT NOT NULL COLLATE NOCASE,
+    position INTEGER NOT NULL,
+    book_id TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (search_key, position)
+);
@@ -0,0 +1,204 @@
+# search_service.py
+# Local-first search: stored results first, Google Books only for what is missing
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+from api_handler import PAGE_SIZE, GoogleBooksAPI, SearchFilters
+from book import Book
+from database_manager import DatabaseManager
+from storage import DatabaseError
+from write_behind import WriteBehindQueue
+
+
+class SearchService:
+    """
+    Local-first book search.
+
+    A query whose last Google Books fetch is younger than max_age is served
+    straight from the books table. Stale or unknown queries go to the API,
+    and when only the first part of a result range is stored locally the
+    rest is topped up from the API. Every API result is stored (through the
+    write-behind queue when one is given) and its position recorded, so the
+    next identical search can stay local.
+
+    Filtered searches are stored per set of filters Google Books applies
+    itself (SearchFilters.search_key); enough pages are read, stored or
+    fetched, to find max_results books that also pass the others.
+
+    Searches per search_key are counted and added to search_log.hits in the
+    background every hit_flush_interval seconds; the refresh scheduler
+    ranks stored searches by them.
+    """
+
+    def __init__(
+        self,
+        api: GoogleBooksAPI,
+        db: DatabaseManager,
+        writer: Optional[WriteBehindQueue] = None,
+        max_age: int = 86400,
+        hit_flush_interval: float = 60.0
+    ):
+        self.api = api
+        self.db = db
+        self.writer = writer
+        self.max_age = max_age
+        self.hit_flush_interval = hit_flush_interval
+        self._lock = threading.Lock()
+        self._stats = {'served_local': 0, 'topped_up': 0, 'served_api': 0, 'refreshed': 0}
+        self._hits = Counter()
+        self._hits_flushed_at = time.monotonic()
+
+    def iter_books(
+        self,
+        query: str,
+        max_results: int = 40,
+        refresh: bool = False,
+        filters: Optional[SearchFilters] = None,
+        max_requests: int = 10
+    ) -> Iterator[List[Book]]:
+        """
+        Yield pages of Books; stored results come first.
+
+        Args:
+            query: Search term
+            max_results: Maximum number of results (passing filters) to return
+            refresh: Skip the local store and re-fetch everything from the API
+            filters: Filters to find max_results matches for; pages are
+                yielded unfiltered, apply filters.matches to them
+            max_requests: Most API pages to fetch looking for matches
+        """
+        filters = filters or SearchFilters()
+        search_key = filters.search_key(query)
+        self._note_hit(search_key)
+        # Client-side filters may need results beyond the first max_results
+        limit = max(max_results, max_requests * PAGE_SIZE) if filters.client_side else max_results
+        total, rows = (None, []) if refresh else self.db.stored_search(search_key, limit, self.max_age)
+
+        # Only a gap-free run from position 0 can be served locally
+        local = []
+        matched = 0
+        for row in rows:
+            if row['position'] != len(local) or matched >= max_results:
+                break
+            book = Book.from_row(row)
+            local.append(book)
+            matched += filters.matches(book)
+
+        if total is not None and (matched >= max_results or len(local) >= total):
+            self._count('served_local')
+            if local:
+                yield local
+            return
+
+        self._count('topped_up' if local else 'served_api')
+        if local:
+            yield local
+
+        page_info = {}
+        position = len(local)
+        for page in self.api.iter_matching(
+            query,
+            max_results - matched,
+            filters,
+            max_requests,
+            refresh=refresh,
+            start_index=len(local),
+            page_info=page_info
+        ):
+            self._store(query, search_key, position, page, page_info['totalItems'])
+            position += len(page)
+            yield page
+
+        if position == len(local) and 'totalItems' in page_info:
+            # Remember that there is nothing more to fetch
+            self._record(search_key, position, [], page_info['totalItems'])
+
+    def search_books(
+        self,
+        query: str,
+        max_results: int = 40,
+        refresh: bool = False,
+        filters: Optional[SearchFilters] = None,
+        max_requests: int = 10
+    ) -> List[Book]:
+        """Return up to max_results books passing filters, local-first"""
+        filters = filters or SearchFilters()
+        books = []
+        for page in self.iter_books(query, max_results, refresh, filters, max_requests):
+            books.extend(book for book in page if filters.matches(book))
+        return books[:max_results]
+
+    def refresh(self, search_key: str, max_results: int = 40) -> Dict:
+        """
+        Re-fetch a stored search from the API and write its books right away
+        (not through the write-behind queue), for the refresh scheduler.
+
+        Returns the pages fetched and the insert_books counts.
+        """
+        query, filters = SearchFilters.from_search_key(search_key)
+        counts = {'requests': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        page_info = {}
+        position = 0
+        for page in self.api.iter_books(
+            query, max_results, refresh=True, page_info=page_info, params=filters.request_params()
+        ):
+            counts['requests'] += 1
+            for book in page:
+                book.search_key = query
+            for key, value in self.db.insert_books(page).items():
+                counts[key] += value
+            self.db.record_search(search_key, position, [book.book_id for book in page], page_info['totalItems'])
+            position += len(page)
+
+        if position == 0 and page_info:
+            counts['requests'] = 1
+            self.db.record_search(search_key, 0, [], page_info['totalItems'])
+        self._count('refreshed')
+        return counts
+
+    def flush_hits(self):
+        """Add the searches counted since the last flush to search_log.hits"""
+        with self._lock:
+            hits, self._hits = self._hits, Counter()
+            self._hits_flushed_at = time.monotonic()
+        try:
+            self.db.add_search_hits(hits)
+        except DatabaseError as e:
+            print(f"Could not record search hits: {e}")
+
+    def stats(self) -> Dict:
+        """Return how many searches were served locally, topped up or sent to the API"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _note_hit(self, search_key):
+        with self._lock:
+            self._hits[search_key] += 1
+            due = time.monotonic() - self._hits_flushed_at >= self.hit_flush_interval
+            if due:
+                self._hits_flushed_at = time.monotonic()
+        if due:
+            threading.Thread(target=self.flush_hits, name="search-hits", daemon=True).start()
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _store(self, query, search_key, start_index, page, total_items):
+        for book in page:
+            book.search_key = query
+        if self.writer:
+            self.writer.put_many(page)
+        else:
+            self.db.insert_books(page)
+        self._record(search_key, start_index, [book.book_id for book in page], total_items)
+
+    def _record(self, search_key, start_index, book_ids, total_items):
+        # Through the writer, positions are written after the books they point
+        # at and no database round trip stands before the page's cards
+        if self.writer:
+            self.writer.record_search(search_key, start_index, book_ids, total_items)
+        else:
+            self.db.record_search(search_key, start_index, book_ids, total_items)
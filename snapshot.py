@@ -0,0 +1,409 @@
+# snapshot.py
+"""
+Parquet snapshots of the books catalog.
+
+A snapshot is a directory of Parquet files partitioned by year and
+language (hive layout, year=2004/language=en/part-0.parquet), with authors
+and categories stored as list<string> columns. It is written by streaming
+the books table, so export memory does not grow with the catalog:
+
+    python snapshot.py export snapshots/books        # books table -> snapshot
+    python snapshot.py import snapshots/books        # snapshot -> books table (upsert)
+
+SnapshotCatalog serves the dashboard queries straight from a snapshot with
+memory-mapped reads, for read-only deployments (DASHBOARD_SNAPSHOT_PATH).
+
+Needs pyarrow, which is optional: nothing else in the app imports it.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from datetime import date, datetime, timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:
+    pa = None
+
+import frames
+import queries
+from book import to_float
+from database_manager import BOOK_COLUMNS
+
+MANIFEST = '_snapshot.json'
+LIST_COLUMNS = ('book_authors', 'categories')
+# Most Parquet files export keeps open at once; a year/language partition
+# beyond it is closed and continued in a new file
+MAX_OPEN_FILES = 512
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet snapshots need pyarrow: pip install pyarrow")
+
+
+def book_schema():
+    """Arrow schema of a snapshot, in BOOK_COLUMNS order"""
+    _require_pyarrow()
+    types = {
+        'book_authors': pa.list_(pa.string()),
+        'categories': pa.list_(pa.string()),
+        'pageCount': pa.int32(),
+        'averageRating': pa.float64(),
+        'ratingsCount': pa.int64(),
+        'isEbook': pa.bool_(),
+        'amount_listPrice': pa.float64(),
+        'amount_retailPrice': pa.float64(),
+        'year': pa.int16()
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in BOOK_COLUMNS])
+
+
+def partitioning():
+    _require_pyarrow()
+    return ds.partitioning(pa.schema([('year', pa.int16()), ('language', pa.string())]), flavor='hive')
+
+
+def _rows_to_batch(rows, schema):
+    """Record batch from iter_query tuples in BOOK_COLUMNS order"""
+    columns = []
+    for field, values in zip(schema, zip(*rows)):
+        if field.name in LIST_COLUMNS:
+            values = frames.decode_json_column(values)
+        elif pa.types.is_floating(field.type):
+            values = [to_float(v) for v in values]
+        elif pa.types.is_boolean(field.type):
+            values = [bool(v) if v is not None else None for v in values]
+        columns.append(pa.array(values, type=field.type))
+    return pa.record_batch(columns, schema=schema)
+
+
+def export_snapshot(db, path, chunk_size=50000):
+    """
+    Stream the books table into a snapshot at path.
+
+    The snapshot is written next to path and swapped in when complete, so
+    readers never see a half-written one; a failed export removes it.
+
+    Returns:
+        Dict with 'rows' and 'seconds'
+    """
+    schema = book_schema()
+    start = time.perf_counter()
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for chunk in db.iter_query(f"SELECT {', '.join(BOOK_COLUMNS)} FROM books", chunk_size=chunk_size):
+            rows += len(chunk)
+            yield _rows_to_batch(chunk, schema)
+
+    # One chunk can span every year/language pair, and pyarrow refuses a
+    # batch with more partitions than max_partitions (1024 by default);
+    # the headroom covers books added while the export runs
+    partitions = db.execute_query(
+        "SELECT COUNT(*) AS count FROM (SELECT DISTINCT year, language FROM books) AS pairs", use_cache=False
+    )[0]['count']
+
+    staging = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        ds.write_dataset(
+            batches(),
+            staging,
+            schema=schema,
+            format='parquet',
+            partitioning=partitioning(),
+            basename_template='part-{i}.parquet',
+            min_rows_per_group=4096,
+            max_rows_per_group=131072,
+            max_partitions=partitions + 1024,
+            max_open_files=MAX_OPEN_FILES
+        )
+        os.makedirs(staging, exist_ok=True)
+        with open(os.path.join(staging, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump({
+                'rows': rows,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'columns': BOOK_COLUMNS
+            }, f, indent=2)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    previous = f"{path.rstrip(os.sep)}.old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, previous)
+    os.rename(staging, path)
+    shutil.rmtree(previous, ignore_errors=True)
+    return {'rows': rows, 'seconds': time.perf_counter() - start}
+
+
+def open_snapshot(path, memory_map=False):
+    """The snapshot at path as a pyarrow dataset"""
+    _require_pyarrow()
+    return ds.dataset(
+        path,
+        format='parquet',
+        partitioning=partitioning(),
+        filesystem=fs.LocalFileSystem(use_mmap=memory_map)
+    )
+
+
+def snapshot_rows(path, chunk_size=50000):
+    """Yield books table rows (as Book.to_row returns them) from a snapshot"""
+    dataset = open_snapshot(path)
+    # Snapshots written before a column was added to the books table lack it
+    columns = [column for column in BOOK_COLUMNS if column in dataset.schema.names]
+    missing = dict.fromkeys(column for column in BOOK_COLUMNS if column not in columns)
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_size):
+        for row in batch.to_pylist():
+            for column in LIST_COLUMNS:
+                row[column] = json.dumps(row[column] or [])
+            row.update(missing)
+            yield row
+
+
+def import_snapshot(db, path, batch_size=500):
+    """
+    Upsert every book in a snapshot through DatabaseManager.insert_rows, so
+    link and summary tables are maintained as for any other write.
+
+    Returns:
+        insert_rows stats plus 'seconds'
+    """
+    start = time.perf_counter()
+    stats = db.insert_rows(snapshot_rows(path), batch_size)
+    return {**stats, 'seconds': time.perf_counter() - start}
+
+
+# Trending page periods as years back from the current year (queries.YEAR_FILTERS)
+PERIOD_YEARS = {'All Time': None, 'Last Year': 1, 'Last 5 Years': 5}
+
+# Columns the dashboard queries read; descriptions and search text stay on disk
+DASHBOARD_COLUMNS = [
+    'book_id', 'book_title', 'book_authors', 'categories', 'averageRating', 'ratingsCount',
+    'pageCount', 'year', 'amount_retailPrice', 'isEbook'
+]
+
+
+class SnapshotCatalog:
+    """
+    Read-only stand-in for DatabaseManager on the dashboard pages.
+
+    Answers the dashboard queries in queries.py from a snapshot with Arrow
+    compute kernels; the Parquet files are memory-mapped rather than read
+    into buffers. Results are cached until the snapshot is replaced (its
+    manifest changes). Any other query raises ValueError.
+
+    Authors and categories are grouped exactly as spelled, where MySQL's
+    link tables fold case.
+    """
+
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = None
+        self._table = None
+        self._results = {}
+        self._hits = 0
+        self._misses = 0
+        self._handlers = {
+            queries.TOP_RATED_BOOKS: self._top_rated,
+            queries.YEAR_DISTRIBUTION: self._year_distribution,
+            queries.PRICE_DISTRIBUTION: self._price_distribution,
+            queries.GENRE_DISTRIBUTION: self._genre_distribution,
+            queries.GENRE_LIST: self._genre_list,
+            queries.GENRE_BOOKS: self._genre_books
+        }
+        for period, year_filter in queries.YEAR_FILTERS.items():
+            years = PERIOD_YEARS[period]
+            self._handlers[queries.TRENDING_BOOKS.format(year_filter=year_filter)] = \
+                lambda table, params, years=years: self._trending(table, years)
+            self._handlers[queries.top_authors(year_filter)] = \
+                lambda table, params, years=years: self._top_authors(table, years)
+
+    def _load(self):
+        """The dashboard columns of the current snapshot, reopened when it has been replaced"""
+        manifest = os.path.join(self.path, MANIFEST)
+        version = os.stat(manifest).st_mtime_ns
+        with self._lock:
+            if version != self._version:
+                self._table = open_snapshot(self.path, memory_map=True).to_table(columns=DASHBOARD_COLUMNS)
+                self._version = version
+                self._results = {}
+            return self._table
+
+    def execute_query(self, query, params=None, use_cache=True):
+        """Rows shaped like DatabaseManager.execute_query returns them (JSON list columns as strings)"""
+        handler = self._handlers.get(query)
+        if handler is None:
+            raise ValueError(f"Query not available from a snapshot: {queries.query_name(query)}")
+        table = self._load()
+        key = (query, tuple(params or ()))
+        with self._lock:
+            cached = self._results.get(key) if use_cache else None
+            if cached is not None:
+                self._hits += 1
+                return cached
+            self._misses += 1
+        rows = handler(table, params).to_pylist()
+        for row in rows:
+            for column in LIST_COLUMNS:
+                if column in row:
+                    row[column] = json.dumps(row[column] or [])
+        with self._lock:
+            self._results[key] = rows
+        return rows
+
+    def query_frame(self, query, params=None, columns=None, use_cache=True):
+        """DatabaseManager.query_frame over the snapshot"""
+        return frames.to_frame(self.execute_query(query, params, use_cache), columns)
+
+    def keyset_page(self, query, params, keys, after=None, page_size=50):
+        """DatabaseManager.keyset_page for queries.GENRE_BOOKS_PAGE"""
+        if query != queries.GENRE_BOOKS_PAGE:
+            raise ValueError(f"Query not available from a snapshot: {queries.query_name(query)}")
+        table = self._genre_rows(self._load(), params[0])
+        table = table.set_column(
+            table.schema.get_field_index('ratingsCount'), 'ratingsCount',
+            pc.fill_null(table['ratingsCount'], 0)
+        )
+        if after is not None:
+            rating, count, book_id = after
+            table = table.filter(
+                (pc.field('averageRating') < rating)
+                | ((pc.field('averageRating') == rating)
+                   & ((pc.field('ratingsCount') < count)
+                      | ((pc.field('ratingsCount') == count) & (pc.field('book_id') < book_id))))
+            )
+        table = table.sort_by([('averageRating', 'descending'), ('ratingsCount', 'descending'),
+                               ('book_id', 'descending')]).slice(0, page_size + 1)
+        rows = table.select(['book_id', 'book_title', 'book_authors', 'averageRating', 'ratingsCount',
+                             'pageCount', 'year', 'amount_retailPrice', 'isEbook']).to_pylist()
+        for row in rows:
+            row['book_authors'] = json.dumps(row['book_authors'] or [])
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, tuple(rows[-1][column] for _, column, _ in keys)
+
+    def stats(self):
+        manifest = os.path.join(self.path, MANIFEST)
+        with open(manifest, encoding='utf-8') as f:
+            info = json.load(f)
+        with self._lock:
+            return {
+                'path': self.path,
+                'rows': info['rows'],
+                'created_at': info['created_at'],
+                'cached_results': len(self._results),
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+    # One method per dashboard query, mirroring the SQL in queries.py
+
+    def _top_rated(self, table, params):
+        return table.filter(pc.field('ratingsCount') > 100) \
+            .sort_by([('averageRating', 'descending')]).slice(0, 10) \
+            .select(['book_title', 'averageRating', 'ratingsCount', 'book_authors'])
+
+    def _year_distribution(self, table, params):
+        counts = table.filter(pc.field('year').is_valid()).group_by('year').aggregate([('book_id', 'count')])
+        return counts.select(['year', 'book_id_count']).rename_columns(['year', 'count']) \
+            .sort_by([('year', 'descending')])
+
+    def _price_distribution(self, table, params):
+        return table.filter(pc.field('amount_retailPrice') > 0) \
+            .sort_by([('amount_retailPrice', 'descending')]).slice(0, 100) \
+            .select(['amount_retailPrice', 'book_title', 'isEbook'])
+
+    def _trending(self, table, years):
+        condition = pc.field('ratingsCount') > 1000
+        if years is not None:
+            condition &= pc.field('year') >= date.today().year - years
+        return table.filter(condition).sort_by([('ratingsCount', 'descending')]).slice(0, 10) \
+            .select(['book_title', 'ratingsCount', 'averageRating', 'book_authors', 'categories'])
+
+    @staticmethod
+    def _explode(table, column, name):
+        """One row per (book, list entry), like joining the book_author/book_category link tables"""
+        # A name listed twice for one book links once, as in the link tables
+        pairs = pa.table({
+            'row': pc.list_parent_indices(table[column]),
+            name: pc.list_flatten(table[column])
+        }).group_by(['row', name]).aggregate([])
+        return table.drop_columns([column]).take(pairs['row']).append_column(name, pairs[name])
+
+    def _genre_distribution(self, table, params):
+        links = self._explode(table.select(['categories', 'averageRating', 'book_id']), 'categories', 'category')
+        stats = links.group_by('category').aggregate([('book_id', 'count'), ('averageRating', 'mean')])
+        return stats.select(['category', 'book_id_count', 'averageRating_mean']) \
+            .rename_columns(['category', 'count', 'avg_rating']) \
+            .sort_by([('count', 'descending')]).slice(0, 10)
+
+    def _top_authors(self, table, years):
+        if years is not None:
+            table = table.filter(pc.field('year') >= date.today().year - years)
+        links = self._explode(
+            table.select(['book_authors', 'averageRating', 'ratingsCount', 'book_id']), 'book_authors', 'author'
+        )
+        stats = links.group_by('author').aggregate(
+            [('book_id', 'count'), ('averageRating', 'mean'), ('ratingsCount', 'sum')]
+        )
+        return stats.select(['author', 'book_id_count', 'averageRating_mean', 'ratingsCount_sum']) \
+            .rename_columns(['author', 'book_count', 'avg_rating', 'total_ratings']) \
+            .sort_by([('total_ratings', 'descending')]).slice(0, 10)
+
+    def _genre_list(self, table, params):
+        categories = pc.unique(pc.list_flatten(table['categories'])).drop_null()
+        return pa.table({'category': pc.take(categories, pc.array_sort_indices(categories))})
+
+    def _genre_rows(self, table, genre):
+        """Books in one genre with a rating, like the GENRE_BOOKS join"""
+        links = self._explode(table.append_column('row', pa.array(range(len(table)))), 'categories', 'category')
+        rows = pc.unique(links.filter(pc.field('category') == genre)['row'])
+        return table.take(rows).filter(pc.field('averageRating') > 0)
+
+    def _genre_books(self, table, params):
+        return self._genre_rows(table, params[0]) \
+            .sort_by([('averageRating', 'descending'), ('ratingsCount', 'descending')]).slice(0, 50) \
+            .select(['book_title', 'book_authors', 'averageRating', 'ratingsCount', 'pageCount', 'year',
+                     'amount_retailPrice', 'isEbook'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import Parquet snapshots of the books catalog")
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('path', help="snapshot directory")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="rows streamed per chunk on export")
+    parser.add_argument('--batch-size', type=int, default=500, help="rows per upsert batch on import")
+    args = parser.parse_args()
+
+    from configuration import DATABASE_CONFIG
+    from database_manager import DatabaseManager
+
+    with DatabaseManager(DATABASE_CONFIG) as db:
+        if args.command == 'export':
+            stats = export_snapshot(db, args.path, args.chunk_size)
+            print(f"Exported {stats['rows']} books to {args.path} in {stats['seconds']:.1f}s")
+        else:
+            stats = import_snapshot(db, args.path, args.batch_size)
+            print(f"Imported {args.path}: {stats['inserted']} inserted, {stats['updated']} updated, "
+                  f"{stats['unchanged']} unchanged, "
+                  f"{stats['failed']} failed in {stats['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
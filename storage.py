@@ -0,0 +1,455 @@
+# storage.py
+# Storage backends behind DatabaseManager: MySQL, and an embedded SQLite
+# database that runs in-process with no server. A backend owns connections
+# and the few pieces of SQL that differ between the two dialects; the
+# queries themselves are shared (queries.py).
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+
+import mysql.connector
+from mysql.connector import Error, pooling
+
+import queries
+
+# Errors DatabaseManager handles, whichever backend raised them
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+
+SQLITE_SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'schema_sqlite.sql')
+# Columns added to schema_sqlite.sql after release; CREATE TABLE IF NOT
+# EXISTS leaves older files without them
+SQLITE_ADDED_COLUMNS = [
+    ('books', 'content_hash', 'TEXT'),
+    ('search_log', 'hits', 'INTEGER NOT NULL DEFAULT 0'),
+    ('search_log', 'change_rate', 'REAL'),
+    ('books', 'printType', 'TEXT'),
+    ('books', 'buyLink', 'TEXT')
+]
+# SQLite connections kept open when no pool_size is given
+SQLITE_POOL_SIZE = 4
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of MySQL connections.
+
+    Checkout blocks until a connection is free instead of failing like the
+    plain mysql.connector pool does, and every checked-out connection is
+    health-checked before it is handed out.
+    """
+
+    _names = itertools.count(1)
+
+    def __init__(self, config, size):
+        self.size = size
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=f"bookscape_{next(self._names)}",
+            pool_size=size,
+            **config
+        )
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._checkouts = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+        self._reconnects = 0
+
+    @contextmanager
+    def connection(self):
+        """Check a healthy connection out of the pool for the duration of the block"""
+        start = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - start
+        try:
+            connection = self._pool.get_connection()
+        except Error:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        try:
+            if not connection.is_connected():
+                connection.reconnect(attempts=3, delay=1)
+                with self._lock:
+                    self._reconnects += 1
+            yield connection
+        finally:
+            # close() hands a pooled connection back rather than dropping it
+            connection.close()
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def stats(self):
+        """Return a snapshot of pool usage"""
+        with self._lock:
+            return {
+                'pool_size': self.size,
+                'in_use': self._in_use,
+                'checkouts': self._checkouts,
+                'total_wait_seconds': self._wait_time,
+                'avg_wait_seconds': self._wait_time / self._checkouts if self._checkouts else 0.0,
+                'max_wait_seconds': self._max_wait,
+                'reconnects': self._reconnects
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config, size):
+    """Return the pool shared by every DatabaseManager with this config"""
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config, size)
+        return _pools[key]
+
+
+class MySQLBackend:
+    """MySQL through mysql.connector, on a shared pool or one dedicated connection"""
+
+    name = 'mysql'
+    placeholder = '%s'
+    # Locks the rows a write is about to replace until commit
+    for_update = ' FOR UPDATE'
+
+    def __init__(self, config, pool_size=None):
+        self.config = config
+        self.pool = None
+        self.connection = None
+        self._reconnects = 0
+        if pool_size:
+            self.pool = get_pool(config, pool_size)
+            print(f"Using shared database connection pool (size {self.pool.size})")
+        else:
+            self.connection = mysql.connector.connect(**config)
+            print("Successfully connected to the database")
+
+    @contextmanager
+    def checkout(self):
+        """Yield a live connection, from the pool or the dedicated one"""
+        if self.pool:
+            with self.pool.connection() as connection:
+                yield connection
+            return
+
+        if not self.connection or not self.connection.is_connected():
+            self.connection = mysql.connector.connect(**self.config)
+            self._reconnects += 1
+        yield self.connection
+
+    def stream_connection(self):
+        """A new connection of its own for a streamed query; the caller closes it"""
+        return mysql.connector.connect(**self.config)
+
+    def cursor(self, connection, dictionary=False):
+        return connection.cursor(dictionary=dictionary)
+
+    def stream_cursor(self, connection):
+        # Unbuffered: rows stay on the socket until fetched
+        return connection.cursor(buffered=False)
+
+    def sql(self, query):
+        """Queries are written for MySQL"""
+        return query
+
+    def begin_write(self, cursor):
+        """InnoDB opens the transaction itself; for_update does the locking"""
+
+    def upsert(self, table, columns, keys, accumulate=False):
+        """INSERT that updates the non-key columns of an existing row, or adds to them with accumulate"""
+        return """
+    INSERT INTO {table} ({columns})
+    VALUES ({placeholders})
+    ON DUPLICATE KEY UPDATE
+        {updates}
+""".format(
+            table=table,
+            columns=', '.join(columns),
+            placeholders=', '.join(['%s'] * len(columns)),
+            updates=',\n        '.join(
+                f"{col} = {col} + VALUES({col})" if accumulate else f"{col} = VALUES({col})"
+                for col in columns if col not in keys
+            )
+        )
+
+    def insert_ignore(self, table, columns):
+        """INSERT that skips rows whose key already exists"""
+        return f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+
+    def stats(self):
+        """Connection pool usage, or dedicated connection stats when not pooled"""
+        if self.pool:
+            return self.pool.stats()
+        return {
+            'pool_size': 0,
+            'in_use': 1 if self.connection else 0,
+            'reconnects': self._reconnects
+        }
+
+    def close(self):
+        """Close the dedicated connection (pooled connections stay with the pool)"""
+        if self.connection and self.connection.is_connected():
+            self.connection.close()
+            print("Database connection closed")
+
+
+# SQLite versions of the statements that use MySQL-only syntax (FULLTEXT,
+# INTERVAL, JSON_TABLE, ON DUPLICATE KEY). Everything else runs as written,
+# with the MySQL functions it uses registered by SQLiteBackend.
+SQLITE_QUERIES = {
+    queries.CATALOG_SEARCH: """
+    SELECT
+        b.book_id,
+        b.book_title,
+        b.book_authors,
+        b.categories,
+        b.description,
+        b.publishedDate,
+        b.averageRating,
+        b.pageCount,
+        b.amount_retailPrice,
+        b.isEbook,
+        b.saleability,
+        b.language,
+        b.thumbnail,
+        b.printType,
+        b.buyLink,
+        -bm25(books_fts, 2.0, 1.0, 1.0) as score
+    FROM books_fts
+    JOIN books b ON b.rowid = books_fts.rowid
+    WHERE books_fts MATCH FTS_QUERY(?1)
+    ORDER BY score DESC
+    LIMIT ?4
+""",
+    queries.RECORD_SEARCH: """
+    INSERT INTO search_log (search_key, total_items, fetched_at)
+    VALUES (%s, %s, NOW())
+    ON CONFLICT (search_key) DO UPDATE SET total_items = excluded.total_items, fetched_at = excluded.fetched_at
+""",
+    queries.RECORD_SEARCH_RESULTS: """
+    INSERT INTO search_results (search_key, position, book_id, fetched_at)
+    VALUES {values}
+    ON CONFLICT (search_key, position) DO UPDATE SET book_id = excluded.book_id, fetched_at = excluded.fetched_at
+""",
+    queries.STORED_SEARCH_LOG: """
+    SELECT total_items
+    FROM search_log
+    WHERE search_key = %s
+    AND fetched_at >= datetime(NOW(), '-' || %s || ' seconds')
+""",
+    queries.REFRESH_CANDIDATES: """
+    SELECT
+        l.search_key,
+        CAST((julianday(NOW()) - julianday(l.fetched_at)) * 86400 AS INTEGER) AS age,
+        l.hits,
+        l.change_rate,
+        (SELECT COUNT(*) FROM search_results r WHERE r.search_key = l.search_key) AS stored
+    FROM search_log l
+    WHERE l.fetched_at < datetime(NOW(), '-' || %s || ' seconds')
+""",
+    queries.STORED_SEARCH_RESULTS: """
+    SELECT sr.position, b.*
+    FROM search_results sr
+    JOIN books b ON b.book_id = sr.book_id
+    WHERE sr.search_key = %s
+    AND sr.position < %s
+    AND sr.fetched_at >= datetime(NOW(), '-' || %s || ' seconds')
+    ORDER BY sr.position
+""",
+    **{
+        mysql_sql: f"""
+    INSERT OR IGNORE INTO {table} (book_id, {column})
+    SELECT b.book_id, substr(j.value, 1, 255)
+    FROM books b, json_each(b.{source}) j
+    WHERE j.value IS NOT NULL AND j.value != ''
+    """
+        for mysql_sql, (table, (column, source)) in zip(queries.BACKFILL_LINKS_QUERIES, queries.LINK_TABLES.items())
+    }
+}
+
+
+@lru_cache(maxsize=1024)
+def sqlite_sql(query):
+    """Translate a MySQL statement for SQLite"""
+    return SQLITE_QUERIES.get(query, query).replace('%s', '?')
+
+
+def _fts_query(text):
+    """Any-word FTS5 query for free text, like MySQL's natural language mode"""
+    words = re.findall(r'\w+', text or '')
+    return ' OR '.join(f'"{word}"' for word in words) or '""'
+
+
+def _dict_row(cursor, row):
+    return dict(zip([column[0] for column in cursor.description], row))
+
+
+class SQLiteBackend:
+    """
+    Embedded SQLite database file; no server needed.
+
+    Connections are checked out of a pool of up to pool_size, shared by
+    every thread (Streamlit runs each rerun on a new one), and WAL mode lets
+    readers run alongside the single writer. Checkout blocks while all of
+    them are in use. The schema (schema_sqlite.sql) is applied on open, so a
+    new file is ready to use.
+    """
+
+    name = 'sqlite'
+    placeholder = '?'
+    for_update = ''
+
+    def __init__(self, path, timeout=30.0, pool_size=None):
+        self.path = path
+        self.timeout = timeout
+        self.pool_size = pool_size or SQLITE_POOL_SIZE
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._lock = threading.Lock()
+        self._connections = []  # every open connection, at most pool_size
+        self._idle = []
+        self._in_use = 0
+        self._checkouts = 0
+        with open(SQLITE_SCHEMA_PATH, encoding='utf-8') as f:
+            schema = f.read()
+        with self.checkout() as connection:
+            connection.executescript(schema)
+            for table, column, column_type in SQLITE_ADDED_COLUMNS:
+                existing = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                if column not in existing:
+                    connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        print(f"Using SQLite database {path}")
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        # MySQL functions used by the shared queries
+        connection.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        connection.create_function('CURDATE', 0, lambda: date.today().isoformat())
+        connection.create_function(
+            'YEAR', 1, lambda value: int(str(value)[:4]) if value else None, deterministic=True
+        )
+        connection.create_function('FTS_QUERY', 1, _fts_query, deterministic=True)
+        return connection
+
+    @contextmanager
+    def checkout(self):
+        """Check a connection out of the pool for the duration of the block"""
+        self._slots.acquire()
+        try:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self._connections.append(connection)
+        except sqlite3.Error:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        try:
+            yield connection
+        finally:
+            # A write that failed before its rollback must not leak into the next checkout
+            if connection.in_transaction:
+                connection.rollback()
+            with self._lock:
+                self._in_use -= 1
+                self._idle.append(connection)
+            self._slots.release()
+
+    def stream_connection(self):
+        """A new connection of its own for a streamed query; the caller closes it"""
+        return self._connect()
+
+    def cursor(self, connection, dictionary=False):
+        cursor = connection.cursor()
+        if dictionary:
+            cursor.row_factory = _dict_row
+        return cursor
+
+    def stream_cursor(self, connection):
+        # SQLite steps through rows as they are fetched
+        return connection.cursor()
+
+    def sql(self, query):
+        return sqlite_sql(query)
+
+    def begin_write(self, cursor):
+        """Take the write lock before reading the rows a write will replace"""
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def upsert(self, table, columns, keys, accumulate=False):
+        """INSERT that updates the non-key columns of an existing row, or adds to them with accumulate"""
+        return """
+    INSERT INTO {table} ({columns})
+    VALUES ({placeholders})
+    ON CONFLICT ({keys}) DO UPDATE SET
+        {updates}
+""".format(
+            table=table,
+            columns=', '.join(columns),
+            placeholders=', '.join(['?'] * len(columns)),
+            keys=', '.join(keys),
+            updates=',\n        '.join(
+                f"{col} = {col} + excluded.{col}" if accumulate else f"{col} = excluded.{col}"
+                for col in columns if col not in keys
+            )
+        )
+
+    def insert_ignore(self, table, columns):
+        """INSERT that skips rows whose key already exists"""
+        return f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'sqlite',
+                'path': self.path,
+                'pool_size': self.pool_size,
+                'connections': len(self._connections),
+                'in_use': self._in_use,
+                'checkouts': self._checkouts
+            }
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+            self._idle.clear()
+
+
+def create_backend(config, pool_size=None):
+    """
+    Open the backend a DATABASE_CONFIG dict asks for.
+
+    {'backend': 'sqlite', 'path': 'bookscape.sqlite'} opens an embedded
+    database; anything else is mysql.connector settings.
+    """
+    config = dict(config)
+    backend = config.pop('backend', 'mysql')
+    if backend == 'sqlite':
+        return SQLiteBackend(config.get('path', 'bookscape.sqlite'), pool_size=pool_size)
+    if backend != 'mysql':
+        raise ValueError(f"Unknown database backend: {backend}")
+    return MySQLBackend(config, pool_size)
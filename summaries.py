@@ -0,0 +1,130 @@
+# summaries.py
+# Summary tables behind the year, genre and author charts. DatabaseManager
+# keeps them current by applying per-batch deltas in the upsert transaction;
+# REBUILD_SUMMARIES_QUERIES recomputes them from scratch.
+from collections import defaultdict
+
+SUMMARY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS year_stats (
+        year SMALLINT PRIMARY KEY,
+        book_count INT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS category_stats (
+        category VARCHAR(255) PRIMARY KEY,
+        book_count INT NOT NULL DEFAULT 0,
+        rating_sum DOUBLE NOT NULL DEFAULT 0,
+        rating_count INT NOT NULL DEFAULT 0,
+        INDEX idx_category_stats_count (book_count)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS author_stats (
+        author VARCHAR(255) PRIMARY KEY,
+        book_count INT NOT NULL DEFAULT 0,
+        rating_sum DOUBLE NOT NULL DEFAULT 0,
+        rating_count INT NOT NULL DEFAULT 0,
+        total_ratings BIGINT NOT NULL DEFAULT 0,
+        INDEX idx_author_stats_total (total_ratings)
+    )
+    """
+]
+
+REBUILD_SUMMARIES_QUERIES = [
+    "DELETE FROM year_stats",
+    """
+    INSERT INTO year_stats (year, book_count)
+    SELECT year, COUNT(*) FROM books WHERE year IS NOT NULL GROUP BY year
+    """,
+    "DELETE FROM category_stats",
+    """
+    INSERT INTO category_stats (category, book_count, rating_sum, rating_count)
+    SELECT bc.category, COUNT(*), COALESCE(SUM(b.averageRating), 0), COUNT(b.averageRating)
+    FROM book_category bc
+    JOIN books b ON b.book_id = bc.book_id
+    GROUP BY bc.category
+    """,
+    "DELETE FROM author_stats",
+    """
+    INSERT INTO author_stats (author, book_count, rating_sum, rating_count, total_ratings)
+    SELECT ba.author, COUNT(*), COALESCE(SUM(b.averageRating), 0), COUNT(b.averageRating),
+           COALESCE(SUM(b.ratingsCount), 0)
+    FROM book_author ba
+    JOIN books b ON b.book_id = ba.book_id
+    GROUP BY ba.author
+    """
+]
+
+# table -> (key column, counter columns)
+SUMMARY_COLUMNS = {
+    'year_stats': ('year', ['book_count']),
+    'category_stats': ('category', ['book_count', 'rating_sum', 'rating_count']),
+    'author_stats': ('author', ['book_count', 'rating_sum', 'rating_count', 'total_ratings'])
+}
+
+
+def book_facts(year, categories, authors, rating, ratings_count):
+    """Bundle the fields of one book that the summary tables depend on"""
+    return {
+        'year': year,
+        'categories': categories,
+        'authors': authors,
+        'rating': rating,
+        'ratings_count': ratings_count
+    }
+
+
+def summary_deltas(old_facts, new_facts):
+    """
+    Work out the counter changes for replacing old_facts with new_facts.
+
+    Both arguments map book_id -> book_facts(); books missing from old_facts
+    are new. Returns {table: {key: [delta per counter column]}} with all-zero
+    entries dropped, so rewriting an unchanged book costs nothing.
+    """
+    deltas = {table: defaultdict(lambda size=len(columns): [0] * size)
+              for table, (_, columns) in SUMMARY_COLUMNS.items()}
+
+    def add(facts, sign):
+        rating = facts['rating']
+        rated = 1 if rating is not None else 0
+        if facts['year'] is not None:
+            deltas['year_stats'][facts['year']][0] += sign
+        for category in facts['categories']:
+            row = deltas['category_stats'][category]
+            row[0] += sign
+            row[1] += sign * (rating or 0)
+            row[2] += sign * rated
+        for author in facts['authors']:
+            row = deltas['author_stats'][author]
+            row[0] += sign
+            row[1] += sign * (rating or 0)
+            row[2] += sign * rated
+            row[3] += sign * (facts['ratings_count'] or 0)
+
+    for book_id, facts in new_facts.items():
+        if book_id in old_facts:
+            add(old_facts[book_id], -1)
+        add(facts, 1)
+
+    return {
+        table: {key: values for key, values in rows.items() if any(values)}
+        for table, rows in deltas.items()
+    }
+
+
+def apply_summary_deltas(cursor, deltas, upsert):
+    """
+    Add deltas to the summary tables (caller commits).
+
+    upsert builds the backend's accumulating INSERT, e.g. MySQLBackend.upsert.
+    """
+    for table, rows in deltas.items():
+        if not rows:
+            continue
+        key_column, columns = SUMMARY_COLUMNS[table]
+        query = upsert(table, [key_column, *columns], [key_column], accumulate=True)
+        # Sorted keys keep lock order stable between concurrent writers
+        cursor.executemany(query, [[key, *rows[key]] for key in sorted(rows)])
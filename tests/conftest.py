@@ -0,0 +1,7 @@
+# tests/conftest.py
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The app modules live at the repository root, the synthetic catalog in benchmarks/
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
@@ -0,0 +1,64 @@
+# tests/test_api_handler.py
+"""GoogleBooksAPI paging and retries against the local stub server (benchmarks/stub_server.py)."""
+import time
+
+import pytest
+import requests
+
+from api_handler import GoogleBooksAPI
+from stub_server import StubServer, make_volume
+
+
+@pytest.fixture
+def server():
+    server = StubServer(total_items=1000).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_api(server, **options):
+    return GoogleBooksAPI('test', base_url=server.base_url, rate_limit=1000, rate_burst=100, **options)
+
+
+def expected_ids(query, count):
+    return [make_volume(query, i)['id'] for i in range(count)]
+
+
+def test_pages_are_fetched_concurrently_in_order(server):
+    books = make_api(server).search_books('python', max_results=100)
+    assert [book.book_id for book in books] == expected_ids('python', 100)
+    assert server.requests == 3
+
+
+def test_short_pages_do_not_end_the_search(server):
+    server.page_items = 38
+    pages = list(make_api(server).iter_books('python', max_results=100))
+    assert [book.book_id for page in pages for book in page] == expected_ids('python', 100)
+    # Each short page is completed before the next one
+    assert [len(page) for page in pages] == [38, 2, 38, 2, 20]
+
+
+def test_search_ends_at_total_items(server):
+    server.total_items = 50
+    page_info = {}
+    books = [book for page in make_api(server).iter_books('python', 100, page_info=page_info) for book in page]
+    assert page_info['totalItems'] == 50
+    assert [book.book_id for book in books] == [make_volume('python', i, 50)['id'] for i in range(50)]
+
+
+def test_throttled_request_waits_for_retry_after(server):
+    server.throttle_next = 1
+    server.retry_after = 1
+    start = time.perf_counter()
+    total, books = make_api(server).fetch_page('python', 0, 40)
+    assert time.perf_counter() - start >= 1
+    assert (total, len(books)) == (1000, 40)
+    assert (server.requests, server.throttled) == (2, 1)
+
+
+def test_throttling_past_max_retries_raises(server):
+    server.throttle_next = 3
+    with pytest.raises(requests.exceptions.HTTPError):
+        make_api(server, max_retries=2, backoff=0).fetch_page('python', 0, 40)
+    assert server.throttled == 3
@@ -0,0 +1,97 @@
+# tests/test_fingerprint_skip.py
+"""Books whose content fingerprint is unchanged are not rewritten (DatabaseManager._write_rows)."""
+import pytest
+
+import database_manager
+import synthetic
+from book import Book
+from database_manager import DatabaseManager
+
+SENTINEL = '2000-01-01 00:00:00'
+SUMMARIES = {
+    'year_stats': "SELECT year, book_count FROM year_stats WHERE book_count > 0 ORDER BY year",
+    'category_stats': "SELECT category, book_count, ROUND(rating_sum, 6) AS rating_sum, rating_count "
+                      "FROM category_stats WHERE book_count > 0 ORDER BY category",
+    'author_stats': "SELECT author, book_count, ROUND(rating_sum, 6) AS rating_sum, rating_count, total_ratings "
+                    "FROM author_stats WHERE book_count > 0 ORDER BY author"
+}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    with DatabaseManager({'backend': 'sqlite', 'path': str(tmp_path / 'catalog.sqlite')}) as db:
+        db.delta_books = []
+        summary_deltas = database_manager.summary_deltas
+
+        def spy(old_facts, new_facts):
+            db.delta_books.extend(sorted(new_facts))
+            return summary_deltas(old_facts, new_facts)
+
+        monkeypatch.setattr(database_manager, 'summary_deltas', spy)
+        yield db
+
+
+def fetch_books(count=40):
+    """A fresh copy of the same search results, as a repeat API search returns them"""
+    return [Book.from_volume(volume, 'fingerprint') for volume in synthetic.generate_volumes(count, 0)]
+
+
+def query(db, sql):
+    return db.execute_query(sql, use_cache=False)
+
+
+def stored_state(db):
+    """updated_at per book, link rows with their rowids, and the summary tables"""
+    return {
+        'updated_at': {row['book_id']: row['updated_at'] for row in query(db, "SELECT book_id, updated_at FROM books")},
+        'book_author': query(db, "SELECT rowid, book_id, author FROM book_author ORDER BY rowid"),
+        'book_category': query(db, "SELECT rowid, book_id, category FROM book_category ORDER BY rowid"),
+        **{table: query(db, sql) for table, sql in SUMMARIES.items()}
+    }
+
+
+def store(db, books):
+    db.insert_books(books)
+    # The updated_at trigger only stamps whole seconds; a sentinel shows any rewrite
+    db.execute_statements([f"UPDATE books SET updated_at = '{SENTINEL}'"])
+    db.delta_books.clear()
+
+
+def test_repeat_search_rewrites_nothing(db):
+    store(db, fetch_books())
+    before = stored_state(db)
+
+    counts = db.insert_books(fetch_books())
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 40, 'failed': 0}
+    assert stored_state(db) == before
+    assert db.delta_books == []
+
+
+def test_only_changed_books_are_rewritten(db):
+    books = fetch_books()
+    store(db, books)
+    before = stored_state(db)
+
+    refetched = fetch_books()
+    changed = {book.book_id for book in refetched[:5]}
+    for book in refetched[:5]:
+        book.ratings_count = (book.ratings_count or 0) + 7
+        book.average_rating = 4.5
+    refetched[5].categories = ('Fingerprints',)
+    changed.add(refetched[5].book_id)
+
+    counts = db.insert_books(refetched)
+    assert counts == {'inserted': 0, 'updated': 6, 'unchanged': 34, 'failed': 0}
+    after = stored_state(db)
+    assert {book_id for book_id, stamp in after['updated_at'].items() if stamp != SENTINEL} == changed
+    assert sorted(db.delta_books) == sorted(changed)
+    # Link rows of the unchanged books were not deleted and re-inserted
+    for table in ('book_author', 'book_category'):
+        kept = [row for row in before[table] if row['book_id'] not in changed]
+        assert [row for row in after[table] if row['book_id'] not in changed] == kept
+
+    # The deltas for the changed books leave the summaries as a full rebuild would
+    db.rebuild_summaries()
+    rebuilt = stored_state(db)
+    assert {table: after[table] for table in SUMMARIES} == {table: rebuilt[table] for table in SUMMARIES}
+    assert after['category_stats'] != before['category_stats']
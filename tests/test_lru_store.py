@@ -0,0 +1,98 @@
+# tests/test_lru_store.py
+"""LRUStore accounting, eviction and expiry, and the two caches built on it."""
+import sqlite3
+import time
+
+import lru_store
+import thumbnail_cache
+from lru_store import LRUStore
+from response_cache import ResponseCache
+from thumbnail_cache import ThumbnailCache
+
+
+def disk_totals(store):
+    with sqlite3.connect(store.path) as db:
+        return db.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {store.table}").fetchone()
+
+
+def test_running_total_matches_table(tmp_path):
+    store = LRUStore(str(tmp_path / 'store.sqlite'), 'entries', 'key', max_disk_bytes=1000)
+    for i in range(100):
+        store.set(f'k{i % 30}', i, 'x' * (i % 17 + 1))
+    stats = store.stats()
+    assert (stats['disk_entries'], stats['disk_bytes']) == disk_totals(store)
+    assert stats['disk_bytes'] <= 1000
+
+    # A reopened store picks the totals up from the table
+    reopened = LRUStore(store.path, 'entries', 'key', max_disk_bytes=1000)
+    assert reopened.stats()['disk_bytes'] == stats['disk_bytes']
+
+
+def test_eviction_drops_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(lru_store, 'TOUCH_INTERVAL', 0)
+    store = LRUStore(str(tmp_path / 'store.sqlite'), 'entries', 'key', memory_entries=0, max_disk_bytes=100)
+    for i in range(9):
+        store.set(f'k{i}', i, 'x' * 10)
+        time.sleep(0.01)
+    # The pending touch from this read is written before eviction picks victims
+    assert store.get('k0') == ('x' * 10, 'disk')
+    store.set('k9', 9, 'x' * 30)
+    stats = store.stats()
+    assert stats['disk_bytes'] <= 90
+    assert stats['evictions'] == 3
+    assert store.get('k0')[1] == 'disk'
+    assert [store.get(f'k{i}')[1] for i in (1, 2, 3)] == [None, None, None]
+
+
+def test_disk_hits_batch_their_touches(tmp_path, monkeypatch):
+    monkeypatch.setattr(lru_store, 'TOUCH_INTERVAL', 0)
+    monkeypatch.setattr(lru_store, 'TOUCH_BATCH', 4)
+    store = LRUStore(str(tmp_path / 'store.sqlite'), 'entries', 'key', memory_entries=0)
+    for i in range(4):
+        store.set(f'k{i}', i, 'body')
+    with sqlite3.connect(store.path) as db:
+        before = dict(db.execute("SELECT key, accessed_at FROM entries"))
+    for i in range(3):
+        store.get(f'k{i}')
+    with sqlite3.connect(store.path) as db:
+        assert dict(db.execute("SELECT key, accessed_at FROM entries")) == before
+    store.get('k3')
+    with sqlite3.connect(store.path) as db:
+        after = dict(db.execute("SELECT key, accessed_at FROM entries"))
+    assert all(after[key] > before[key] for key in before)
+
+
+def test_expired_entries_are_misses(tmp_path):
+    store = LRUStore(str(tmp_path / 'store.sqlite'), 'entries', 'key', expires=True, load=int)
+    store.set('stale', 1, '1', expires_at=time.time() - 1)
+    store.set('fresh', 2, '2', expires_at=time.time() + 60)
+    assert store.get('stale') == (None, None)
+    assert store.get('fresh') == (2, 'memory')
+    stats = store.stats()
+    assert (stats['expired'], stats['disk_entries']) == (1, 1)
+    assert (stats['disk_entries'], stats['disk_bytes']) == disk_totals(store)
+
+
+def test_failed_urls_are_bounded_and_expire(tmp_path, monkeypatch):
+    monkeypatch.setattr(thumbnail_cache, 'MAX_FAILED', 5)
+    cache = ThumbnailCache(str(tmp_path / 'thumbnails.sqlite'), timeout=0.5, retry_after=60)
+    for i in range(8):
+        assert cache.fetch(f'http://127.0.0.1:9/cover{i}.jpg') is None
+    assert list(cache._failed) == [f'http://127.0.0.1:9/cover{i}.jpg' for i in range(3, 8)]
+    assert cache.stats()['fetch_errors'] == 8
+
+    # Once retry_after has passed the entry is dropped when it is read
+    cache.retry_after = 0
+    assert cache.fetch('http://127.0.0.1:9/cover7.jpg') is None
+    assert cache.stats()['fetch_errors'] == 9
+
+
+def test_response_cache_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / 'responses.sqlite')
+    ResponseCache(path).set('q', {'totalItems': 1, 'items': [{'id': 'a'}]})
+    ResponseCache(path).set('old', {'totalItems': 0}, ttl=-1)
+    cache = ResponseCache(path)
+    assert cache.get('q') == {'totalItems': 1, 'items': [{'id': 'a'}]}
+    assert cache.get('old') is None
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['expired'], stats['disk_entries']) == (1, 1, 1)
@@ -0,0 +1,34 @@
+# tests/test_refresh_scheduler.py
+"""RefreshScheduler's background thread outlives failed rounds."""
+import time
+
+import requests
+
+from refresh_scheduler import RefreshScheduler
+
+
+class FailingService:
+    db = None
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.rounds = 0
+
+    def flush_hits(self):
+        self.rounds += 1
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+def test_failed_rounds_do_not_stop_the_thread():
+    service = FailingService([requests.exceptions.ConnectionError("offline"), ValueError("bad response")])
+    scheduler = RefreshScheduler(service, requests_per_hour=0, interval=0.01).start()
+    try:
+        deadline = time.monotonic() + 5
+        while service.rounds < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert scheduler._thread.is_alive()
+    finally:
+        scheduler.stop()
+    assert service.rounds >= 4
+    assert scheduler.stats()['errors'] == 2
@@ -0,0 +1,28 @@
+# tests/test_search_service.py
+"""Local-first search (search_service.py) against the stub server and a SQLite catalog."""
+import pytest
+
+from api_handler import GoogleBooksAPI
+from database_manager import DatabaseManager
+from search_service import SearchService
+from stub_server import StubServer
+
+
+@pytest.fixture
+def service(tmp_path):
+    server = StubServer(total_items=200).start()
+    api = GoogleBooksAPI('test', base_url=server.base_url, rate_limit=1000, rate_burst=100)
+    with DatabaseManager({'backend': 'sqlite', 'path': str(tmp_path / 'catalog.sqlite')}) as db:
+        yield SearchService(api, db)
+    server.shutdown()
+    server.server_close()
+
+
+def test_locally_served_books_keep_print_type_and_buy_link(service):
+    fetched = service.search_books('python', max_results=80)
+    stored = service.search_books('python', max_results=80)
+    assert service.stats()['served_local'] == 1
+    assert [book.book_id for book in stored] == [book.book_id for book in fetched]
+    assert [(book.print_type, book.buy_link) for book in stored] == \
+        [(book.print_type, book.buy_link) for book in fetched]
+    assert any(book.buy_link for book in stored)
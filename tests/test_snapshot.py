@@ -0,0 +1,50 @@
+# tests/test_snapshot.py
+"""Parquet snapshot export (snapshot.py); needs pyarrow."""
+import errno
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import snapshot
+import synthetic
+from book import Book
+from database_manager import DatabaseManager
+from snapshot import export_snapshot, open_snapshot
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseManager({'backend': 'sqlite', 'path': str(tmp_path / 'catalog.sqlite')}) as db:
+        yield db
+
+
+def test_export_with_more_partitions_than_pyarrow_default(db, tmp_path):
+    books = []
+    for index, volume in enumerate(synthetic.generate_volumes(3000, 0)):
+        # 1000 years x 2 languages, more than the 1024 partitions pyarrow allows by default
+        volume['volumeInfo']['publishedDate'] = str(1000 + index % 1000)
+        volume['volumeInfo']['language'] = 'en' if index // 1000 % 2 else 'fr'
+        books.append(Book.from_volume(volume, 'snapshot'))
+    db.insert_books(books, batch_size=1000)
+
+    path = str(tmp_path / 'snapshot')
+    assert export_snapshot(db, path)['rows'] == 3000
+    assert open_snapshot(path).count_rows() == 3000
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_failed_export_removes_staging(db, tmp_path, monkeypatch):
+    db.insert_books([Book.from_volume(volume, 'snapshot') for volume in synthetic.generate_volumes(10, 0)])
+
+    def disk_full(*args, **kwargs):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    # Fails writing the manifest, after the Parquet files are in staging
+    monkeypatch.setattr(snapshot, 'open', disk_full, raising=False)
+    path = str(tmp_path / 'snapshot')
+    with pytest.raises(OSError):
+        export_snapshot(db, path)
+    assert not os.path.exists(f"{path}.tmp")
+    assert not os.path.exists(path)
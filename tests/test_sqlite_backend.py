@@ -0,0 +1,41 @@
+# tests/test_sqlite_backend.py
+"""SQLiteBackend connection pooling."""
+import threading
+
+import pytest
+
+from storage import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'pool.sqlite'), pool_size=3)
+    yield backend
+    backend.close()
+
+
+def test_threads_share_a_bounded_pool(backend):
+    def query():
+        with backend.checkout() as connection:
+            connection.execute("SELECT COUNT(*) FROM books").fetchone()
+
+    # One thread per Streamlit rerun must not mean one connection per rerun
+    for _ in range(50):
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    stats = backend.stats()
+    assert stats['connections'] <= 3
+    assert (stats['in_use'], stats['checkouts']) == (0, 201)
+
+
+def test_checkout_rolls_back_an_unfinished_write(backend):
+    with pytest.raises(RuntimeError):
+        with backend.checkout() as connection:
+            connection.execute("INSERT INTO search_log (search_key, total_items, fetched_at) VALUES ('left open', 1, NOW())")
+            raise RuntimeError
+    with backend.checkout() as connection:
+        assert not connection.in_transaction
+        assert connection.execute("SELECT COUNT(*) FROM search_log").fetchone() == (0,)
@@ -0,0 +1,109 @@
+# tests/test_storage_parity.py
+"""
+The storage backends give the same answers (see benchmarks/parity_check.py).
+
+The SQLite checks always run, and so does a comparison with a Parquet
+snapshot of the SQLite catalog when pyarrow is installed. The MySQL comparison writes a synthetic
+catalog into the database the DB_* settings point at, so it only runs with
+BOOKSCAPE_TEST_MYSQL=1 and a reachable server; point the settings at a
+scratch database.
+"""
+import argparse
+import os
+
+import pytest
+
+import queries
+from database_manager import DatabaseManager
+from parity_check import same_results, snapshot
+from storage import DatabaseError
+from summaries import SUMMARY_COLUMNS
+
+ARGS = argparse.Namespace(books=1000, seed=0, batch_size=500, page_size=50)
+DASHBOARD_QUERIES = [name for name in queries.dashboard_queries() if name != 'genre_books_page']
+
+
+@pytest.fixture(scope='module')
+def sqlite_path(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('parity') / 'parity.sqlite')
+
+
+@pytest.fixture(scope='module')
+def sqlite_results(sqlite_path):
+    with DatabaseManager({'backend': 'sqlite', 'path': sqlite_path}) as db:
+        return snapshot(db, ARGS)
+
+
+@pytest.fixture(scope='module')
+def snapshot_catalog(sqlite_path, sqlite_results, tmp_path_factory):
+    pytest.importorskip('pyarrow')
+    from snapshot import SnapshotCatalog, export_snapshot
+    path = str(tmp_path_factory.mktemp('parity') / 'snapshot')
+    with DatabaseManager({'backend': 'sqlite', 'path': sqlite_path}) as db:
+        export_snapshot(db, path)
+    return SnapshotCatalog(path)
+
+
+@pytest.fixture(scope='module')
+def mysql_results():
+    if os.getenv('BOOKSCAPE_TEST_MYSQL') != '1':
+        pytest.skip("set BOOKSCAPE_TEST_MYSQL=1 and DB_* for a scratch MySQL database")
+    from configuration import DATABASE_CONFIG
+    try:
+        db = DatabaseManager(DATABASE_CONFIG)
+    except DatabaseError as e:
+        pytest.skip(f"MySQL not reachable: {e}")
+    with db:
+        return snapshot(db, ARGS)
+
+
+@pytest.mark.parametrize('table', sorted(SUMMARY_COLUMNS))
+def test_sqlite_incremental_summaries_match_rebuild(sqlite_results, table):
+    assert sqlite_results['summaries'][table] == sqlite_results['rebuilt'][table]
+
+
+def test_sqlite_stored_search_round_trip(sqlite_results):
+    total, book_ids = sqlite_results['stored_search']
+    assert total == ARGS.books
+    assert len(book_ids) == 40
+
+
+def test_snapshot_genre_keyset_walks_match(snapshot_catalog, sqlite_results):
+    # Small pages, so every walk with a few books resumes from a key
+    for genre, book_ids in sqlite_results['pages'].items():
+        walked, after = [], None
+        while True:
+            rows, after = snapshot_catalog.keyset_page(
+                queries.GENRE_BOOKS_PAGE, (genre,), queries.GENRE_BOOKS_KEY, after, page_size=2
+            )
+            walked.extend(row['book_id'] for row in rows)
+            if after is None:
+                break
+        assert walked == book_ids, genre
+
+
+@pytest.mark.parametrize('table', sorted(SUMMARY_COLUMNS))
+def test_mysql_incremental_summaries_match_rebuild(mysql_results, table):
+    assert mysql_results['summaries'][table] == mysql_results['rebuilt'][table]
+
+
+def test_insert_counts_match(mysql_results, sqlite_results):
+    assert mysql_results['counts'] == sqlite_results['counts']
+
+
+@pytest.mark.parametrize('name', DASHBOARD_QUERIES)
+def test_dashboard_query_matches(mysql_results, sqlite_results, name):
+    assert same_results(name, mysql_results['queries'][name], sqlite_results['queries'][name])
+
+
+def test_genre_keyset_walks_match(mysql_results, sqlite_results):
+    assert mysql_results['pages'] == sqlite_results['pages']
+
+
+def test_stored_search_matches(mysql_results, sqlite_results):
+    assert mysql_results['stored_search'] == sqlite_results['stored_search']
+
+
+@pytest.mark.parametrize('table', sorted(SUMMARY_COLUMNS))
+def test_summaries_match(mysql_results, sqlite_results, table):
+    assert mysql_results['summaries'][table] == sqlite_results['summaries'][table]
@@ -0,0 +1,88 @@
+# tests/test_write_behind.py
+"""WriteBehindQueue flushing, backpressure and search ordering against a SQLite catalog."""
+import threading
+import time
+
+import pytest
+
+import synthetic
+from book import Book
+from database_manager import DatabaseManager
+from write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def db(tmp_path):
+    with DatabaseManager({'backend': 'sqlite', 'path': str(tmp_path / 'catalog.sqlite')}) as db:
+        yield db
+
+
+def make_books(count, search_key='write-behind'):
+    return [Book.from_volume(volume, search_key) for volume in synthetic.generate_volumes(count, 0)]
+
+
+def stored_count(db):
+    return db.execute_query("SELECT COUNT(*) AS count FROM books", use_cache=False)[0]['count']
+
+
+class GatedDatabase:
+    """A DatabaseManager whose writes wait for open, and which logs the calls it gets"""
+
+    def __init__(self, db):
+        self.db = db
+        self.open = threading.Event()
+        self.calls = []
+
+    def insert_books(self, books, batch_size=100):
+        self.open.wait()
+        self.calls.append(('insert_books', len(books)))
+        return self.db.insert_books(books, batch_size)
+
+    def record_search(self, search_key, start_index, book_ids, total_items):
+        self.calls.append(('record_search', stored_count(self.db)))
+        return self.db.record_search(search_key, start_index, book_ids, total_items)
+
+
+def test_close_flushes_pending_books(db):
+    writer = WriteBehindQueue(db, batch_size=1000, flush_interval=60)
+    writer.put_many(make_books(30))
+    assert stored_count(db) == 0
+    writer.close()
+    assert stored_count(db) == 30
+    assert writer.stats()['inserted'] == 30
+    with pytest.raises(RuntimeError):
+        writer.put(make_books(1)[0])
+
+
+def test_full_queue_blocks_producers(db):
+    gated = GatedDatabase(db)
+    writer = WriteBehindQueue(gated, batch_size=1, max_pending=5, flush_interval=0)
+    producer = threading.Thread(target=writer.put_many, args=(make_books(20),))
+    producer.start()
+    time.sleep(0.2)
+    # The worker holds one book and waits on the database; the queue is full
+    assert producer.is_alive()
+    assert writer.stats()['pending'] == 5
+
+    gated.open.set()
+    producer.join(5)
+    assert not producer.is_alive()
+    writer.close()
+    assert stored_count(db) == 20
+    assert writer.stats()['batches'] == 20
+
+
+def test_search_is_recorded_after_its_books(db):
+    gated = GatedDatabase(db)
+    gated.open.set()
+    writer = WriteBehindQueue(gated, batch_size=1000, flush_interval=60)
+    books = make_books(25, 'python')
+    writer.put_many(books)
+    writer.record_search('python', 0, [book.book_id for book in books], 25)
+    writer.flush()
+    # The search record cuts the pending batch short instead of overtaking it
+    assert gated.calls == [('insert_books', 25), ('record_search', 25)]
+    total_items, rows = db.stored_search('python', 25, 3600)
+    assert total_items == 25
+    assert [row['book_id'] for row in rows] == [book.book_id for book in books]
+    writer.close()
@@ -0,0 +1,170 @@
+# thumbnail_cache.py
+# Local cover images for result cards, so reruns and other sessions do not
+# download the same thumbnails again
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from lru_store import LRUStore
+from metrics import METRICS
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; covers are then stored as downloaded
+    Image = None
+
+# Failed URLs remembered for retry_after; the oldest are forgotten beyond this
+MAX_FAILED = 4096
+
+
+class ThumbnailCache:
+    """
+    Cover images for result cards, fetched once and served from local bytes.
+
+    Covers are downloaded concurrently, downscaled to fit max_size (when
+    Pillow is installed) and kept in an LRUStore: a small in-memory LRU in
+    front of a SQLite file shared by every session and across restarts,
+    trimmed back to max_disk_bytes. URLs that failed are not retried for
+    retry_after seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_disk_bytes: int = 50 * 1024 * 1024,
+        max_size: tuple = (150, 225),
+        max_workers: int = 8,
+        memory_entries: int = 256,
+        timeout: float = 10.0,
+        retry_after: float = 300.0
+    ):
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        self.max_size = max_size
+        self.max_workers = max_workers
+        self.memory_entries = memory_entries
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._failed = OrderedDict()  # url -> time of its last failed fetch, oldest first
+        self._lock = threading.Lock()
+        self._fetch_errors = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._store = LRUStore(
+            path, 'thumbnails', 'url', body_type='BLOB',
+            memory_entries=memory_entries, max_disk_bytes=max_disk_bytes
+        )
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Return the stored cover for url, or None without fetching it"""
+        body, tier = self._store.get(url)
+        if METRICS.enabled:
+            if tier:
+                METRICS.inc('thumbnail_cache_hits_total', tier=tier)
+            else:
+                METRICS.inc('thumbnail_cache_misses_total')
+        return body
+
+    def fetch(self, url: str) -> Optional[bytes]:
+        """Return the cover for url, downloading and storing it if needed; None if it cannot be had"""
+        body = self.get(url)
+        if body is None:
+            body = self._download(url)
+        return body
+
+    def prefetch(self, urls: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Make sure every cover in urls is stored, fetching missing ones
+        concurrently. Returns {url: bytes} for the covers that are available.
+        """
+        found = {}
+        missing = []
+        for url in dict.fromkeys(url for url in urls if url):
+            body = self.get(url)
+            if body is None:
+                missing.append(url)
+            else:
+                found[url] = body
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                for url, body in zip(missing, executor.map(self._download, missing)):
+                    if body is not None:
+                        found[url] = body
+        return found
+
+    def put(self, url: str, body: bytes):
+        """Store a cover in both tiers"""
+        with self._lock:
+            self._failed.pop(url, None)
+        self._store.set(url, body, body)
+
+    def clear(self):
+        """Drop every stored cover"""
+        with self._lock:
+            self._failed.clear()
+        self._store.clear()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            fetch_errors, failed = self._fetch_errors, len(self._failed)
+        return {
+            **self._store.stats(),
+            'fetch_errors': fetch_errors,
+            'failed_urls': failed,
+            'downscaling': Image is not None
+        }
+
+    def _download(self, url):
+        """Fetch, downscale and store one cover; None if it failed now or recently"""
+        with self._lock:
+            failed_at = self._failed.get(url)
+            if failed_at is not None:
+                if time.time() - failed_at < self.retry_after:
+                    return None
+                del self._failed[url]
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            body = self._downscale(response.content)
+        except (requests.exceptions.RequestException, OSError) as e:
+            print(f"Thumbnail fetch failed for {url}: {e}")
+            with self._lock:
+                self._failed[url] = time.time()
+                self._failed.move_to_end(url)
+                while len(self._failed) > MAX_FAILED:
+                    self._failed.popitem(last=False)
+                self._fetch_errors += 1
+            if METRICS.enabled:
+                METRICS.inc('thumbnail_fetch_errors_total')
+            return None
+        if METRICS.enabled:
+            METRICS.observe('thumbnail_fetch_seconds', time.perf_counter() - start)
+            METRICS.inc('thumbnail_bytes_stored_total', len(body))
+
+        self.put(url, body)
+        return body
+
+    def _downscale(self, body):
+        """Shrink a cover to fit max_size as JPEG; keeps the original when that is not smaller"""
+        if Image is None:
+            return body
+        with Image.open(BytesIO(body)) as image:
+            if image.width <= self.max_size[0] and image.height <= self.max_size[1]:
+                return body
+            image.thumbnail(self.max_size)
+            out = BytesIO()
+            image.convert('RGB').save(out, format='JPEG', quality=85, optimize=True)
+        small = out.getvalue()
+        return small if len(small) < len(body) else body
@@ -0,0 +1,13 @@
+# views/__init__.py
+# One module per page of the app. app.py imports a page's module the first
+# time it is shown, so plotly, pandas and the rest load only with the pages
+# that use them
+import streamlit as st
+
+from metrics import METRICS
+
+
+def show_chart(fig):
+    """st.plotly_chart, timed per chart type"""
+    with METRICS.timer('chart_render_seconds', chart=fig.data[0].type if fig.data else 'empty'):
+        st.plotly_chart(fig)
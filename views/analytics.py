@@ -0,0 +1,83 @@
+# views/analytics.py
+import plotly.express as px
+import streamlit as st
+
+import queries
+from database_manager import DatabaseManager
+from frames import join_names
+from views import show_chart
+
+
+def analytics_dashboard(db: DatabaseManager):
+    st.header("📊 Analytics Dashboard")
+
+    # Create tabs for different analytics views
+    tab1, tab2, tab3 = st.tabs(["Ratings Analysis", "Publication Trends", "Price Analysis"])
+
+    with tab1:
+        st.subheader("Top Rated Books")
+        try:
+            df = db.query_frame(queries.TOP_RATED_BOOKS)
+        
+            if not df.empty:
+                df['book_authors'] = join_names(df['book_authors'])
+            
+                fig = px.bar(
+                    df,
+                    x='book_title',
+                    y='averageRating',
+                    color='ratingsCount',
+                    title="Top Rated Books by Average Rating",
+                    labels={'book_title': 'Book Title', 'averageRating': 'Average Rating'}
+                )
+                show_chart(fig)
+            
+                st.dataframe(df)
+            else:
+                st.info("No rating data available")
+            
+        except Exception as e:
+            st.error(f"Failed to load ratings analysis: {e}")
+
+    with tab2:
+        st.subheader("Publication Year Distribution")
+        try:
+            df = db.query_frame(queries.YEAR_DISTRIBUTION)
+        
+            if not df.empty:
+                fig = px.line(
+                    df,
+                    x='year',
+                    y='count',
+                    title="Books Published by Year",
+                    labels={'year': 'Publication Year', 'count': 'Number of Books'}
+                )
+                show_chart(fig)
+            else:
+                st.info("No publication year data available")
+            
+        except Exception as e:
+            st.error(f"Failed to load publication trends: {e}")
+
+    with tab3:
+        st.subheader("Price Distribution")
+        try:
+            df = db.query_frame(queries.PRICE_DISTRIBUTION)
+        
+            if not df.empty:
+                fig = px.histogram(
+                    df,
+                    x='amount_retailPrice',
+                    color='isEbook',
+                    title="Price Distribution",
+                    labels={'amount_retailPrice': 'Retail Price', 'count': 'Number of Books'}
+                )
+                show_chart(fig)
+            
+                st.write("Most Expensive Books:")
+                st.dataframe(df.head())
+            else:
+                st.info("No price data available")
+            
+        except Exception as e:
+            st.error(f"Failed to load price analysis: {e}")
@@ -0,0 +1,120 @@
+# views/genres.py
+import plotly.express as px
+import streamlit as st
+
+import queries
+from database_manager import DatabaseManager
+from frames import join_names, to_frame
+from views import show_chart
+
+
+def genre_explorer_page(db: DatabaseManager):
+    st.header("🔍 Genre Explorer")
+
+    try:
+        # Get unique genres
+        genre_results = db.execute_query(queries.GENRE_LIST)
+    
+        if not genre_results:
+            st.info("No genre data available")
+            return
+    
+        # Genre selection
+        selected_genre = st.selectbox(
+            "Select a Genre",
+            [result['category'] for result in genre_results]
+        )
+    
+        if selected_genre:
+            st.subheader(f"📚 Books in {selected_genre}")
+        
+            # Get books in selected genre
+            df = db.query_frame(queries.GENRE_BOOKS, (selected_genre,))
+        
+            if not df.empty:
+                df['book_authors'] = join_names(df['book_authors'])
+            
+                # Genre statistics
+                col1, col2, col3, col4 = st.columns(4)
+            
+                with col1:
+                    st.metric("Total Books", len(df))
+                with col2:
+                    st.metric("Average Rating", f"{df['averageRating'].mean():.2f}")
+                with col3:
+                    st.metric("Average Pages", f"{df['pageCount'].mean():.0f}")
+                with col4:
+                    st.metric("eBooks Available", f"{df['isEbook'].sum()}")
+            
+                # Rating distribution
+                st.subheader("Rating Distribution")
+                fig = px.histogram(
+                    df,
+                    x='averageRating',
+                    title=f"Rating Distribution for {selected_genre} Books",
+                    labels={'averageRating': 'Rating'}
+                )
+                show_chart(fig)
+            
+                # Price analysis
+                st.subheader("Price Analysis")
+                price_df = df[df['amount_retailPrice'] > 0]
+                if not price_df.empty:
+                    fig2 = px.box(
+                        price_df,
+                        x='amount_retailPrice',
+                        title=f"Price Distribution for {selected_genre} Books",
+                        labels={'amount_retailPrice': 'Price'}
+                    )
+                    show_chart(fig2)
+            
+                # Every book in the genre, a page at a time
+                st.subheader("Top Rated Books")
+                genre_book_pages(db, selected_genre)
+            
+                # Publication timeline
+                st.subheader("Publication Timeline")
+                year_counts = df['year'].value_counts().sort_index()
+                fig3 = px.line(
+                    x=year_counts.index,
+                    y=year_counts.values,
+                    title=f"Publication Timeline for {selected_genre} Books",
+                    labels={'x': 'Year', 'y': 'Number of Books'}
+                )
+                show_chart(fig3)
+            
+            else:
+                st.info(f"No books found in the {selected_genre} genre")
+            
+    except Exception as e:
+        st.error(f"An error occurred while exploring genres: {str(e)}")
+
+
+def genre_book_pages(db: DatabaseManager, genre: str, page_size: int = 50):
+    """Page through a genre's full book list with keyset pagination"""
+    # Keys that start each page seen so far; the last one is the current page
+    paging = st.session_state.setdefault('genre_paging', {'genre': None, 'keys': [None]})
+    if paging['genre'] != genre:
+        paging.update(genre=genre, keys=[None])
+
+    rows, next_key = db.keyset_page(
+        queries.GENRE_BOOKS_PAGE, (genre,), queries.GENRE_BOOKS_KEY,
+        after=paging['keys'][-1], page_size=page_size
+    )
+    page_df = to_frame(rows)
+    if not page_df.empty:
+        page_df['book_authors'] = join_names(page_df['book_authors'])
+        st.dataframe(page_df[['book_title', 'book_authors', 'averageRating', 'ratingsCount', 'year']])
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", disabled=len(paging['keys']) == 1):
+            paging['keys'].pop()
+            st.rerun()
+    with col2:
+        first = (len(paging['keys']) - 1) * page_size
+        st.caption(f"Books {first + 1}–{first + len(rows)}")
+    with col3:
+        if st.button("Next ▶", disabled=next_key is None):
+            paging['keys'].append(next_key)
+            st.rerun()
@@ -0,0 +1,45 @@
+# views/performance.py
+import pandas as pd
+import streamlit as st
+
+from metrics import Metrics
+
+
+def performance_page(registry: Metrics):
+    st.header("⏱️ Performance")
+
+    # The registry is shared by the whole process, so switching it is an
+    # explicit action rather than a widget value each session would re-apply
+    st.caption(f"Metrics collection is {'on' if registry.enabled else 'off'} for every session of this app process.")
+    toggle = "Stop collecting metrics (all sessions)" if registry.enabled else "Start collecting metrics (all sessions)"
+    if st.button(toggle, help="Times MySQL queries, Google Books requests, chart and page renders"):
+        registry.enabled = not registry.enabled
+        st.rerun()
+
+    snapshot = registry.snapshot()
+    if not snapshot['histograms'] and not snapshot['counters']:
+        st.info("Nothing measured yet. Use the other pages, then come back here.")
+    else:
+        if snapshot['histograms']:
+            st.subheader("Latency (ms)")
+            st.caption("Percentiles are estimated from histogram buckets")
+            df = pd.DataFrame(snapshot['histograms'])
+            df['labels'] = [', '.join(f"{k}={v}" for k, v in labels.items()) for labels in df['labels']]
+            st.dataframe(df.sort_values('p95_ms', ascending=False), hide_index=True)
+
+        if snapshot['counters']:
+            st.subheader("Counters")
+            df = pd.DataFrame(snapshot['counters'])
+            df['labels'] = [', '.join(f"{k}={v}" for k, v in labels.items()) for labels in df['labels']]
+            st.dataframe(df, hide_index=True)
+
+    export = registry.prometheus_text()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Prometheus metrics", export, file_name="bookscape_metrics.txt", mime="text/plain")
+    with col2:
+        if st.button("Reset metrics"):
+            registry.reset()
+            st.rerun()
+    with st.expander("Prometheus export"):
+        st.code(export, language="text")
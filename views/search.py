@@ -0,0 +1,60 @@
+# views/search.py
+import streamlit as st
+
+from api_handler import GoogleBooksAPI, SearchFilters
+from database_manager import DatabaseManager
+
+
+def search_books_page(db: DatabaseManager, api: GoogleBooksAPI):
+    st.header("📖 Search Books")
+
+    source = st.radio("Search in", ["Google Books", "Local catalog"], horizontal=True)
+
+    col1, col2 = st.columns([3, 1])
+
+    with col1:
+        search_query = st.text_input("Enter search term")
+
+    with col2:
+        max_results = st.number_input("Maximum results", 10, 100, 40)
+
+    # Advanced filters
+    with st.expander("Advanced Filters"):
+        col1, col2 = st.columns(2)
+        with col1:
+            min_rating = st.slider("Minimum Rating", 0.0, 5.0, 0.0)
+            ebook_only = st.checkbox("eBooks Only")
+            books_only = st.checkbox("Books Only", help="Leave out magazines")
+        with col2:
+            min_pages = st.number_input("Minimum Pages", 0, 1000, 0)
+            free_only = st.checkbox("Free Books Only")
+            language = st.text_input("Language", max_chars=2, help="Two-letter code, e.g. en")
+        refresh = st.checkbox("Bypass cached results", help="Skip stored results and fetch fresh ones from Google Books")
+
+    # eBook, free, print type and language filters are sent to Google Books;
+    # the rest are checked on the results
+    filters = SearchFilters(
+        min_rating, min_pages, ebook_only, free_only,
+        'books' if books_only else None, language.strip().lower() or None
+    )
+
+    if st.button("🔍 Search"):
+        if not search_query:
+            st.warning("Please enter a search term")
+            return
+        
+        from views.search_results import google_books_results, local_catalog_results
+        if source == "Local catalog":
+            results = local_catalog_results(db, search_query, max_results)
+        else:
+            results = google_books_results(search_query, max_results, refresh, filters)
+        if results is not None:
+            st.session_state['search_results'] = results
+    
+    # The last search stays in the session, so changing a filter or page
+    # re-filters it in memory instead of searching again
+    results = st.session_state.get('search_results')
+    if results is not None:
+        # Results are DataFrames; pandas loads with the first search, not with the page
+        from views.search_results import show_search_results
+        show_search_results(results, filters)
@@ -0,0 +1,161 @@
+# views/search_results.py
+# Search results held in the session as a DataFrame, filtered and paged in
+# memory. Imported by the search page once there are results, since it
+# loads pandas
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from api_handler import PRINT_TYPES, SearchFilters
+from book import Book
+from configuration import GOOGLE_BOOKS_MAX_REQUESTS
+from database_manager import DatabaseManager
+from frames import books_to_frame
+from resources import get_search_service, get_thumbnails
+
+# Result cards rendered per page of search results
+RESULTS_PER_PAGE = 10
+
+
+def google_books_results(search_query: str, max_results: int, refresh: bool, filters: SearchFilters):
+    """Run a search and return it as a session result store; None on failure"""
+    service = get_search_service()
+    status = st.empty()
+    status.info("Searching books...")
+    preview = st.empty()
+    try:
+        books = []
+        # Stored results come first; anything fetched from Google Books is
+        # stored in the background. The first page of cards is previewed as
+        # results arrive. Pages keep coming until max_results books pass
+        # the filters or GOOGLE_BOOKS_MAX_REQUESTS pages have been read.
+        matched = 0
+        for page in service.iter_books(
+            search_query, max_results, refresh, filters, GOOGLE_BOOKS_MAX_REQUESTS
+        ):
+            books.extend(page)
+            matched += sum(1 for book in page if filters.matches(book))
+            status.info(f"Found {matched} matching books so far...")
+            frame = books_to_frame(books)
+            first = frame[result_mask(frame, filters)].head(RESULTS_PER_PAGE)
+            covers = get_thumbnails().prefetch(first['thumbnail'])
+            with preview.container():
+                for book in first.itertuples(index=False):
+                    render_book_card(book, covers)
+        
+        status.empty()
+        preview.empty()
+        if not books:
+            st.info("No books found matching your criteria")
+        return new_result_store(books_to_frame(books), f"Found {matched} books in {len(books)} results!")
+    
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
+        return None
+
+
+def local_catalog_results(db: DatabaseManager, search_query: str, max_results: int):
+    """Rank stored books with the full-text index; no network call"""
+    try:
+        start = time.perf_counter()
+        rows = db.search_catalog(search_query, max_results)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    
+        if not rows:
+            st.info("No stored books match your search")
+        frame = books_to_frame([Book.from_row(row) for row in rows])
+        return new_result_store(frame, f"Found {len(rows)} stored books in {elapsed_ms:.0f} ms.")
+    
+    except Exception as e:
+        st.error(f"Local search failed: {str(e)}")
+        return None
+
+
+def new_result_store(frame: pd.DataFrame, summary: str) -> dict:
+    """Session state entry for one search: its results as columns, plus paging state"""
+    return {'frame': frame, 'summary': summary, 'page': 0, 'filters': None}
+
+
+def result_mask(frame: pd.DataFrame, filters: SearchFilters):
+    """Boolean mask of the results that pass the Advanced Filters; SearchFilters.matches by column"""
+    mask = np.ones(len(frame), dtype=bool)
+    if filters.min_rating > 0:
+        mask &= frame['averageRating'].fillna(0).to_numpy() >= filters.min_rating
+    if filters.min_pages > 0:
+        mask &= frame['pageCount'].fillna(0).to_numpy() >= filters.min_pages
+    if filters.ebook_only:
+        mask &= frame['isEbook'].to_numpy()
+    if filters.free_only:
+        mask &= (frame['saleability'] == 'FREE').to_numpy()
+    if filters.print_type:
+        print_type = frame['printType']
+        mask &= (print_type.isna() | (print_type == PRINT_TYPES[filters.print_type])).to_numpy()
+    if filters.language:
+        mask &= (frame['language'] == filters.language).to_numpy()
+    return mask
+
+
+def show_search_results(results: dict, filters: SearchFilters):
+    """Filter the stored results and render one page of cards"""
+    frame = results['frame']
+    if frame.empty:
+        return
+    if results['filters'] != filters:
+        results.update(filters=filters, page=0)
+    matches = frame[result_mask(frame, filters)]
+    st.success(f"{results['summary']} Showing {len(matches)} after filters.")
+    if matches.empty:
+        return
+    
+    pages = (len(matches) - 1) // RESULTS_PER_PAGE + 1
+    page = min(results['page'], pages - 1)
+    shown = matches.iloc[page * RESULTS_PER_PAGE:(page + 1) * RESULTS_PER_PAGE]
+    # Fetch the page's covers together, then render from local bytes
+    covers = get_thumbnails().prefetch(shown['thumbnail'])
+    for book in shown.itertuples(index=False):
+        render_book_card(book, covers)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("◀ Previous", key="results_previous", disabled=page == 0):
+            results['page'] = page - 1
+            st.rerun()
+    with col2:
+        st.caption(f"Page {page + 1} of {pages}")
+    with col3:
+        if st.button("Next ▶", key="results_next", disabled=page == pages - 1):
+            results['page'] = page + 1
+            st.rerun()
+
+
+def render_book_card(book, covers: dict):
+    """One result card from a books_to_frame row; the cover comes from covers (see ThumbnailCache.prefetch)"""
+    with st.container():
+        st.markdown("""
+            <div class="book-card">
+            """, unsafe_allow_html=True)
+    
+        col1, col2 = st.columns([1, 3])
+    
+        with col1:
+            cover = covers.get(book.thumbnail)
+            if cover:
+                st.image(cover, width=150)
+    
+        with col2:
+            st.subheader(book.title)
+            st.write(f"Authors: {', '.join(book.authors)}")
+            if not pd.isna(book.averageRating):
+                st.write(f"Rating: {'⭐' * int(book.averageRating)} ({book.averageRating})")
+            st.write(f"Published: {book.publishedDate or 'Unknown'}")
+            if book.description:
+                with st.expander("Description"):
+                    st.write(book.description)
+        
+            # Add buy/preview button if available
+            if book.buyLink:
+                st.markdown(f"[Buy Book]({book.buyLink})")
+    
+        st.markdown("</div>", unsafe_allow_html=True)
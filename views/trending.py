@@ -0,0 +1,98 @@
+# views/trending.py
+import plotly.express as px
+import streamlit as st
+
+import queries
+from database_manager import DatabaseManager
+from frames import join_names
+from views import show_chart
+
+
+def trending_books_page(db: DatabaseManager):
+    st.header("📈 Trending Books")
+
+    # Time period filter
+    period = st.radio(
+        "Select Time Period",
+        ["All Time", "Last Year", "Last 5 Years"],
+        horizontal=True
+    )
+
+    year_filter = queries.YEAR_FILTERS[period]
+
+    try:
+        # Most popular books
+        df = db.query_frame(queries.TRENDING_BOOKS.format(year_filter=year_filter))
+    
+        if not df.empty:
+            st.subheader("Most Popular Books")
+            df['book_authors'] = join_names(df['book_authors'])
+            df['categories'] = join_names(df['categories'])
+        
+            # Create interactive chart
+            fig = px.bar(
+                df,
+                x='book_title',
+                y='ratingsCount',
+                color='averageRating',
+                title="Most Popular Books by Ratings Count",
+                labels={
+                    'book_title': 'Book Title',
+                    'ratingsCount': 'Number of Ratings',
+                    'averageRating': 'Average Rating'
+                }
+            )
+            show_chart(fig)
+        
+            # Display detailed table
+            st.dataframe(df)
+            
+            st.subheader("Genre Distribution")
+            try:
+                genre_df = db.query_frame(queries.GENRE_DISTRIBUTION)
+            
+                if not genre_df.empty:
+                
+                    fig2 = px.pie(
+                        genre_df,
+                        values='count',
+                        names='category',
+                        title="Most Popular Genres",
+                        hover_data=['avg_rating']
+                    )
+                    show_chart(fig2)
+            
+            except Exception as e:
+                st.error(f"Failed to load genre analysis: {e}")
+            
+            # Add author analysis
+            st.subheader("Top Authors")
+            try:
+                author_df = db.query_frame(queries.top_authors(year_filter))
+            
+                if not author_df.empty:
+                
+                    fig3 = px.bar(
+                        author_df,
+                        x='author',
+                        y='total_ratings',
+                        color='avg_rating',
+                        title="Top Authors by Total Ratings",
+                        labels={
+                            'author': 'Author',
+                            'total_ratings': 'Total Ratings',
+                            'avg_rating': 'Average Rating'
+                        }
+                    )
+                    show_chart(fig3)
+                
+                    st.write("Author Details:")
+                    st.dataframe(author_df)
+                
+            except Exception as e:
+                st.error(f"Failed to load author analysis: {e}")
+        else:
+            st.info("No trending books data available")
+            
+    except Exception as e:
+        st.error(f"Failed to load trending books: {e}")
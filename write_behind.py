@@ -0,0 +1,137 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple
+
+from book import Book
+
+_STOP = object()
+
+
+class _SearchRecord(NamedTuple):
+    """A DatabaseManager.record_search call queued behind the books it lists"""
+    search_key: str
+    start_index: int
+    book_ids: List[str]
+    total_items: int
+
+
+class WriteBehindQueue:
+    """
+    Background writer that batches book upserts off the UI thread.
+
+    Callers hand over Books and return
+    immediately; a single worker thread groups them into batches for
+    DatabaseManager.insert_books. The queue is bounded, so a slow database
+    applies backpressure instead of growing memory, and pending books are
+    flushed when the process exits.
+
+    Stored-search positions can be queued too (record_search); they are
+    written after every book queued before them.
+    """
+
+    def __init__(self, db, batch_size: int = 100, max_pending: int = 1000, flush_interval: float = 0.5):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._stats = {
+            'queued': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'failed': 0, 'batches': 0,
+            'searches_recorded': 0
+        }
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def put(self, book: Book):
+        """Queue one book for writing, blocking while the queue is full"""
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+        self._queue.put(book)
+        with self._lock:
+            self._stats['queued'] += 1
+
+    def put_many(self, books: Iterable[Book]):
+        """Queue several books for writing"""
+        for book in books:
+            self.put(book)
+
+    def record_search(self, search_key: str, start_index: int, book_ids: List[str], total_items: int):
+        """Queue DatabaseManager.record_search, to run once the books queued so far are written"""
+        if self._closed:
+            raise RuntimeError("WriteBehindQueue is closed")
+        self._queue.put(_SearchRecord(search_key, start_index, book_ids, total_items))
+
+    def flush(self):
+        """Block until every queued book has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Flush pending books and stop the worker"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._worker.join()
+
+    def stats(self) -> Dict:
+        """Return write counters and the current queue depth"""
+        with self._lock:
+            return {**self._stats, 'pending': self._queue.qsize()}
+
+    def _run(self):
+        batch = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+                self._queue.task_done()
+            elif isinstance(item, _SearchRecord):
+                if batch:
+                    self._write(batch)
+                    batch = []
+                    deadline = None
+                self._record(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            full = len(batch) >= self.batch_size
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (full or due or stopping):
+                self._write(batch)
+                batch = []
+                deadline = None
+
+    def _write(self, batch):
+        try:
+            result = self.db.insert_books(batch, batch_size=self.batch_size)
+        except Exception as e:
+            print(f"Write-behind batch failed: {e}")
+            result = {'failed': len(batch)}
+        with self._lock:
+            self._stats['batches'] += 1
+            for key, value in result.items():
+                self._stats[key] = self._stats.get(key, 0) + value
+        for _ in batch:
+            self._queue.task_done()
+
+    def _record(self, record):
+        try:
+            self.db.record_search(*record)
+            with self._lock:
+                self._stats['searches_recorded'] += 1
+        except Exception as e:
+            print(f"Write-behind search record failed: {e}")
+        self._queue.task_done()